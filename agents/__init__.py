@@ -1,6 +1,7 @@
 """Agent package exposing security orchestration utilities."""
 
 from .base import AgentMessage, AgentRegistry, SecurityAgent
+from .scheduler import IncidentScheduler, SchedulerOverloadedError
 from .security_agents import (
     ForensicCollectorAgent,
     IncidentCommanderAgent,
@@ -20,4 +21,6 @@ __all__ = [
     "ThreatIntelAgent",
     "IncidentCommanderAgent",
     "build_agent_registry",
+    "IncidentScheduler",
+    "SchedulerOverloadedError",
 ]
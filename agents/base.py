@@ -2,12 +2,23 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
+import hashlib
+import inspect
 import json
 import random
 import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.codec import pack_agent_messages, unpack_agent_messages
+from core.metrics import REGISTRY
 
 try:  # pragma: no cover - optional CrewAI import
     from crewai import Agent as CrewAgent  # type: ignore
@@ -24,7 +35,7 @@ except Exception:  # pragma: no cover - gracefully degrade when CrewAI is unavai
             return f"CrewAgent(name={self.name})"
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentMessage:
     """Represents an inter-agent JSON serialisable message."""
 
@@ -45,6 +56,68 @@ class AgentMessage:
             }
         )
 
+    def to_bytes(self) -> bytes:
+        """Return the message in the compact binary wire format."""
+
+        return encode_agent_messages([self])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AgentMessage":
+        """Rebuild a message encoded with :meth:`to_bytes`."""
+
+        return decode_agent_messages(data)[0]
+
+
+def encode_agent_messages(messages: Sequence[AgentMessage]) -> bytes:
+    """Encode a batch of agent messages into one columnar binary frame."""
+
+    return pack_agent_messages(
+        [(message.sender, message.recipient, message.timestamp, message.payload) for message in messages]
+    )
+
+
+def decode_agent_messages(data: bytes) -> List[AgentMessage]:
+    """Decode a frame produced by :func:`encode_agent_messages`."""
+
+    return [
+        AgentMessage(sender=sender, recipient=recipient, payload=payload, timestamp=timestamp)
+        for sender, recipient, timestamp, payload in unpack_agent_messages(data)
+    ]
+
+
+_HANDLE_LATENCY = REGISTRY.histogram(
+    "secops_agent_handle_seconds", "Time an agent spends handling one message.", ["agent"]
+)
+_BATCH_LATENCY = REGISTRY.histogram(
+    "secops_agent_batch_seconds", "Time an agent spends handling one batch of payloads.", ["agent"]
+)
+_CACHE_LOOKUPS = REGISTRY.counter(
+    "secops_agent_cache_lookups", "Reasoning cache lookups by outcome.", ["agent", "outcome"]
+)
+_BROADCAST_MISSED = REGISTRY.counter(
+    "secops_agent_broadcast_missed", "Broadcast replies lost to a timeout, error or cancellation.", ["agent", "status"]
+)
+
+# key marking a broadcast placeholder; payloads may carry their own "status"
+AGENT_ERROR = "_agent_error"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+STATUS_CANCELLED = "cancelled"
+
+# seconds per agent: one value for all, or per-agent overrides
+Timeout = Union[None, float, Mapping[str, float]]
+ReasoningHook = Callable[[Dict[str, Any]], Dict[str, Any]]
+BatchReasoningHook = Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+# how often a concurrent broadcast re-checks its cancel event
+_CANCEL_POLL = 0.01
+
+
+def _missed_reply(name: str, status: str, detail: str) -> Dict[str, Any]:
+    """Placeholder payload for an agent that did not answer a broadcast."""
+
+    _BROADCAST_MISSED.labels(name, status).inc()
+    return {"agent": name, AGENT_ERROR: status, "detail": detail}
+
 
 class AgentFeedback:
     """Simple reinforcement signal container."""
@@ -59,6 +132,12 @@ class AgentFeedback:
         with self._lock:
             self._scores.append(score)
 
+    def record_many(self, scores: Sequence[float]) -> None:
+        """Persist a batch of scores under one lock acquisition."""
+
+        with self._lock:
+            self._scores.extend(scores)
+
     @property
     def trend(self) -> float:
         """Return the rolling mean score used by agents to self-correct."""
@@ -69,6 +148,97 @@ class AgentFeedback:
             return sum(self._scores[-10:]) / min(len(self._scores), 10)
 
 
+class ReasoningCache:
+    """Thread-safe LRU cache of reasoning results with a time-to-live.
+
+    Keys are SHA-256 digests of the canonical JSON of the payload (sorted
+    keys, fields listed in ``ignore`` removed). Only the fields a hook added
+    or changed are stored; a hit overlays them on a copy of the new payload,
+    so ignored fields such as incident ids come from the caller, not from
+    the first incident that filled the entry.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        ignore: Sequence[str] = (),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize < 1 or ttl <= 0:
+            raise ValueError("maxsize and ttl must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ignore = frozenset(ignore)
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, payload: Mapping[str, Any]) -> str:
+        """Return the canonical hash of ``payload``."""
+
+        fields = {name: value for name, value in payload.items() if name not in self.ignore}
+        canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str, payload: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached result for ``key`` applied to ``payload``, or ``None``."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            changes = entry[1]
+        result = copy.deepcopy(dict(payload))
+        result.update(copy.deepcopy(changes))
+        return result
+
+    def put(self, key: str, payload: Mapping[str, Any], result: Mapping[str, Any]) -> None:
+        """Remember the fields of ``result`` that differ from ``payload``."""
+
+        changes = {name: value for name, value in result.items() if name not in payload or payload[name] != value}
+        changes = copy.deepcopy(changes)
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, changes)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Return lookup counters and the current hit ratio."""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
 class SecurityAgent:
     """Abstract helper that wraps CrewAI agents with platform utilities."""
 
@@ -76,21 +246,58 @@ class SecurityAgent:
         self,
         name: str,
         description: str,
-        reasoning_hook: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        reasoning_hook: Optional[ReasoningHook] = None,
+        batch_hook: Optional[BatchReasoningHook] = None,
     ) -> None:
         self.name = name
         self.description = description
         self.reasoning_hook = reasoning_hook
+        self.batch_hook = batch_hook
+        self.cache: Optional[ReasoningCache] = None
         self._crew_agent = CrewAgent(name=name, goal=description, backstory=description)
         self.feedback = AgentFeedback()
 
+    def enable_cache(self, maxsize: int = 1024, ttl: float = 300.0, ignore: Sequence[str] = ()) -> ReasoningCache:
+        """Memoise reasoning results; only valid for deterministic, synchronous hooks.
+
+        ``ignore`` names payload fields the hook does not read (ids,
+        timestamps) so duplicate alerts share an entry.
+        """
+
+        if self.reasoning_hook is None:
+            raise ValueError(f"{self.name} uses randomised fallback reasoning and cannot be cached")
+        if inspect.iscoroutinefunction(self.reasoning_hook):
+            raise ValueError(f"{self.name} has an async reasoning hook and cannot be cached")
+        self.cache = ReasoningCache(maxsize=maxsize, ttl=ttl, ignore=ignore)
+        return self.cache
+
+    def disable_cache(self) -> None:
+        self.cache = None
+
+    def _cached(self, context: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Look ``context`` up in the cache, returning its key and any hit."""
+
+        cache = self.cache
+        if cache is None:
+            return None, None
+        key = cache.key(context)
+        result = cache.get(key, context)
+        _CACHE_LOOKUPS.labels(self.name, "miss" if result is None else "hit").inc()
+        return key, result
+
     def _run_reasoning_loop(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a bounded reasoning loop using optional deterministic heuristics."""
 
         base_context = dict(context)
         base_context["agent"] = self.name
         if self.reasoning_hook:
-            return self.reasoning_hook(base_context)
+            key, cached = self._cached(base_context)
+            if cached is not None:
+                return cached
+            result = self.reasoning_hook(base_context if key is None else dict(base_context))
+            if key is not None and self.cache is not None:
+                self.cache.put(key, base_context, result)
+            return result
 
         # Fallback reasoning: simple weighted decision making
         decision_score = random.random() * (1 + self.feedback.trend)
@@ -103,7 +310,26 @@ class SecurityAgent:
     def handle(self, message: AgentMessage) -> AgentMessage:
         """Process an incoming message and produce a reply."""
 
-        result = self._run_reasoning_loop(message.payload)
+        if inspect.iscoroutinefunction(self.reasoning_hook):
+            raise TypeError(f"{self.name} has an async reasoning hook; use ahandle()")
+        with _HANDLE_LATENCY.labels(self.name).time():
+            result = self._run_reasoning_loop(message.payload)
+        self.feedback.record(result.get("decision_score", 0.5))
+        return AgentMessage(sender=self.name, recipient=message.sender, payload=result)
+
+    async def ahandle(self, message: AgentMessage) -> AgentMessage:
+        """Async counterpart of :meth:`handle`.
+
+        Coroutine reasoning hooks are awaited, so cancelling the caller stops
+        them; synchronous hooks run in a worker thread.
+        """
+
+        if not inspect.iscoroutinefunction(self.reasoning_hook):
+            return await asyncio.to_thread(self.handle, message)
+        context = dict(message.payload)
+        context["agent"] = self.name
+        with _HANDLE_LATENCY.labels(self.name).time():
+            result = await self.reasoning_hook(context)  # type: ignore[misc]
         self.feedback.record(result.get("decision_score", 0.5))
         return AgentMessage(sender=self.name, recipient=message.sender, payload=result)
 
@@ -114,13 +340,78 @@ class SecurityAgent:
         response = self.handle(message)
         return response.payload
 
+    def _run_reasoning_batch(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.cache is not None:
+            return self._run_cached_batch(contexts)
+        if self.batch_hook is not None:
+            return self.batch_hook(contexts)
+        if self.reasoning_hook is not None:
+            return [self.reasoning_hook(context) for context in contexts]
+        # Fallback reasoning, vectorised; the feedback trend is read once per batch
+        scores = np.random.random(len(contexts)) * (1 + self.feedback.trend)
+        for context, score in zip(contexts, scores.tolist()):
+            context["decision_score"] = score
+            context["action"] = "escalate" if score > 0.7 else "investigate" if score > 0.4 else "observe"
+        return contexts
+
+    def _run_cached_batch(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Serve cache hits and reason over the misses as one smaller batch."""
+
+        results: List[Optional[Dict[str, Any]]] = []
+        misses: List[Tuple[int, str]] = []
+        for position, context in enumerate(contexts):
+            key, cached = self._cached(context)
+            results.append(cached)
+            if cached is None:
+                misses.append((position, key))  # type: ignore[arg-type]
+        if misses:
+            originals = [contexts[position] for position, _ in misses]
+            pending = [dict(context) for context in originals]
+            if self.batch_hook is not None:
+                computed = self.batch_hook(pending)
+            else:
+                computed = [self.reasoning_hook(context) for context in pending]  # type: ignore[misc]
+            for (position, key), original, result in zip(misses, originals, computed):
+                self.cache.put(key, original, result)  # type: ignore[union-attr]
+                results[position] = result
+        return results  # type: ignore[return-value]
+
+    def handle_batch(self, payloads: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Reason over many payloads in one call and return one result per payload.
+
+        Agents with a ``batch_hook`` score the whole batch at once; others fall
+        back to their per-payload hook without building messages.
+        """
+
+        if inspect.iscoroutinefunction(self.reasoning_hook) and self.batch_hook is None:
+            raise TypeError(f"{self.name} has an async reasoning hook; use ahandle()")
+        contexts = [dict(payload, agent=self.name) for payload in payloads]
+        with _BATCH_LATENCY.labels(self.name).time():
+            results = self._run_reasoning_batch(contexts)
+        self.feedback.record_many([result.get("decision_score", 0.5) for result in results])
+        return results
+
+    def plan_batch(self, facts: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Batch counterpart of :meth:`plan`."""
+
+        return self.handle_batch(facts)
+
 
 class AgentRegistry:
-    """Central registry and message bus for agent-to-agent communication."""
+    """Central registry and message bus for agent-to-agent communication.
 
-    def __init__(self) -> None:
+    :meth:`broadcast` can fan out concurrently on a shared thread pool of
+    ``max_workers`` threads, and :meth:`abroadcast` does the same on the
+    event loop. Both bound each agent by a deadline and return partial
+    results: agents that time out, fail or are cancelled get a placeholder
+    payload whose ``"_agent_error"`` key says why.
+    """
+
+    def __init__(self, max_workers: int = 16) -> None:
         self._agents: Dict[str, SecurityAgent] = {}
         self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     def register(self, agent: SecurityAgent) -> None:
         """Register a new agent instance on the message bus."""
@@ -145,13 +436,160 @@ class AgentRegistry:
             raise KeyError(f"Agent {message.recipient} not registered")
         return agent.handle(message)
 
-    def broadcast(self, sender: str, payload: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
-        """Send the payload to every registered agent and collect their responses."""
+    def _recipients(self, sender: str) -> List[SecurityAgent]:
+        with self._lock:
+            return [agent for name, agent in self._agents.items() if name != sender]
 
-        results: Dict[str, Dict[str, Any]] = {}
-        for name in list(self._agents.keys()):
-            if name == sender:
-                continue
-            reply = self.send(AgentMessage(sender=sender, recipient=name, payload=payload))
-            results[name] = reply.payload
-        return results
+    @staticmethod
+    def _deadlines(agents: Sequence[SecurityAgent], timeout: Timeout, start: float) -> Dict[str, float]:
+        if timeout is None:
+            return {agent.name: float("inf") for agent in agents}
+        if isinstance(timeout, Mapping):
+            return {agent.name: start + timeout.get(agent.name, float("inf")) for agent in agents}
+        return {agent.name: start + timeout for agent in agents}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="agent-broadcast"
+                )
+            return self._executor
+
+    def broadcast(
+        self,
+        sender: str,
+        payload: Dict[str, Any],
+        concurrent: bool = False,
+        timeout: Timeout = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Send the payload to every registered agent and collect their responses.
+
+        With ``concurrent`` the agents run in parallel on the registry's thread
+        pool, so the call takes as long as the slowest agent within its
+        deadline. ``timeout`` is in seconds, either for every agent or as a
+        per-agent mapping. Setting ``cancel`` returns at once with the
+        outstanding agents marked cancelled. Threads cannot be interrupted, so
+        a hung hook keeps its worker until it returns; its late reply is
+        discarded.
+        """
+
+        agents = self._recipients(sender)
+        if not concurrent:
+            if timeout is not None or cancel is not None:
+                raise ValueError("timeout and cancel require concurrent=True")
+            return {
+                agent.name: agent.handle(AgentMessage(sender=sender, recipient=agent.name, payload=payload)).payload
+                for agent in agents
+            }
+
+        def ask(agent: SecurityAgent) -> Dict[str, Any]:
+            return agent.handle(AgentMessage(sender=sender, recipient=agent.name, payload=payload)).payload
+
+        replies, missed = self._fan_out(agents, ask, timeout, cancel)
+        return {agent.name: replies[agent.name] if agent.name in replies else missed[agent.name] for agent in agents}
+
+    def broadcast_batch(
+        self,
+        sender: str,
+        payloads: Sequence[Dict[str, Any]],
+        timeout: Timeout = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Send a whole batch to every agent in one :meth:`SecurityAgent.handle_batch` call each.
+
+        Agents run concurrently as in :meth:`broadcast`; an agent that misses
+        its deadline gets the same placeholder for every payload in the batch.
+        """
+
+        agents = self._recipients(sender)
+        replies, missed = self._fan_out(agents, lambda agent: agent.handle_batch(payloads), timeout, cancel)
+        for name, placeholder in missed.items():
+            replies[name] = [dict(placeholder) for _ in payloads]
+        return {agent.name: replies[agent.name] for agent in agents}
+
+    def _fan_out(
+        self,
+        agents: Sequence[SecurityAgent],
+        call: Callable[[SecurityAgent], Any],
+        timeout: Timeout,
+        cancel: Optional[threading.Event],
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """Run ``call`` for every agent on the pool; return replies and missed placeholders."""
+
+        start = time.monotonic()
+        deadlines = self._deadlines(agents, timeout, start)
+        pool = self._pool()
+        pending = {pool.submit(call, agent): agent.name for agent in agents}
+        results: Dict[str, Any] = {}
+        missed: Dict[str, Dict[str, Any]] = {}
+        while pending:
+            remaining = min(deadlines[name] for name in pending.values()) - time.monotonic()
+            if cancel is not None:
+                remaining = min(remaining, _CANCEL_POLL)
+            done, _ = wait(
+                pending,
+                timeout=None if remaining == float("inf") else max(remaining, 0.0),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                name = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    results[name] = future.result()
+                else:
+                    missed[name] = _missed_reply(name, STATUS_ERROR, repr(error))
+            now = time.monotonic()
+            cancelled = cancel is not None and cancel.is_set()
+            for future, name in list(pending.items()):
+                if cancelled or deadlines[name] <= now:
+                    future.cancel()
+                    del pending[future]
+                    status = STATUS_CANCELLED if cancelled else STATUS_TIMEOUT
+                    missed[name] = _missed_reply(name, status, f"no reply after {now - start:.3f}s")
+        return results, missed
+
+    async def abroadcast(
+        self, sender: str, payload: Dict[str, Any], timeout: Timeout = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Concurrent :meth:`broadcast` on the running event loop.
+
+        Each agent runs as its own task through :meth:`SecurityAgent.ahandle`
+        and is cancelled when its deadline passes. Cancelling the caller
+        cancels every outstanding agent task.
+        """
+
+        agents = self._recipients(sender)
+        start = time.monotonic()
+        deadlines = self._deadlines(agents, timeout, start)
+
+        async def ask(agent: SecurityAgent) -> Dict[str, Any]:
+            message = AgentMessage(sender=sender, recipient=agent.name, payload=payload)
+            remaining = deadlines[agent.name] - time.monotonic()
+            try:
+                reply: Awaitable[AgentMessage] = agent.ahandle(message)
+                if remaining == float("inf"):
+                    return (await reply).payload
+                return (await asyncio.wait_for(reply, max(remaining, 0.0))).payload
+            except asyncio.TimeoutError:
+                return _missed_reply(agent.name, STATUS_TIMEOUT, f"no reply after {time.monotonic() - start:.3f}s")
+            except Exception as exc:  # partial results: one failing agent must not sink the fan-out
+                return _missed_reply(agent.name, STATUS_ERROR, repr(exc))
+
+        tasks = [asyncio.ensure_future(ask(agent)) for agent in agents]
+        try:
+            replies = await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        return {agent.name: reply for agent, reply in zip(agents, replies)}
+
+    def close(self) -> None:
+        """Shut down the broadcast thread pool without waiting for hung agents."""
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,272 @@
+"""Priority-aware incident scheduler that runs commander plans on a worker pool."""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional
+
+from core.metrics import REGISTRY, SIZE_BUCKETS
+
+from .base import Timeout
+from .security_agents import IncidentCommanderAgent
+
+# highest first; index 0 is the containment lane
+PRIORITIES = ("high", "medium", "low")
+DEFAULT_PRIORITY = "medium"
+
+_QUEUE_WAIT = REGISTRY.histogram(
+    "secops_scheduler_wait_seconds", "Time an incident waited in the scheduler queue.", ["priority"]
+)
+_BATCH_SIZE = REGISTRY.histogram(
+    "secops_scheduler_batch_size", "Incidents planned per worker dispatch.", buckets=SIZE_BUCKETS
+)
+_REJECTED = REGISTRY.counter(
+    "secops_scheduler_rejected", "Incidents refused or shed by admission control.", ["priority", "reason"]
+)
+_QUEUE_DEPTH = REGISTRY.gauge("secops_scheduler_queue_depth", "Incidents waiting per priority level.", ["priority"])
+# every live scheduler feeds the shared depth gauge; dropped ones fall out on garbage collection
+_SCHEDULERS: "weakref.WeakSet[IncidentScheduler]" = weakref.WeakSet()
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def _queued(level: int) -> int:
+    with _SCHEDULERS_LOCK:
+        schedulers = list(_SCHEDULERS)
+    return sum(len(scheduler._queues[level]) for scheduler in schedulers)
+
+
+for _level, _priority in enumerate(PRIORITIES):
+    _QUEUE_DEPTH.labels(_priority).set_function(lambda level=_level: _queued(level))
+
+
+class SchedulerOverloadedError(RuntimeError):
+    """Raised when admission control refuses or sheds an incident."""
+
+
+@dataclass(slots=True)
+class ScheduledIncident:
+    """One queued incident and the future its plan is delivered through."""
+
+    incident: Dict[str, Any]
+    level: int
+    enqueued: float
+    sequence: int
+    future: "Future[Dict[str, Any]]" = field(default_factory=Future)
+
+
+class IncidentScheduler:
+    """Multi-level priority queues drained by a pool of planning workers.
+
+    Each ``priority`` (``high``, ``medium``, ``low``) has its own FIFO queue
+    and workers always take the best queue head. Waiting ``aging`` seconds
+    promotes an incident one level, so hunts cannot starve, but aging never
+    lifts anything into the ``high`` lane. Heads at the same effective level
+    run in arrival order, so an aged hunt overtakes medium incidents that
+    arrived after it.
+    ``reserved_workers`` threads only ever take high-priority work, so
+    containment never queues behind a backlog of long-running hunts.
+
+    Workers pop up to ``batch_size`` incidents of one effective level at a time and
+    plan them with :meth:`IncidentCommanderAgent.coordinate_batch`.
+
+    Admission control bounds the queued incidents by ``max_queued``. When the
+    scheduler is full, a new incident sheds the newest incident of the lowest
+    non-empty level below its own; if there is none, :meth:`submit` raises
+    :class:`SchedulerOverloadedError`. Shed incidents fail their future with
+    the same error.
+    """
+
+    def __init__(
+        self,
+        commander: IncidentCommanderAgent,
+        workers: int = 4,
+        reserved_workers: int = 1,
+        max_queued: int = 1000,
+        aging: float = 30.0,
+        batch_size: int = 8,
+        timeout: Timeout = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if workers < 1 or not 0 <= reserved_workers < workers:
+            raise ValueError("Need at least one worker and fewer reserved workers than workers")
+        if aging <= 0 or batch_size < 1 or max_queued < 1:
+            raise ValueError("aging, batch_size and max_queued must be positive")
+        self.commander = commander
+        self.workers = workers
+        self.reserved_workers = reserved_workers
+        self.aging = aging
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_queued = max_queued
+        self._clock = clock
+        self._queues: List[Deque[ScheduledIncident]] = [deque() for _ in PRIORITIES]
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        with _SCHEDULERS_LOCK:
+            _SCHEDULERS.add(self)
+
+    @staticmethod
+    def level_of(incident: Mapping[str, Any]) -> int:
+        """Map an incident's ``priority`` to its queue index; unknown values count as medium."""
+
+        priority = incident.get("priority", DEFAULT_PRIORITY)
+        return PRIORITIES.index(priority) if priority in PRIORITIES else PRIORITIES.index(DEFAULT_PRIORITY)
+
+    def submit(self, incident: Dict[str, Any]) -> "Future[Dict[str, Any]]":
+        """Queue ``incident`` and return a future resolving to its plan."""
+
+        level = self.level_of(incident)
+        victim: Optional[ScheduledIncident] = None
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            if sum(len(queue) for queue in self._queues) >= self.max_queued:
+                victim = self._shed_below(level)
+                if victim is None:
+                    _REJECTED.labels(PRIORITIES[level], "full").inc()
+                    raise SchedulerOverloadedError(f"Scheduler is full ({self.max_queued} queued incidents)")
+            entry = ScheduledIncident(incident, level, self._clock(), next(self._sequence))
+            self._queues[level].append(entry)
+            self._condition.notify_all()
+        if victim is not None:  # resolved outside the lock so its callbacks may resubmit
+            victim.future.set_exception(SchedulerOverloadedError(f"Shed to admit a {PRIORITIES[level]} incident"))
+        return entry.future
+
+    def _shed_below(self, level: int) -> Optional[ScheduledIncident]:
+        """Remove the newest incident of the lowest non-empty level under ``level``."""
+
+        for lower in range(len(PRIORITIES) - 1, level, -1):
+            if self._queues[lower]:
+                _REJECTED.labels(PRIORITIES[lower], "shed").inc()
+                return self._queues[lower].pop()
+        return None
+
+    def __len__(self) -> int:
+        with self._condition:
+            return sum(len(queue) for queue in self._queues)
+
+    def depth(self) -> Dict[str, int]:
+        """Return the number of queued incidents per priority."""
+
+        with self._condition:
+            return {priority: len(queue) for priority, queue in zip(PRIORITIES, self._queues)}
+
+    def _effective_level(self, entry: ScheduledIncident, now: float) -> int:
+        if entry.level == 0:
+            return 0
+        return max(1, entry.level - int((now - entry.enqueued) // self.aging))
+
+    def _next_level(self, reserved: bool) -> Optional[int]:
+        """Pick the queue whose head should run next, or ``None``."""
+
+        if reserved:
+            return 0 if self._queues[0] else None
+        now = self._clock()
+        heads = [
+            (self._effective_level(queue[0], now), queue[0].sequence, level)
+            for level, queue in enumerate(self._queues)
+            if queue
+        ]
+        return min(heads)[2] if heads else None
+
+    def _take(self, reserved: bool) -> Optional[List[ScheduledIncident]]:
+        """Block until a batch is available for this worker; ``None`` on shutdown."""
+
+        with self._condition:
+            while True:
+                level = self._next_level(reserved)
+                if level is not None:
+                    return self._pop_batch(self._queues[level])
+                if self._closed:
+                    return None
+                self._condition.wait()
+
+    def _pop_batch(self, queue: Deque[ScheduledIncident]) -> List[ScheduledIncident]:
+        """Pop the head and the entries behind it that share its effective level.
+
+        Only the head of a queue may have aged into a higher lane, so the batch
+        stops at the first younger entry instead of carrying it along.
+        """
+
+        now = self._clock()
+        target = self._effective_level(queue[0], now)
+        batch = [queue.popleft()]
+        while queue and len(batch) < self.batch_size and self._effective_level(queue[0], now) == target:
+            batch.append(queue.popleft())
+        return batch
+
+    def _worker(self, reserved: bool) -> None:
+        while True:
+            batch = self._take(reserved)
+            if batch is None:
+                return
+            self._run(batch)
+
+    def _run(self, batch: List[ScheduledIncident]) -> None:
+        now = self._clock()
+        live = [entry for entry in batch if entry.future.set_running_or_notify_cancel()]
+        for entry in live:
+            _QUEUE_WAIT.labels(PRIORITIES[entry.level]).observe(now - entry.enqueued)
+        if not live:
+            return
+        _BATCH_SIZE.observe(len(live))
+        try:
+            plans = self.commander.coordinate_batch([entry.incident for entry in live], timeout=self.timeout)
+        except Exception as exc:  # a failed plan must not kill the worker
+            for entry in live:
+                entry.future.set_exception(exc)
+            return
+        for entry, plan in zip(live, plans):
+            plan["priority"] = PRIORITIES[entry.level]
+            plan["queued_seconds"] = round(now - entry.enqueued, 3)
+            entry.future.set_result(plan)
+
+    def start(self) -> "IncidentScheduler":
+        """Spawn the worker threads; returns ``self`` for chaining."""
+
+        with self._condition:
+            if self._threads:
+                return self
+            for index in range(self.workers):
+                reserved = index < self.reserved_workers
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(reserved,),
+                    name=f"incident-{'reserved' if reserved else 'worker'}-{index}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """Stop accepting incidents; workers exit once the queues are drained.
+
+        With ``cancel_pending`` queued incidents are cancelled instead of run.
+        """
+
+        with self._condition:
+            self._closed = True
+            if cancel_pending:
+                for queue in self._queues:
+                    while queue:
+                        queue.popleft().future.cancel()
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self) -> "IncidentScheduler":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
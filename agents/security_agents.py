@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import math
 import random
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from .base import AgentMessage, AgentRegistry, SecurityAgent
+import numpy as np
+
+from .base import AGENT_ERROR, AgentMessage, AgentRegistry, SecurityAgent, Timeout
 
 
 def _threat_reasoning(context: Dict[str, Any]) -> Dict[str, Any]:
@@ -21,6 +23,19 @@ def _threat_reasoning(context: Dict[str, Any]) -> Dict[str, Any]:
     return context
 
 
+def _threat_reasoning_batch(contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Vectorised :func:`_threat_reasoning` over a batch of contexts."""
+
+    indicators = np.array([len(context.get("indicators", [])) for context in contexts], dtype=float)
+    anomaly = np.array([context.get("anomaly_score", 0) for context in contexts], dtype=float)
+    scores = 0.3 + 0.1 * indicators + np.where(anomaly > 0.8, 0.2, 0.0)
+    escalate = scores > 0.7
+    for context, score, hot in zip(contexts, np.minimum(scores, 1.0).tolist(), escalate.tolist()):
+        context.update({"decision_score": score, "action": "escalate" if hot else "hunt"})
+        context["notes"] = "Deep packet inspection triggered" if hot else "Hunting in background"
+    return contexts
+
+
 def _forensic_reasoning(context: Dict[str, Any]) -> Dict[str, Any]:
     """Collect data points for forensic analysis."""
 
@@ -36,6 +51,12 @@ def _forensic_reasoning(context: Dict[str, Any]) -> Dict[str, Any]:
     return context
 
 
+def _forensic_reasoning_batch(contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Batch :func:`_forensic_reasoning`; the outcome does not depend on the context."""
+
+    return [_forensic_reasoning(context) for context in contexts]
+
+
 def _policy_reasoning(context: Dict[str, Any]) -> Dict[str, Any]:
     """Perform zero-trust policy verification."""
 
@@ -45,6 +66,12 @@ def _policy_reasoning(context: Dict[str, Any]) -> Dict[str, Any]:
     return context
 
 
+def _policy_reasoning_batch(contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Batch :func:`_policy_reasoning`; policy maps are per incident, so this stays a loop."""
+
+    return [_policy_reasoning(context) for context in contexts]
+
+
 def _intel_reasoning(context: Dict[str, Any]) -> Dict[str, Any]:
     """Blend threat intel with federated analytics."""
 
@@ -61,11 +88,26 @@ def _intel_reasoning(context: Dict[str, Any]) -> Dict[str, Any]:
     return context
 
 
+def _intel_reasoning_batch(contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Vectorised :func:`_intel_reasoning` scoring over a batch of contexts."""
+
+    high_risk = [[feed for feed in context.get("feeds", []) if feed.get("risk", 0) > 0.75] for context in contexts]
+    scores = 0.5 + 0.1 * np.array([len(feeds) for feeds in high_risk], dtype=float)
+    for context, feeds, score in zip(contexts, high_risk, scores.tolist()):
+        context.update(
+            {"decision_score": score, "action": "curate", "high_risk": feeds, "notes": "TTP correlation complete"}
+        )
+    return contexts
+
+
+_PRIORITY_SCORES = {"low": 0.4, "medium": 0.7, "high": 0.95}
+
+
 def _commander_reasoning(context: Dict[str, Any]) -> Dict[str, Any]:
     """Strategic coordination and reinforcement feedback."""
 
     priority = context.get("priority", "medium")
-    base_score = {"low": 0.4, "medium": 0.7, "high": 0.95}.get(priority, 0.6)
+    base_score = _PRIORITY_SCORES.get(priority, 0.6)
     context.update(
         {
             "decision_score": base_score,
@@ -76,6 +118,22 @@ def _commander_reasoning(context: Dict[str, Any]) -> Dict[str, Any]:
     return context
 
 
+def _commander_reasoning_batch(contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Vectorised :func:`_commander_reasoning` over a batch of contexts."""
+
+    scores = np.array([_PRIORITY_SCORES.get(context.get("priority", "medium"), 0.6) for context in contexts])
+    contain = scores >= 0.9
+    for context, score, hot in zip(contexts, scores.tolist(), contain.tolist()):
+        context.update(
+            {
+                "decision_score": score,
+                "action": "contain" if hot else "coordinate",
+                "notes": "Playbook triggered" if hot else "Monitoring via unified command",
+            }
+        )
+    return contexts
+
+
 class ThreatHunterAgent(SecurityAgent):
     """Locate and triage malicious activity across telemetry sources."""
 
@@ -84,6 +142,7 @@ class ThreatHunterAgent(SecurityAgent):
             name="ThreatHunterAgent",
             description="Performs behavioral analytics and hunts anomalous activity",
             reasoning_hook=_threat_reasoning,
+            batch_hook=_threat_reasoning_batch,
         )
 
 
@@ -95,6 +154,7 @@ class ForensicCollectorAgent(SecurityAgent):
             name="ForensicCollectorAgent",
             description="Acquires forensics artefacts from compromised assets",
             reasoning_hook=_forensic_reasoning,
+            batch_hook=_forensic_reasoning_batch,
         )
 
 
@@ -106,6 +166,7 @@ class PolicyValidatorAgent(SecurityAgent):
             name="PolicyValidatorAgent",
             description="Checks policy compliance against zero-trust baselines",
             reasoning_hook=_policy_reasoning,
+            batch_hook=_policy_reasoning_batch,
         )
 
 
@@ -117,6 +178,7 @@ class ThreatIntelAgent(SecurityAgent):
             name="ThreatIntelAgent",
             description="Curates intelligence feeds and prioritises relevant TTPs",
             reasoning_hook=_intel_reasoning,
+            batch_hook=_intel_reasoning_batch,
         )
 
 
@@ -128,26 +190,77 @@ class IncidentCommanderAgent(SecurityAgent):
             name="IncidentCommanderAgent",
             description="Coordinates multi-agent SecOps playbooks",
             reasoning_hook=_commander_reasoning,
+            batch_hook=_commander_reasoning_batch,
         )
         self.registry = registry
 
-    def coordinate(self, incident: Dict[str, Any]) -> Dict[str, Any]:
-        """Request situational awareness from all agents and produce an action plan."""
-
-        fanout = self.registry.broadcast(sender=self.name, payload=incident)
+    def coordinate(self, incident: Dict[str, Any], timeout: Timeout = None) -> Dict[str, Any]:
+        """Request situational awareness from all agents and produce an action plan.
+
+        Agents are consulted concurrently; any that miss ``timeout`` are listed
+        under ``missing`` and the plan is built from the rest.
+        """
+
+        fanout = self.registry.broadcast(sender=self.name, payload=incident, concurrent=True, timeout=timeout)
+        return self._summarise(fanout)
+
+    async def acoordinate(self, incident: Dict[str, Any], timeout: Timeout = None) -> Dict[str, Any]:
+        """Async :meth:`coordinate` for callers already running an event loop."""
+
+        fanout = await self.registry.abroadcast(sender=self.name, payload=incident, timeout=timeout)
+        return self._summarise(fanout)
+
+    def coordinate_batch(self, incidents: List[Dict[str, Any]], timeout: Timeout = None) -> List[Dict[str, Any]]:
+        """Plan a whole batch of incidents with one batched call per agent.
+
+        Risk is the per-incident maximum over the agents' decision scores,
+        taken column-wise over an agents x incidents matrix.
+        """
+
+        if not incidents:
+            return []
+        fanout = self.registry.broadcast_batch(sender=self.name, payloads=incidents, timeout=timeout)
+        names = list(fanout)
+        scores = np.array(
+            [[payload.get("decision_score", 0.0) for payload in fanout[name]] for name in names], dtype=float
+        ).reshape(len(names), len(incidents))
+        risks = scores.max(axis=0) if names else np.zeros(len(incidents))
+        contain = risks > 0.8
+        plans = []
+        for column, (risk, hot) in enumerate(zip(risks.tolist(), contain.tolist())):
+            responses = {name: fanout[name][column] for name in names}
+            plans.append(
+                {
+                    "risk": round(risk, 3),
+                    "recommendation": "contain" if hot else "investigate",
+                    "responses": responses,
+                    "missing": {
+                        name: payload[AGENT_ERROR] for name, payload in responses.items() if AGENT_ERROR in payload
+                    },
+                }
+            )
+        self.feedback.record_many(np.where(contain, 0.9, 0.6).tolist())
+        return plans
+
+    def _summarise(self, fanout: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         risk = max((payload.get("decision_score", 0.0) for payload in fanout.values()), default=0.0)
         incident_summary = {
             "risk": round(risk, 3),
             "recommendation": "contain" if risk > 0.8 else "investigate",
             "responses": fanout,
+            "missing": {name: payload[AGENT_ERROR] for name, payload in fanout.items() if AGENT_ERROR in payload},
         }
         reinforcement = 0.9 if incident_summary["recommendation"] == "contain" else 0.6
         self.feedback.record(reinforcement)
         return incident_summary
 
 
-def build_agent_registry() -> AgentRegistry:
-    """Create and register all agents for use across the platform."""
+def build_agent_registry(cache_ttl: Optional[float] = None, cache_size: int = 1024) -> AgentRegistry:
+    """Create and register all agents for use across the platform.
+
+    With ``cache_ttl`` every agent memoises its (deterministic) reasoning,
+    ignoring incident ids and timestamps when matching duplicate alerts.
+    """
 
     registry = AgentRegistry()
     threat_hunter = ThreatHunterAgent()
@@ -157,5 +270,7 @@ def build_agent_registry() -> AgentRegistry:
     commander = IncidentCommanderAgent(registry=registry)
 
     for agent in (threat_hunter, forensic, policy, intel, commander):
+        if cache_ttl is not None:
+            agent.enable_cache(maxsize=cache_size, ttl=cache_ttl, ignore=("id", "timestamp"))
         registry.register(agent)
     return registry
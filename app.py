@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 from typing import Dict, List
 
@@ -11,7 +12,8 @@ import pandas as pd
 import streamlit as st
 import yaml
 
-from agents.security_agents import IncidentCommanderAgent, build_agent_registry
+from agents.scheduler import IncidentScheduler, SchedulerOverloadedError
+from agents.security_agents import build_agent_registry
 from analytics.behavior import detect_anomalies, fingerprint_user
 from analytics.explainability import generate_sample_features, lime_explanation, shap_summary
 from analytics.federated import FederatedNode, simulate_federated_round, synthetic_dataset
@@ -22,9 +24,10 @@ from compliance.soar import trigger_playbook
 from core.chaos_injector import inject_failure
 from core.crypto import certificate_metadata
 from core.gitops import progressive_deploy, record_change
+from core.incident_index import TopKIncidentIndex
 from core.kafka_pipeline import KafkaPipeline, bootstrap_pipeline, simulate_threat_event
 from core.quantum_entropy import entropy_strength, harvest_entropy
-from core.secops_stream_processor import derive_threat_summary, process_stream
+from core.secops_stream_processor import ThreatSummaryAggregator, process_stream
 from core.self_healing import evaluate_exploit_detection, predictive_patching
 from core.vector_store import VectorStore
 from core.xdr_connectors import CONNECTOR_SOURCES, fetch_events, unified_schema
@@ -32,11 +35,20 @@ from core.zero_trust import ZeroTrustGateway
 
 st.set_page_config(page_title="AI SecOps Demo", layout="wide")
 
+
+@st.cache_resource
+def incident_scheduler() -> IncidentScheduler:
+    """One planning worker pool per server process, shared by every session."""
+
+    commander = build_agent_registry(cache_ttl=300.0).get("IncidentCommanderAgent")
+    return IncidentScheduler(commander, workers=4, timeout=2.0).start()
+
+
 # ---------------------------------------------------------------------------
 # Session bootstrap
 # ---------------------------------------------------------------------------
 if "registry" not in st.session_state:
-    st.session_state.registry = build_agent_registry()
+    st.session_state.registry = build_agent_registry(cache_ttl=300.0)
     st.session_state.commander = st.session_state.registry.get("IncidentCommanderAgent")
 
 if "pipeline" not in st.session_state:
@@ -44,11 +56,35 @@ if "pipeline" not in st.session_state:
     bootstrap_pipeline(pipeline, sample_size=15)
     st.session_state.pipeline = pipeline
 
+if "threat_summary" not in st.session_state:
+    st.session_state.threat_summary = ThreatSummaryAggregator(window=3600)
+
+if "incident_index" not in st.session_state:
+    st.session_state.incident_index = TopKIncidentIndex(k=25)
+
+# anchored to the checkout so every session resolves the same snapshot whatever the working directory
+VECTOR_SNAPSHOT = Path(__file__).resolve().parent / "data" / "intel_vectors"
+
+
+@st.cache_resource
+def vector_snapshot() -> Path:
+    """Publish the seed intel snapshot once per server process, before any session loads it."""
+
+    if VectorStore.snapshot_dir(VECTOR_SNAPSHOT) is None:
+        store = VectorStore()
+        store.add_texts(
+            ["ransomware", "lateral"],
+            ["Ransomware T1486 encryption patterns", "Lateral movement credential abuse"],
+            [{"ttp": "T1486"}, {"ttp": "T1021"}],
+        )
+        store.save(VECTOR_SNAPSHOT)
+        store.close()
+    return VECTOR_SNAPSHOT
+
+
 if "vector_store" not in st.session_state:
-    store = VectorStore()
-    store.add("ransomware", "Ransomware T1486 encryption patterns", {"ttp": "T1486"})
-    store.add("lateral", "Lateral movement credential abuse", {"ttp": "T1021"})
-    st.session_state.vector_store = store
+    # sessions map the same snapshot read-only instead of re-embedding the corpus
+    st.session_state.vector_store = VectorStore.load(vector_snapshot())
 
 if "ledger" not in st.session_state:
     st.session_state.ledger = AuditLedger()
@@ -83,9 +119,11 @@ if st.sidebar.button("Record Change") and new_change:
 for _ in range(3):
     st.session_state.pipeline.publish("threat-events", simulate_threat_event())
 
-messages = st.session_state.pipeline.drain()
+messages = st.session_state.pipeline.poll_batch()
 enriched = process_stream(messages)
-summary = derive_threat_summary(enriched)
+st.session_state.threat_summary.update_many(enriched)
+st.session_state.incident_index.update_many(enriched)
+summary = st.session_state.threat_summary.snapshot()
 
 st.title("Future-Ready AI SecOps Platform")
 
@@ -95,8 +133,9 @@ col2.metric("Medium Severity", summary.get("medium", 0))
 col3.metric("Low Severity", summary.get("low", 0))
 col4.metric("Average Risk", summary.get("average_risk", 0.0))
 
-if enriched:
-    enriched_df = pd.DataFrame(enriched)
+top_incidents = st.session_state.incident_index.top()
+if top_incidents:
+    enriched_df = pd.DataFrame(top_incidents)
     st.subheader("Unified Threat Timeline")
     st.dataframe(enriched_df)
 
@@ -107,18 +146,29 @@ st.subheader("Ask SecOps - Autonomous Orchestration")
 question = st.text_input("Pose a question or incident description", "Investigate anomalous Okta logins")
 if st.button("Run Playbook"):
     incident = {"description": question, "priority": "high", "indicators": ["okta", "login"], "anomaly_score": 0.92}
-    commander: IncidentCommanderAgent = st.session_state.commander
-    plan = commander.coordinate(incident)
-    st.json(plan)
-    st.session_state.ledger.append({"event": f"plan:{plan['recommendation']}"})
+    # plans run on the shared scheduler's workers instead of the Streamlit script thread
+    future = incident_scheduler().submit(incident)
+    try:
+        plan = future.result(timeout=10.0)
+    except SchedulerOverloadedError as exc:
+        st.warning(f"Playbook deferred: {exc}")
+    except FutureTimeoutError:
+        future.cancel()
+        st.warning("Playbook is still being planned; try again shortly.")
+    else:
+        st.json(plan)
+        st.session_state.ledger.append({"event": f"plan:{plan['recommendation']}"})
 
 # ---------------------------------------------------------------------------
 # Vector intelligence search
 # ---------------------------------------------------------------------------
 st.subheader("Threat Intelligence Search")
 query = st.text_input("Search TTPs", "lateral movement")
-results = st.session_state.vector_store.search(query)
+ttp_filter = st.text_input("Filter by TTP (optional)", "")
+filters = {"ttp": ttp_filter.strip()} if ttp_filter.strip() else None
+results = st.session_state.vector_store.hybrid_search(query, filters=filters)
 st.write(results)
+st.caption(f"Embedding cache: {st.session_state.vector_store.embeddings.stats()}")
 
 # ---------------------------------------------------------------------------
 # Zero-trust view
@@ -206,10 +256,7 @@ st.write({"shap": shap_result, "lime": lime_result})
 # Self-healing triggers
 # ---------------------------------------------------------------------------
 st.subheader("Self-Healing Automation")
-if enriched:
-    top_risk = max(event.get("risk_score", 0.0) for event in enriched)
-else:
-    top_risk = 0.0
+top_risk = st.session_state.incident_index.max_score()
 st.write(evaluate_exploit_detection(top_risk))
 st.write(predictive_patching(vuln_score=0.87))
 
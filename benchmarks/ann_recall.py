@@ -0,0 +1,70 @@
+"""Compare IVF approximate search against exact search on the vector store.
+
+Run from the repository root::
+
+    python -m benchmarks.ann_recall --size 1000000 --nprobe 1 4 8 16 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List, Set
+
+import numpy as np
+
+from core.vector_store import DIMENSIONS, VectorStore
+
+
+def clustered_vectors(size: int, clusters: int, spread: float, seed: int) -> np.ndarray:
+    """Draw vectors around random cluster centres, like embeddings of related TTPs/IOCs."""
+
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, DIMENSIONS))
+    labels = rng.integers(0, clusters, size=size)
+    return (centres[labels] + spread * rng.normal(size=(size, DIMENSIONS))).astype(np.float32)
+
+
+def recall(found: List[List[dict]], truth: List[Set[str]]) -> float:
+    hits = sum(len({item["key"] for item in result} & expected) for result, expected in zip(found, truth))
+    return hits / max(sum(len(expected) for expected in truth), 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=2_000)
+    parser.add_argument("--spread", type=float, default=0.35)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = clustered_vectors(args.size + args.queries, args.clusters, args.spread, args.seed)
+    queries, corpus = vectors[: args.queries], vectors[args.queries :]
+    store = VectorStore(capacity=args.size)
+    start = time.perf_counter()
+    store.add_vectors([f"ioc-{row}" for row in range(args.size)], corpus)
+    print(f"loaded {args.size} vectors in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    exact = store.search_vectors(queries, args.k)
+    exact_ms = (time.perf_counter() - start) * 1000 / args.queries
+    truth = [{item["key"] for item in result} for result in exact]
+
+    start = time.perf_counter()
+    index = store.build_index(nlist=args.nlist)
+    print(f"trained IVF with {index.nlist} lists in {time.perf_counter() - start:.2f}s")
+    print(f"{'mode':<12}{'ms/query':>10}{f'recall@{args.k}':>12}")
+    print(f"{'exact':<12}{exact_ms:>10.3f}{1.0:>12.3f}")
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        found = [store.search_vectors(query, args.k, nprobe=nprobe)[0] for query in queries]
+        elapsed = (time.perf_counter() - start) * 1000 / args.queries
+        print(f"{f'nprobe={nprobe}':<12}{elapsed:>10.3f}{recall(found, truth):>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
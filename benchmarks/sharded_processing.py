@@ -0,0 +1,64 @@
+"""Measure how sharded stream processing scales with worker processes.
+
+Run from the repository root::
+
+    python -m benchmarks.sharded_processing --events 400000 --workers 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from core.kafka_pipeline import TopicMessage
+from core.load_generator import LoadGenerator
+from core.secops_stream_processor import process_stream, process_stream_sharded
+
+
+def build_messages(events: int, seed: int, cardinality: int) -> List[TopicMessage]:
+    """Generate a reproducible mixed-topic workload."""
+
+    generator = LoadGenerator(seed=seed, key_cardinality=cardinality, join_rate=0.5)
+    return [
+        TopicMessage(topic=batch.topic, value=record)
+        for batch in generator.mixed(events)
+        for record in batch.to_records()
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--cardinality", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    messages = build_messages(args.events, args.seed, args.cardinality)
+    start = time.perf_counter()
+    baseline = process_stream(messages)
+    single = time.perf_counter() - start
+    print(f"{len(messages)} messages -> {len(baseline)} incidents on {os.cpu_count()} cores")
+    print(f"{'mode':<14}{'best s':>10}{'events/s':>14}{'speed-up':>10}")
+    print(f"{'inline':<14}{single:>10.3f}{len(messages) / single:>14,.0f}{1.0:>10.2f}")
+
+    for workers in sorted(set(args.workers) - {0, 1}):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            process_stream_sharded(messages[:10_000], shards=workers, executor=pool, min_batch=0)  # warm up
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = process_stream_sharded(messages, shards=workers, executor=pool, min_batch=0)
+                timings.append(time.perf_counter() - start)
+        if result != baseline:
+            raise SystemExit(f"sharded result with {workers} workers differs from process_stream")
+        best = min(timings)
+        print(f"{f'{workers} workers':<14}{best:>10.3f}{len(messages) / best:>14,.0f}{single / best:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
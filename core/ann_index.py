@@ -0,0 +1,155 @@
+"""Inverted-file (IVF) approximate nearest-neighbour index for the vector store."""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+import numpy as np
+
+_ASSIGN_CHUNK = 65_536
+
+
+class IVFIndex:
+    """Coarse k-means quantiser with one inverted list of row ids per centroid.
+
+    Vectors are expected to be unit length, so clustering and probing use the
+    inner product (spherical k-means). A query scans only the ``nprobe``
+    lists whose centroids are closest; raising ``nprobe`` trades latency for
+    recall, up to exact search at ``nprobe == nlist``. Inserts are assigned to
+    the nearest existing centroid without retraining.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        nlist: int = 256,
+        nprobe: int = 8,
+        iterations: int = 10,
+        sample_per_list: int = 64,
+        seed: int = 0,
+    ) -> None:
+        if nlist < 1 or nprobe < 1:
+            raise ValueError("nlist and nprobe must be positive")
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.sample_per_list = sample_per_list
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._assignment = np.full(0, -1, dtype=np.int64)
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def _nearest(self, vectors: np.ndarray) -> np.ndarray:
+        assert self.centroids is not None
+        labels = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), _ASSIGN_CHUNK):
+            chunk = vectors[start : start + _ASSIGN_CHUNK]
+            labels[start : start + len(chunk)] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return labels
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Fit the centroids with spherical k-means on a sample of ``vectors``."""
+
+        if len(vectors) == 0:
+            raise ValueError("Cannot train an IVF index without vectors")
+        rng = np.random.default_rng(self.seed)
+        self.nlist = min(self.nlist, len(vectors))
+        sample_size = min(len(vectors), self.nlist * self.sample_per_list)
+        sample = vectors[rng.choice(len(vectors), size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=self.nlist, replace=False)].copy()
+        for _ in range(self.iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            if empty.any():  # reseed empty clusters from random sample points
+                sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+                norms[empty] = np.linalg.norm(sums[empty], axis=1, keepdims=True)
+            centroids = sums / np.where(norms == 0, 1.0, norms)
+        self.centroids = centroids.astype(np.float32)
+        self._lists = [np.empty(16, dtype=np.int64) for _ in range(self.nlist)]
+        self._counts = np.zeros(self.nlist, dtype=np.int64)
+        self._assignment = np.full(0, -1, dtype=np.int64)
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """Insert row ids with their vectors, moving rows that were re-added."""
+
+        if self.centroids is None:
+            raise ValueError("Train the index before adding vectors")
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) and rows.max() >= len(self._assignment):
+            grown = np.full(max(rows.max() + 1, 2 * len(self._assignment)), -1, dtype=np.int64)
+            grown[: len(self._assignment)] = self._assignment
+            self._assignment = grown
+        self.remove(rows[self._assignment[rows] >= 0])
+        labels = self._nearest(vectors)
+        self._assignment[rows] = labels
+        order = np.argsort(labels, kind="stable")
+        bounds = np.flatnonzero(np.diff(labels[order])) + 1
+        for group in np.split(order, bounds):
+            if len(group):
+                self._append(int(labels[group[0]]), rows[group])
+
+    def _append(self, label: int, rows: np.ndarray) -> None:
+        count = self._counts[label]
+        block = self._lists[label]
+        if count + len(rows) > len(block):
+            grown = np.empty(max(2 * len(block), count + len(rows)), dtype=np.int64)
+            grown[:count] = block[:count]
+            block = self._lists[label] = grown
+        block[count : count + len(rows)] = rows
+        self._counts[label] = count + len(rows)
+
+    def remove(self, rows: np.ndarray) -> None:
+        """Drop row ids from their inverted lists."""
+
+        for row in np.asarray(rows, dtype=np.int64).tolist():
+            label = int(self._assignment[row]) if row < len(self._assignment) else -1
+            if label < 0:
+                continue
+            count = self._counts[label]
+            block = self._lists[label]
+            position = int(np.flatnonzero(block[:count] == row)[0])
+            block[position : count - 1] = block[position + 1 : count]
+            self._counts[label] = count - 1
+            self._assignment[row] = -1
+
+    def remap(self, mapping: np.ndarray) -> None:
+        """Renumber rows after the store compacts; ``mapping[old]`` is ``-1`` for dropped rows."""
+
+        for label in range(self.nlist):
+            rows = mapping[self._lists[label][: self._counts[label]]]
+            rows = rows[rows >= 0]
+            self._lists[label][: len(rows)] = rows
+            self._counts[label] = len(rows)
+        assignment = np.full(max(int(mapping.max()) + 1, 0), -1, dtype=np.int64)
+        kept = np.flatnonzero(mapping >= 0)
+        kept = kept[kept < len(self._assignment)]
+        assignment[mapping[kept]] = self._assignment[kept]
+        self._assignment = assignment
+
+    def candidates(self, queries: np.ndarray, nprobe: Optional[int] = None) -> List[np.ndarray]:
+        """Return the row ids stored in the ``nprobe`` closest lists of each query."""
+
+        if self.centroids is None:
+            raise ValueError("Train the index before searching")
+        probe = min(nprobe or self.nprobe, self.nlist)
+        similarity = queries @ self.centroids.T
+        if probe < self.nlist:
+            lists = np.argpartition(-similarity, probe - 1, axis=1)[:, :probe]
+        else:
+            lists = np.broadcast_to(np.arange(self.nlist), similarity.shape)
+        return [
+            np.concatenate([self._lists[label][: self._counts[label]] for label in labels.tolist()])
+            for labels in lists
+        ]
+
+    def __len__(self) -> int:
+        return int(self._counts.sum())
@@ -3,62 +3,659 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
+import functools
 import json
-from typing import Any, AsyncIterator, Dict, List
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
 
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from .kafka_pipeline import KafkaPipeline, bootstrap_pipeline
-from .secops_stream_processor import process_stream
+from .codec import TOPIC_SCHEMAS, pack_rows
+from .kafka_pipeline import BackpressureError, KafkaPipeline, bootstrap_pipeline
+from .metrics import REGISTRY, pipeline_collector
+from .secops_stream_processor import SEVERITY_LEVELS, process_stream
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+TOPIC_FIELDS = {"threat-events": "signals", "policy-audit": "policy", "intel-feed": "intel"}
+Frame = Union[str, bytes]
+# severity rank, topics, tenants, sources
+IncidentFacts = Tuple[int, Set[str], Set[str], Set[str]]
+# incident, its facts and its JSON encoding
+IncidentRow = Tuple[Dict[str, Any], IncidentFacts, str]
+_FANOUT_LATENCY = REGISTRY.histogram(
+    "secops_broadcast_fanout_seconds", "Time to filter, serialize and queue one broadcast batch."
+)
+_FRAMES_QUEUED = REGISTRY.counter("secops_ws_frames_queued", "Frames handed to WebSocket client queues.")
+_FRAMES_DROPPED = REGISTRY.counter(
+    "secops_ws_frames_dropped", "Frames discarded by the slow-consumer policy.", ["policy"]
+)
+_INGESTED = REGISTRY.counter("secops_ingest_records", "Records received on the ingest endpoint.", ["outcome"])
+_FIELD_TYPES = {"str": (str,), "f64": (float, int), "bool": (bool,)}
+_WHITESPACE = " \t\r\n"
+
+
+async def iter_json_records(chunks: AsyncIterator[bytes], ndjson: bool = True) -> AsyncIterator[Tuple[int, Any]]:
+    """Incrementally decode NDJSON lines or the elements of one JSON array.
+
+    Only the current partial record is buffered. A malformed NDJSON line is
+    yielded as a ``ValueError`` so it can be rejected on its own; a malformed
+    array cannot be resynchronised and raises ``ValueError`` instead.
+    """
+
+    index = 0
+    if ndjson:
+        pending = b""
+        async for chunk in chunks:
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    try:
+                        yield index, json.loads(line)
+                    except ValueError as exc:
+                        yield index, exc
+                    index += 1
+        if pending.strip():
+            try:
+                yield index, json.loads(pending)
+            except ValueError as exc:
+                yield index, exc
+        return
+
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer, opened, closed, final = "", False, False, False
+    stream = chunks.__aiter__()
+    while not closed:
+        try:
+            buffer += text.decode(await stream.__anext__())
+        except StopAsyncIteration:
+            buffer += text.decode(b"", final=True)
+            final = True
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE + ("," if opened else ""):
+                position += 1
+            if position == len(buffer):
+                break
+            if not opened:
+                if buffer[position] != "[":
+                    raise ValueError("Batched payload must be a JSON array")
+                opened, position = True, position + 1
+                continue
+            if buffer[position] == "]":
+                closed = True
+                break
+            try:
+                value, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError(f"Malformed JSON array element {index}") from None
+                break
+            yield index, value
+            index += 1
+        buffer = buffer[position:]
+        if final and not closed:
+            raise ValueError("Unterminated JSON array")
+
+
+def validate_record(topic: str, value: Any) -> Optional[str]:
+    """Return why ``value`` cannot be published to ``topic``, or ``None`` if it can."""
+
+    if isinstance(value, Exception):
+        return f"invalid JSON: {value}"
+    if not isinstance(value, dict) or not value:
+        return "expected a non-empty JSON object"
+    for name, kind in TOPIC_SCHEMAS.get(topic, ()):
+        field_value = value.get(name)
+        if field_value is None:
+            continue
+        if isinstance(field_value, bool) and kind != "bool" or not isinstance(field_value, _FIELD_TYPES[kind]):
+            return f"field {name!r} must be {kind}"
+    return None
+
+
+def incident_facts(incident: Dict[str, Any]) -> IncidentFacts:
+    """Extract the attributes subscriptions filter on from an enriched incident."""
+
+    severity = incident.get("severity")
+    rank = SEVERITY_LEVELS.index(severity) if severity in SEVERITY_LEVELS else -1
+    topics: Set[str] = set()
+    tenants: Set[str] = set()
+    sources: Set[str] = set()
+    for topic, field_name in TOPIC_FIELDS.items():
+        records = incident.get(field_name) or []
+        if records:
+            topics.add(topic)
+        for record in records:
+            if record.get("tenant") is not None:
+                tenants.add(str(record["tenant"]))
+            if record.get("source") is not None:
+                sources.add(str(record["source"]))
+    return rank, topics, tenants, sources
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """Filter a client registers by sending a ``{"subscribe": {...}}`` message.
+
+    ``None`` fields match everything; clients with equal subscriptions share
+    one filter evaluation, delta state and serialized frame per batch.
+    """
+
+    topics: Optional[FrozenSet[str]] = None
+    min_severity: Optional[str] = None
+    tenants: Optional[FrozenSet[str]] = None
+    sources: Optional[FrozenSet[str]] = None
+    compress: bool = False
+
+    @classmethod
+    def parse(cls, message: str) -> "Subscription":
+        """Build a subscription from a client message, raising ``ValueError`` if invalid."""
+
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError as exc:
+            raise ValueError("Subscription message must be JSON") from exc
+        if isinstance(data, dict):
+            data = data.get("subscribe", data)
+        if not isinstance(data, dict):
+            raise ValueError("Subscription message must be a JSON object")
+
+        def names(key: str) -> Optional[FrozenSet[str]]:
+            value = data.get(key)
+            if value is None:
+                return None
+            if isinstance(value, str):
+                return frozenset([value])
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValueError(f"{key} must be a string or a list of strings")
+            return frozenset(value)
+
+        topics = names("topics")
+        if topics is not None and not topics <= TOPIC_FIELDS.keys():
+            raise ValueError(f"Unknown topics {sorted(topics - TOPIC_FIELDS.keys())}")
+        min_severity = data.get("min_severity")
+        if min_severity is not None and (not isinstance(min_severity, str) or min_severity not in SEVERITY_LEVELS):
+            raise ValueError(f"Unknown severity {min_severity}")
+        compress = data.get("compress", False)
+        if not isinstance(compress, bool):
+            raise ValueError("compress must be true or false")
+        return cls(topics, min_severity, names("tenant"), names("source"), compress)
+
+    def matches(self, facts: IncidentFacts) -> bool:
+        """Return whether an incident with ``facts`` passes this filter."""
+
+        rank, topics, tenants, sources = facts
+        if self.min_severity is not None and rank < SEVERITY_LEVELS.index(self.min_severity):
+            return False
+        if self.topics is not None and self.topics.isdisjoint(topics):
+            return False
+        if self.tenants is not None and self.tenants.isdisjoint(tenants):
+            return False
+        return self.sources is None or not self.sources.isdisjoint(sources)
+
+
+class SubscriptionGroup:
+    """Clients sharing one subscription plus the incidents already sent to them.
+
+    Up to ``max_tracked`` incident fingerprints are remembered (least recently
+    changed first out) so only new or changed incidents are pushed again.
+    """
+
+    def __init__(self, subscription: Subscription, max_tracked: int = 10_000) -> None:
+        self.subscription = subscription
+        self.max_tracked = max_tracked
+        self.clients: Set["ClientSession"] = set()
+        self._sent: "OrderedDict[str, int]" = OrderedDict()
+
+    def delta(self, incidents: List[IncidentRow], matching: Optional[List[int]] = None) -> List[int]:
+        """Return positions of incidents that match and differ from what was sent.
+
+        ``matching`` lists the positions already known to pass the filter,
+        e.g. from a :class:`SubscriptionIndex`; otherwise every row is checked.
+        """
+
+        if matching is None:
+            matching = [position for position, row in enumerate(incidents) if self.subscription.matches(row[1])]
+        selected: List[int] = []
+        for position in matching:
+            incident, _, encoded = incidents[position]
+            key = str(incident.get("id"))
+            fingerprint = hash(encoded)
+            if self._sent.get(key) == fingerprint:
+                continue
+            self._sent[key] = fingerprint
+            self._sent.move_to_end(key)
+            if len(self._sent) > self.max_tracked:
+                self._sent.popitem(last=False)
+            selected.append(position)
+        return selected
+
+
+class SubscriptionIndex:
+    """Posting sets of subscriptions per filter field and accepted value.
+
+    Subscriptions leaving a field open sit in that field's wildcard set. The
+    subscriptions an incident matches are, per field, the union of the
+    postings for its values and the wildcards, intersected across fields from
+    the most selective one, so publishing costs the matching groups rather
+    than all of them.
+    """
+
+    _FIELDS = ("min_severity", "topics", "tenants", "sources")
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[Any, Set[Subscription]]] = {name: {} for name in self._FIELDS}
+        self._open: Dict[str, Set[Subscription]] = {name: set() for name in self._FIELDS}
+
+    @staticmethod
+    def _values(subscription: Subscription, name: str) -> Optional[FrozenSet[Any]]:
+        if name == "min_severity":
+            level = subscription.min_severity
+            return None if level is None else frozenset([SEVERITY_LEVELS.index(level)])
+        return getattr(subscription, name)
+
+    def add(self, subscription: Subscription) -> None:
+        for name in self._FIELDS:
+            values = self._values(subscription, name)
+            if values is None:
+                self._open[name].add(subscription)
+                continue
+            for value in values:
+                self._postings[name].setdefault(value, set()).add(subscription)
+
+    def remove(self, subscription: Subscription) -> None:
+        for name in self._FIELDS:
+            values = self._values(subscription, name)
+            if values is None:
+                self._open[name].discard(subscription)
+                continue
+            postings = self._postings[name]
+            for value in values:
+                postings[value].discard(subscription)
+                if not postings[value]:
+                    del postings[value]
+
+    def _accepting(self, name: str, values: Iterable[Any]) -> Set[Subscription]:
+        postings = self._postings[name]
+        sets = [self._open[name]] + [postings[value] for value in values if value in postings]
+        return sets[0] if len(sets) == 1 else set().union(*sets)
+
+    def matches(self, facts: IncidentFacts) -> Set[Subscription]:
+        """Return the subscriptions an incident with ``facts`` passes."""
+
+        rank, topics, tenants, sources = facts
+        candidates = [
+            self._accepting("min_severity", range(rank + 1)),
+            self._accepting("topics", topics),
+            self._accepting("tenants", tenants),
+            self._accepting("sources", sources),
+        ]
+        candidates.sort(key=len)  # intersect from the most selective field
+        return set(candidates[0]).intersection(*candidates[1:])
+
+
+@dataclass(frozen=True)
+class DeltaFrame:
+    """Incidents behind a delta frame, kept so a coalesced backlog can be re-encoded."""
+
+    rows: List[IncidentRow]
+    encode: Callable[[List[IncidentRow]], Frame]
+
+
+class ClientSession:
+    """Bounded outbound queue drained by a dedicated writer task.
+
+    :meth:`offer` never awaits, so one slow socket cannot hold up the
+    broadcast loop. When the queue is full the ``policy`` decides: drop the
+    oldest frame, coalesce the backlog, or disconnect the client. Coalescing
+    merges the queued delta frames into one frame holding the latest version
+    of every incident, since the subscription group already counts those
+    incidents as sent.
+    """
+
+    def __init__(self, websocket: WebSocket, maxsize: int = 100, policy: str = "drop_oldest") -> None:
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy {policy}")
+        self.websocket = websocket
+        self.subscription = Subscription()
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self._queue: Deque[Tuple[Frame, Optional[DeltaFrame]]] = deque()
+        self._ready = asyncio.Event()
+        self._evicted = False
+        self.task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> None:
+        """Spawn the writer task on the running loop."""
+
+        self.task = asyncio.create_task(self._writer())
+
+    def offer(self, frame: Frame, delta: Optional[DeltaFrame] = None) -> bool:
+        """Queue a serialized frame, applying the slow-consumer policy.
+
+        ``delta`` carries the incidents of a delta frame so ``coalesce`` can
+        merge it with the backlog instead of losing them.
+        """
+
+        if self.closed:
+            return False
+        if len(self._queue) >= self.maxsize:
+            if self.policy == "disconnect":
+                self._evicted = True
+                _FRAMES_DROPPED.labels(self.policy).inc(len(self._queue) + 1)
+                self.close()
+                return False
+            if self.policy == "coalesce":
+                discarded = len(self._queue)
+                frame, delta = self._coalesce(frame, delta)
+            else:
+                discarded = 1
+                self._queue.popleft()
+            self.dropped += discarded
+            _FRAMES_DROPPED.labels(self.policy).inc(discarded)
+        self._queue.append((frame, delta))
+        self._ready.set()
+        return True
+
+    def _coalesce(self, frame: Frame, delta: Optional[DeltaFrame]) -> Tuple[Frame, Optional[DeltaFrame]]:
+        """Collapse the backlog, merging delta frames by incident id (newest wins)."""
+
+        pending = [queued for _, queued in self._queue if queued is not None]
+        self._queue.clear()
+        if delta is not None:
+            pending.append(delta)
+        if not pending:
+            return frame, delta
+        merged: "OrderedDict[str, IncidentRow]" = OrderedDict()
+        for queued in pending:
+            for row in queued.rows:
+                key = str(row[0].get("id"))
+                merged.pop(key, None)
+                merged[key] = row
+        combined = DeltaFrame(list(merged.values()), pending[-1].encode)
+        if delta is not None:
+            return combined.encode(combined.rows), combined
+        # the new frame is not a delta (e.g. an error); keep the merged backlog ahead of it
+        self._queue.append((combined.encode(combined.rows), combined))
+        return frame, delta
+
+    def close(self) -> None:
+        """Stop the writer once it wakes; pending frames are discarded."""
+
+        self.closed = True
+        self._queue.clear()
+        self._ready.set()
+
+    async def _writer(self) -> None:
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._queue and not self.closed:
+                    frame, _ = self._queue.popleft()
+                    if isinstance(frame, bytes):
+                        await self.websocket.send_bytes(frame)
+                    else:
+                        await self.websocket.send_text(frame)
+            if self._evicted:
+                await self.websocket.close(code=1013)
+        except Exception:  # pragma: no cover - network disconnect
+            pass
+        finally:
+            self.closed = True
 
 
 class SecOpsBackend:
     """Manage state shared between the FastAPI app and Streamlit frontend."""
 
-    def __init__(self) -> None:
-        self.pipeline = KafkaPipeline()
-        bootstrap_pipeline(self.pipeline, sample_size=5)
-        self.listeners: List[WebSocket] = []
+    def __init__(
+        self,
+        pipeline: Optional[KafkaPipeline] = None,
+        group: str = "secops-api",
+        max_batch: int = 500,
+        max_wait_ms: int = 50,
+        wire_format: str = "json",
+        queue_size: int = 100,
+        slow_consumer: str = "drop_oldest",
+        max_tracked: int = 10_000,
+        ingest_batch: int = 1000,
+    ) -> None:
+        if wire_format not in ("json", "binary"):
+            raise ValueError(f"Unknown wire format {wire_format}")
+        if slow_consumer not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy {slow_consumer}")
+        if pipeline is None:
+            pipeline = KafkaPipeline()
+            bootstrap_pipeline(pipeline, sample_size=5)
+        self.pipeline = pipeline
+        self.group = group
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.wire_format = wire_format
+        self.queue_size = queue_size
+        self.slow_consumer = slow_consumer
+        self.max_tracked = max_tracked
+        self.ingest_batch = ingest_batch
+        self.clients: Dict[WebSocket, ClientSession] = {}
+        self.groups: Dict[Subscription, SubscriptionGroup] = {}
+        self._index = SubscriptionIndex()
+
+    @property
+    def listeners(self) -> List[WebSocket]:
+        """Return the currently connected sockets."""
+
+        return list(self.clients)
+
+    def _join(self, client: ClientSession, subscription: Subscription) -> None:
+        self._leave(client)
+        client.subscription = subscription
+        group = self.groups.get(subscription)
+        if group is None:
+            group = self.groups[subscription] = SubscriptionGroup(subscription, self.max_tracked)
+            self._index.add(subscription)
+        group.clients.add(client)
+
+    def _leave(self, client: ClientSession) -> None:
+        group = self.groups.get(client.subscription)
+        if group is not None:
+            group.clients.discard(client)
+            if not group.clients:
+                del self.groups[client.subscription]
+                self._index.remove(client.subscription)
+
+    def subscribe(self, websocket: WebSocket, message: str) -> Subscription:
+        """Apply a subscription message sent by a connected client.
+
+        Invalid messages are answered with an ``{"error": ...}`` frame and
+        leave the current subscription untouched.
+        """
+
+        client = self.clients[websocket]
+        try:
+            subscription = Subscription.parse(message)
+        except ValueError as exc:
+            client.offer(json.dumps({"error": str(exc)}))
+            return client.subscription
+        self._join(client, subscription)
+        return subscription
+
+    def publish_incidents(self, enriched: List[Dict[str, Any]]) -> int:
+        """Push new or changed incidents to each subscription group.
+
+        Every incident is serialized and inspected once, and the
+        :class:`SubscriptionIndex` routes it to the groups whose filter it
+        passes; each group then builds a single frame from the pieces it
+        selected and shares it between its clients. Returns the number of
+        frames queued.
+        """
+
+        with _FANOUT_LATENCY.time():
+            incidents = [(incident, incident_facts(incident), json.dumps(incident)) for incident in enriched]
+            matching: Dict[Subscription, List[int]] = {}
+            for position, (_, facts, _) in enumerate(incidents):
+                for subscription in self._index.matches(facts):
+                    matching.setdefault(subscription, []).append(position)
+            queued = 0
+            for subscription, positions in matching.items():
+                group = self.groups[subscription]
+                selected = group.delta(incidents, positions)
+                if not selected:
+                    continue
+                rows = [incidents[position] for position in selected]
+                delta = DeltaFrame(rows, functools.partial(self._encode, compress=group.subscription.compress))
+                frame = delta.encode(rows)
+                queued += sum(client.offer(frame, delta) for client in list(group.clients))
+        _FRAMES_QUEUED.inc(queued)
+        return queued
+
+    def _encode(self, rows: List[IncidentRow], compress: bool = False) -> Frame:
+        """Serialize incident rows in the backend's wire format."""
+
+        if self.wire_format == "binary":
+            frame: Frame = pack_rows([row[0] for row in rows])
+        else:
+            frame = "[" + ",".join(row[2] for row in rows) + "]"
+        if compress:
+            frame = zlib.compress(frame.encode() if isinstance(frame, str) else frame)
+        return frame
+
+    async def ingest(
+        self, topic: str, chunks: AsyncIterator[bytes], ndjson: bool = True, max_errors: int = 100
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Validate and publish a streamed request body in batches.
+
+        Returns an HTTP status and a report with one ack per published batch,
+        the rejected records (first ``max_errors`` with reasons) and the
+        backpressure state. Publishing runs in a worker thread so a blocking
+        overflow policy never stalls the event loop. On ``BackpressureError``
+        ingestion stops with status 429; records from the batch in flight may
+        be partially published, so clients should retry idempotently.
+        Topics without a schema that the pipeline does not already host are
+        refused with status 404 so clients cannot create topics at will.
+        """
+
+        if topic not in TOPIC_SCHEMAS and topic not in self.pipeline.topics:
+            return 404, {"status": "unknown_topic", "error": f"Unknown topic {topic}"}
+        acks: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+        rejected = 0
+        batch: List[Dict[str, Any]] = []
+        report: Dict[str, Any] = {"status": "ok"}
+        status = 200
+
+        async def flush() -> None:
+            messages = await asyncio.to_thread(self.pipeline.publish_batch, topic, batch)
+            partitions: Dict[int, List[int]] = {}
+            for message in messages:
+                partitions.setdefault(message.partition, []).append(message.offset)
+            acks.append(
+                {
+                    "batch": len(acks),
+                    "published": len(messages),
+                    "offsets": {str(key): [min(value), max(value)] for key, value in sorted(partitions.items())},
+                }
+            )
+            batch.clear()
+
+        try:
+            async for index, value in iter_json_records(chunks, ndjson):
+                problem = validate_record(topic, value)
+                if problem is not None:
+                    rejected += 1
+                    if len(errors) < max_errors:
+                        errors.append({"record": index, "error": problem})
+                    continue
+                batch.append(value)
+                if len(batch) >= self.ingest_batch:
+                    await flush()
+            if batch:
+                await flush()
+        except BackpressureError as exc:
+            report.update(status="backpressure", error=str(exc))
+            status = 429
+        except ValueError as exc:
+            report.update(status="invalid", error=str(exc))
+            status = 400
+        published = sum(ack["published"] for ack in acks)
+        _INGESTED.labels("published").inc(published)
+        _INGESTED.labels("rejected").inc(rejected)
+        report.update(
+            published=published,
+            rejected=rejected,
+            batches=acks,
+            errors=errors,
+            lag=self.pipeline.lag(self.group).get(topic, 0),
+        )
+        return status, report
 
     async def broadcast(self) -> None:
         """Continuously process pipeline events and publish to connected clients."""
 
-        while True:
-            events = self.pipeline.drain()
-            if events:
-                enriched = process_stream(events)
-                payload = json.dumps(enriched)
-                for socket in list(self.listeners):
-                    await socket.send_text(payload)
-            await asyncio.sleep(1)
+        async for events in self.pipeline.stream(self.group, max_batch=self.max_batch, max_wait_ms=self.max_wait_ms):
+            self.publish_incidents(process_stream(events))
 
-    async def register(self, websocket: WebSocket) -> AsyncIterator[None]:
-        """Context manager for WebSocket clients."""
+    async def register(self, websocket: WebSocket) -> AsyncIterator[str]:
+        """Serve one WebSocket client, yielding the text messages it sends."""
 
         await websocket.accept()
-        self.listeners.append(websocket)
+        client = ClientSession(websocket, self.queue_size, self.slow_consumer)
+        client.start()
+        self.clients[websocket] = client
+        self._join(client, client.subscription)
         try:
-            while True:
-                await websocket.receive_text()
+            while not client.closed:
+                yield await websocket.receive_text()
         except Exception:  # pragma: no cover - network disconnect
             pass
         finally:
-            self.listeners.remove(websocket)
+            self.clients.pop(websocket, None)
+            self._leave(client)
+            client.close()
 
 
-def build_app() -> FastAPI:
+def build_app(pipeline: Optional[KafkaPipeline] = None) -> FastAPI:
     """Instantiate the FastAPI application for use in deployment."""
 
-    backend = SecOpsBackend()
+    backend = SecOpsBackend(pipeline)
     app = FastAPI(title="AI SecOps Backend")
+    collector = pipeline_collector(backend.pipeline)
+    clients = REGISTRY.gauge("secops_ws_clients", "Connected WebSocket clients.")
 
     @app.on_event("startup")
     async def _startup() -> None:
+        REGISTRY.register_collector(collector)
+        clients.set_function(lambda: len(backend.clients))
         asyncio.create_task(backend.broadcast())
 
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:
+        REGISTRY.unregister_collector(collector)
+
+    @app.get("/metrics")
+    async def metrics_endpoint() -> PlainTextResponse:
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    @app.post("/topics/{topic}/events")
+    async def ingest_endpoint(topic: str, request: Request) -> JSONResponse:
+        ndjson = not request.headers.get("content-type", "").startswith("application/json")
+        status, report = await backend.ingest(topic, request.stream(), ndjson=ndjson)
+        headers = {"Retry-After": "1"} if status == 429 else None
+        return JSONResponse(report, status_code=status, headers=headers)
+
     @app.websocket("/events")
     async def websocket_endpoint(websocket: WebSocket) -> None:  # pragma: no cover - websocket flow
-        async for _ in backend.register(websocket):
-            pass
+        async for message in backend.register(websocket):
+            backend.subscribe(websocket, message)
 
     return app
@@ -0,0 +1,288 @@
+"""Compact schema-aware binary wire format for bus, agent and incident records.
+
+Batches are encoded column by column: every field declared in a schema is
+packed into one typed array, strings are dictionary-encoded into a shared
+string table, and only keys outside the schema fall back to JSON. A frame is
+
+``magic | version | kind | count | string table | columns...``
+
+with every variable-length section prefixed by its byte length.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MAGIC = b"SB"
+VERSION = 1
+KIND_TOPIC = 1
+KIND_AGENT = 2
+KIND_ROWS = 3
+
+_HEADER = struct.Struct("<2sBBI")
+_LENGTH = struct.Struct("<I")
+_NO_KEY = 0xFFFFFFFF
+
+Schema = Tuple[Tuple[str, str], ...]
+
+_EVENT_FIELDS = (("event_id", "str"), ("event_time", "f64"), ("tenant", "str"))
+TOPIC_SCHEMAS: Dict[str, Schema] = {
+    "threat-events": (
+        ("id", "str"),
+        ("severity", "str"),
+        ("anomaly_score", "f64"),
+        ("source", "str"),
+        ("description", "str"),
+    )
+    + _EVENT_FIELDS,
+    "policy-audit": (("id", "str"), ("policy", "str"), ("passed", "bool"), ("asset", "str")) + _EVENT_FIELDS,
+    "intel-feed": (("id", "str"), ("source", "str"), ("risk", "f64"), ("ttp", "str")) + _EVENT_FIELDS,
+}
+AGENT_PAYLOAD_SCHEMA: Schema = (
+    ("agent", "str"),
+    ("action", "str"),
+    ("decision_score", "f64"),
+    ("notes", "str"),
+    ("priority", "str"),
+    ("description", "str"),
+    ("anomaly_score", "f64"),
+)
+INCIDENT_SCHEMA: Schema = (
+    ("id", "str"),
+    ("severity", "str"),
+    ("anomaly_score", "f64"),
+    ("risk_score", "f64"),
+)
+
+_KIND_TYPES = {"str": str, "f64": float, "bool": bool}
+
+
+class CodecError(ValueError):
+    """Raised when a frame is truncated or was produced by another format."""
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: memoryview) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class _Writer:
+    """Accumulate length-prefixed sections plus the shared string table."""
+
+    def __init__(self) -> None:
+        self.parts: List[bytes] = []
+        self.strings: Dict[str, int] = {}
+
+    def ref(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def section(self, data: bytes) -> None:
+        self.parts.append(_LENGTH.pack(len(data)))
+        self.parts.append(data)
+
+    def column(self, values: array) -> None:
+        self.section(_little_endian(values))
+
+    def rows(self, rows: Sequence[Dict[str, Any]], schema: Schema) -> None:
+        positions = {name: slot for slot, (name, _) in enumerate(schema)}
+        types = [_KIND_TYPES[kind] for _, kind in schema]
+        columns: List[List[Any]] = [[] for _ in schema]
+        masks = array("I")
+        extras: List[Tuple[int, Dict[str, Any]]] = []
+        for index, row in enumerate(rows):
+            mask = 0
+            extra: Optional[Dict[str, Any]] = None
+            for key, value in row.items():
+                slot = positions.get(key)
+                if slot is not None and type(value) is types[slot]:
+                    mask |= 1 << slot
+                    columns[slot].append(value)
+                else:
+                    if extra is None:
+                        extra = {}
+                    extra[key] = value
+            masks.append(mask)
+            if extra is not None:
+                extras.append((index, extra))
+        self.column(masks)
+        for (_, kind), values in zip(schema, columns):
+            if kind == "str":
+                self.column(array("I", [self.ref(value) for value in values]))
+            elif kind == "f64":
+                self.column(array("d", values))
+            else:
+                self.section(bytes(values))
+        self.section(json.dumps(extras, separators=(",", ":")).encode() if extras else b"")
+
+    def frame(self, kind: int, count: int) -> bytes:
+        encoded = [value.encode() for value in self.strings]
+        table = [
+            _LENGTH.pack(len(encoded)),
+            _little_endian(array("I", [len(value) for value in encoded])),
+            b"".join(encoded),
+        ]
+        return b"".join([_HEADER.pack(MAGIC, VERSION, kind, count), *table, *self.parts])
+
+
+class _Reader:
+    """Walk the sections of a frame produced by :class:`_Writer`."""
+
+    def __init__(self, data: bytes, kind: int) -> None:
+        self.view = memoryview(data)
+        try:
+            magic, version, found, self.count = _HEADER.unpack_from(self.view, 0)
+        except struct.error as exc:
+            raise CodecError("Truncated frame header") from exc
+        if magic != MAGIC or version != VERSION or found != kind:
+            raise CodecError(f"Unexpected frame {bytes(magic)!r} v{version} kind {found}")
+        self.position = _HEADER.size
+        (size,) = self._unpack(_LENGTH)
+        lengths = _from_little_endian("I", self._take(4 * size))
+        blob = self._take(sum(lengths))
+        self.strings: List[str] = []
+        start = 0
+        for length in lengths:
+            self.strings.append(str(blob[start : start + length], "utf-8"))
+            start += length
+
+    def _unpack(self, layout: struct.Struct) -> tuple:
+        try:
+            values = layout.unpack_from(self.view, self.position)
+        except struct.error as exc:
+            raise CodecError("Truncated frame") from exc
+        self.position += layout.size
+        return values
+
+    def _take(self, size: int) -> memoryview:
+        if self.position + size > len(self.view):
+            raise CodecError("Truncated frame")
+        chunk = self.view[self.position : self.position + size]
+        self.position += size
+        return chunk
+
+    def section(self) -> memoryview:
+        (size,) = self._unpack(_LENGTH)
+        return self._take(size)
+
+    def column(self, typecode: str) -> array:
+        return _from_little_endian(typecode, self.section())
+
+    def rows(self, count: int, schema: Schema) -> List[Dict[str, Any]]:
+        masks = self.column("I")
+        rows: List[Dict[str, Any]] = [{} for _ in range(count)]
+        strings = self.strings
+        for slot, (name, kind) in enumerate(schema):
+            if kind == "str":
+                values: Any = [strings[index] for index in self.column("I")]
+            elif kind == "f64":
+                values = self.column("d")
+            else:
+                values = [byte == 1 for byte in self.section()]
+            if not values:
+                continue
+            if len(values) == count:
+                for row, value in zip(rows, values):
+                    row[name] = value
+                continue
+            bit = 1 << slot
+            cursor = iter(values)
+            for row, mask in zip(rows, masks):
+                if mask & bit:
+                    row[name] = next(cursor)
+        extras = self.section()
+        if extras:
+            for index, extra in json.loads(bytes(extras)):
+                rows[index].update(extra)
+        return rows
+
+
+def pack_rows(rows: Sequence[Dict[str, Any]], schema: Schema = INCIDENT_SCHEMA) -> bytes:
+    """Encode a batch of flat dictionaries, e.g. enriched incidents."""
+
+    writer = _Writer()
+    writer.rows(rows, schema)
+    return writer.frame(KIND_ROWS, len(rows))
+
+
+def unpack_rows(data: bytes, schema: Schema = INCIDENT_SCHEMA) -> List[Dict[str, Any]]:
+    """Decode a frame produced by :func:`pack_rows` with the same schema."""
+
+    reader = _Reader(data, KIND_ROWS)
+    return reader.rows(reader.count, schema)
+
+
+def pack_topic_messages(
+    records: Sequence[Tuple[str, Optional[str], float, int, int, Dict[str, Any]]],
+) -> bytes:
+    """Encode ``(topic, key, timestamp, partition, offset, value)`` tuples."""
+
+    writer = _Writer()
+    writer.column(array("I", [writer.ref(record[0]) for record in records]))
+    writer.column(array("I", [_NO_KEY if record[1] is None else writer.ref(record[1]) for record in records]))
+    writer.column(array("d", [record[2] for record in records]))
+    writer.column(array("i", [record[3] for record in records]))
+    writer.column(array("q", [record[4] for record in records]))
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(record[0], []).append(record[5])
+    for topic, values in groups.items():
+        writer.rows(values, TOPIC_SCHEMAS.get(topic, ()))
+    return writer.frame(KIND_TOPIC, len(records))
+
+
+def unpack_topic_messages(data: bytes) -> List[Tuple[str, Optional[str], float, int, int, Dict[str, Any]]]:
+    """Decode a frame produced by :func:`pack_topic_messages`."""
+
+    reader = _Reader(data, KIND_TOPIC)
+    topics = [reader.strings[index] for index in reader.column("I")]
+    keys = [None if index == _NO_KEY else reader.strings[index] for index in reader.column("I")]
+    timestamps = reader.column("d")
+    partitions = reader.column("i")
+    offsets = reader.column("q")
+    counts: Dict[str, int] = {}
+    for topic in topics:
+        counts[topic] = counts.get(topic, 0) + 1
+    cursors = {topic: iter(reader.rows(count, TOPIC_SCHEMAS.get(topic, ()))) for topic, count in counts.items()}
+    return [
+        (topic, key, timestamp, partition, offset, next(cursors[topic]))
+        for topic, key, timestamp, partition, offset in zip(topics, keys, timestamps, partitions, offsets)
+    ]
+
+
+def pack_agent_messages(records: Sequence[Tuple[str, str, float, Dict[str, Any]]]) -> bytes:
+    """Encode ``(sender, recipient, timestamp, payload)`` tuples."""
+
+    writer = _Writer()
+    writer.column(array("I", [writer.ref(record[0]) for record in records]))
+    writer.column(array("I", [writer.ref(record[1]) for record in records]))
+    writer.column(array("d", [record[2] for record in records]))
+    writer.rows([record[3] for record in records], AGENT_PAYLOAD_SCHEMA)
+    return writer.frame(KIND_AGENT, len(records))
+
+
+def unpack_agent_messages(data: bytes) -> List[Tuple[str, str, float, Dict[str, Any]]]:
+    """Decode a frame produced by :func:`pack_agent_messages`."""
+
+    reader = _Reader(data, KIND_AGENT)
+    senders = [reader.strings[index] for index in reader.column("I")]
+    recipients = [reader.strings[index] for index in reader.column("I")]
+    timestamps = reader.column("d")
+    payloads = reader.rows(reader.count, AGENT_PAYLOAD_SCHEMA)
+    return list(zip(senders, recipients, timestamps, payloads))
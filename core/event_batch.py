@@ -0,0 +1,253 @@
+"""Columnar event batches shared by the pipeline, stream processor and dashboard."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .kafka_pipeline import TopicMessage
+
+MESSAGE_FIELDS = ("topic", "key", "timestamp", "partition", "offset")
+
+
+@dataclass
+class DictColumn:
+    """Dictionary-encoded strings: ``codes`` index ``categories``, ``-1`` is missing."""
+
+    codes: np.ndarray
+    categories: np.ndarray
+
+    @classmethod
+    def encode(cls, values: Iterable[Optional[str]]) -> "DictColumn":
+        """Dictionary-encode strings in first-seen order."""
+
+        lookup: Dict[str, int] = {}
+        codes = np.fromiter(
+            (-1 if value is None else lookup.setdefault(value, len(lookup)) for value in values), np.int32
+        )
+        return cls(codes, np.array(list(lookup), dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def labels(self) -> List[Optional[str]]:
+        """Return the decoded strings, with ``None`` where a value is missing."""
+
+        padded = np.append(self.categories, None)
+        return padded[self.codes].tolist()
+
+    def take(self, indices: np.ndarray) -> "DictColumn":
+        return DictColumn(self.codes[indices], self.categories)
+
+
+@dataclass
+class ListColumn:
+    """Variable-length lists stored as ``offsets`` into one child batch."""
+
+    offsets: np.ndarray
+    values: "EventBatch"
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def take(self, indices: np.ndarray) -> "ListColumn":
+        starts = self.offsets[:-1][indices]
+        lengths = self.lengths()[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        child = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return ListColumn(offsets, self.values.take(child))
+
+
+Column = Union[np.ndarray, DictColumn, ListColumn]
+
+
+def _encode_column(values: List[Any]) -> Column:
+    """Pick the tightest column type able to round-trip ``values``."""
+
+    present = [value for value in values if value is not None]
+    kinds = {type(value) for value in present}
+    missing = len(present) < len(values)
+    if kinds == {str}:
+        return DictColumn.encode(values)
+    if float in kinds and kinds <= {float, int}:
+        return np.array([math.nan if value is None else value for value in values], dtype=np.float64)
+    if kinds == {int} and not missing:
+        return np.array(values, dtype=np.int64)
+    if kinds == {bool} and not missing:
+        return np.array(values, dtype=np.bool_)
+    if kinds == {list} and not missing and all(isinstance(item, dict) for value in values for item in value):
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in values], out=offsets[1:])
+        return ListColumn(offsets, EventBatch.from_records([item for value in values for item in value]))
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def column_objects(column: Optional[Column], length: int) -> np.ndarray:
+    """Return any column as an object array with ``None`` for missing values."""
+
+    if column is None:
+        return np.full(length, None, dtype=object)
+    if isinstance(column, DictColumn):
+        return np.append(column.categories, None)[column.codes]
+    objects = np.empty(length, dtype=object)
+    objects[:] = _column_values(column)
+    return objects
+
+
+def column_floats(column: Optional[Column], length: int, default: float) -> np.ndarray:
+    """Return a column as float64, substituting ``default`` for missing values."""
+
+    if isinstance(column, np.ndarray) and column.dtype == np.float64:
+        return np.where(np.isnan(column), default, column)
+    if isinstance(column, np.ndarray) and column.dtype.kind in "iub":
+        return column.astype(np.float64)
+    objects = column_objects(column, length)
+    return np.fromiter((default if value is None else float(value) for value in objects), np.float64, length)
+
+
+def _column_values(column: Column) -> List[Any]:
+    """Decode a column into Python values, using ``None`` for missing entries."""
+
+    if isinstance(column, DictColumn):
+        return column.labels()
+    if isinstance(column, ListColumn):
+        children = column.values.to_records()
+        bounds = column.offsets.tolist()
+        return [children[start:end] for start, end in zip(bounds, bounds[1:])]
+    if column.dtype == np.float64:
+        return [None if value != value else value for value in column.tolist()]
+    return column.tolist()
+
+
+@dataclass
+class EventBatch:
+    """Columnar batch of event payloads or enriched incidents.
+
+    Scalar fields live in typed NumPy arrays, strings are dictionary-encoded
+    and nested lists such as ``intel``/``policy`` are offsets into a child
+    batch. Message batches also carry the bus metadata (topic, key,
+    timestamp, partition, offset) in ``meta``. Columns store missing and
+    ``None`` values alike; ``nulls`` holds a row mask for each field that was
+    explicitly ``None`` somewhere, so records round-trip with those keys.
+    """
+
+    columns: Dict[str, Column]
+    length: int
+    meta: Dict[str, Column] = field(default_factory=dict)
+    nulls: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return self.length
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "EventBatch":
+        """Build a batch from dictionaries, inferring one column per key.
+
+        A numeric field holding both ints and floats becomes a float64
+        column, so its ints come back from :meth:`to_records` as floats.
+        """
+
+        values: Dict[str, List[Any]] = {}
+        nulls: Dict[str, np.ndarray] = {}
+        for index, record in enumerate(records):
+            for name, value in record.items():
+                column = values.get(name)
+                if column is None:
+                    column = values[name] = [None] * len(records)
+                if value is None:
+                    if name not in nulls:
+                        nulls[name] = np.zeros(len(records), dtype=bool)
+                    nulls[name][index] = True
+                column[index] = value
+        return cls({name: _encode_column(column) for name, column in values.items()}, len(records), nulls=nulls)
+
+    @classmethod
+    def from_messages(cls, messages: Sequence[TopicMessage]) -> "EventBatch":
+        """Build a batch from bus messages, keeping their metadata columns."""
+
+        batch = cls.from_records([message.value for message in messages])
+        batch.meta = {
+            "topic": DictColumn.encode(message.topic for message in messages),
+            "key": DictColumn.encode(message.key for message in messages),
+            "timestamp": np.fromiter((message.timestamp for message in messages), np.float64, len(messages)),
+            "partition": np.fromiter((message.partition for message in messages), np.int32, len(messages)),
+            "offset": np.fromiter((message.offset for message in messages), np.int64, len(messages)),
+        }
+        return batch
+
+    def column(self, name: str) -> Optional[Column]:
+        """Return a payload or metadata column by name."""
+
+        return self.columns.get(name, self.meta.get(name))
+
+    def take(self, indices: np.ndarray) -> "EventBatch":
+        """Return the rows at ``indices`` as a new batch."""
+
+        indices = np.asarray(indices, dtype=np.int64)
+        return EventBatch(
+            {name: column.take(indices) for name, column in self.columns.items()},
+            len(indices),
+            {name: column.take(indices) for name, column in self.meta.items()},
+            {name: mask[indices] for name, mask in self.nulls.items()},
+        )
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Materialise payload rows as dictionaries, omitting missing fields.
+
+        Fields that were explicitly ``None`` in the source records are kept.
+        """
+
+        names = list(self.columns)
+        if not names:
+            return [{} for _ in range(self.length)]
+        decoded = [_column_values(self.columns[name]) for name in names]
+        if not self.nulls:
+            return [{name: value for name, value in zip(names, row) if value is not None} for row in zip(*decoded)]
+        masks = [self.nulls[name].tolist() if name in self.nulls else [False] * self.length for name in names]
+        return [
+            {name: value for name, value, null in zip(names, row, nulled) if value is not None or null}
+            for row, nulled in zip(zip(*decoded), zip(*masks))
+        ]
+
+    def to_messages(self) -> List[TopicMessage]:
+        """Rebuild bus messages from a batch created by :meth:`from_messages`."""
+
+        meta = {name: _column_values(column) for name, column in self.meta.items()}
+        return [
+            TopicMessage(
+                topic=topic, value=value, timestamp=timestamp, key=key, partition=partition, offset=offset
+            )
+            for topic, key, timestamp, partition, offset, value in zip(
+                *(meta[name] for name in MESSAGE_FIELDS), self.to_records()
+            )
+        ]
+
+    def to_pandas(self) -> "Any":
+        """Return a DataFrame sharing the numeric column buffers.
+
+        Numeric columns are passed through without copying. Dictionary
+        columns become ``pd.Categorical``, whose codes pandas narrows to the
+        smallest integer type, so they are copied; list columns are
+        materialised as Python objects.
+        """
+
+        import pandas as pd
+
+        data: Dict[str, Any] = {}
+        for name, column in {**self.meta, **self.columns}.items():
+            if isinstance(column, DictColumn):
+                data[name] = pd.Categorical.from_codes(column.codes, categories=pd.Index(column.categories))
+            elif isinstance(column, ListColumn):
+                data[name] = _column_values(column)
+            else:
+                data[name] = column
+        return pd.DataFrame(data, copy=False)
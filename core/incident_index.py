@@ -0,0 +1,182 @@
+"""Bounded index of the riskiest incidents seen on the stream."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .event_batch import EventBatch, column_floats, column_objects
+from .secops_stream_processor import risk_score
+
+# Fields a correlated row only knows from its threat signals; rows built from
+# intel or policy messages alone carry defaults for them instead.
+_SIGNAL_FIELDS = ("severity", "anomaly_score")
+
+
+def _absent(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {} or (
+        isinstance(value, float) and math.isnan(value)
+    )
+
+
+def _fingerprint(item: Any) -> Any:
+    try:
+        hash(item)
+    except TypeError:
+        return json.dumps(item, sort_keys=True, default=str)
+    return item
+
+
+def _merge(current: Dict[str, Any], update: Dict[str, Any], max_items: int) -> Dict[str, Any]:
+    """Fold a partial incident row into the tracked record.
+
+    Nested dictionaries are merged and lists gain the new items, deduplicated
+    and capped at the ``max_items`` most recent. Absent values in ``update``
+    never overwrite what is already known, and neither do the severity and
+    anomaly defaults of a row without threat signals.
+    """
+
+    merged = dict(current)
+    defaulted = update.get("signals") == []
+    for key, value in update.items():
+        existing = merged.get(key)
+        if isinstance(existing, dict) and isinstance(value, dict):
+            merged[key] = _merge(existing, value, max_items)
+        elif isinstance(existing, list) and isinstance(value, list):
+            seen = {_fingerprint(item) for item in existing}
+            combined = list(existing)
+            for item in value:
+                fingerprint = _fingerprint(item)
+                if fingerprint not in seen:
+                    seen.add(fingerprint)
+                    combined.append(item)
+            merged[key] = combined[-max_items:]
+        elif defaulted and key in _SIGNAL_FIELDS and key in merged:
+            continue
+        elif not _absent(value) or key not in merged:
+            merged[key] = value
+    return merged
+
+
+class TopKIncidentIndex:
+    """Keep the ``k`` highest ``risk_score`` incidents under a memory bound.
+
+    Incidents live in a hash keyed by ``id`` next to a min-heap of scores.
+    A later row for a tracked incident (e.g. when more intel joins it) is
+    merged into the tracked record, whose ``risk_score`` is then recomputed
+    with :func:`risk_score`, so partial rows neither drop fields nor leak
+    their defaults into the score. Nested lists keep at most ``max_items``
+    entries. Re-scoring pushes a fresh heap entry and leaves the old one to
+    be skipped lazily. Up to ``capacity`` incidents are tracked; beyond that
+    the lowest score is evicted, so an incident that drops out of the top
+    ``k`` can still climb back while it stays within the slack between ``k``
+    and ``capacity``.
+    """
+
+    def __init__(self, k: int = 10, capacity: Optional[int] = None, max_items: int = 64) -> None:
+        if k < 1 or max_items < 1:
+            raise ValueError("k and max_items must be positive")
+        self.k = k
+        self.capacity = max(capacity or 4 * k, k)
+        self.max_items = max_items
+        self._entries: Dict[str, Tuple[float, int, Dict[str, Any]]] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, incident_id: object) -> bool:
+        return incident_id in self._entries
+
+    def _lowest(self) -> Optional[Tuple[float, int, str]]:
+        """Return the smallest live heap entry, discarding stale ones."""
+
+        heap = self._heap
+        while heap:
+            score, sequence, incident_id = heap[0]
+            entry = self._entries.get(incident_id)
+            if entry is not None and entry[1] == sequence:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    @property
+    def threshold(self) -> float:
+        """Score a new incident must beat to enter a full index."""
+
+        if len(self._entries) < self.capacity:
+            return float("-inf")
+        lowest = self._lowest()
+        return float("-inf") if lowest is None else lowest[0]
+
+    def update(self, incident: Dict[str, Any]) -> bool:
+        """Insert or re-score one incident; return whether it is tracked."""
+
+        incident_id = str(incident.get("id"))
+        score = float(incident.get("risk_score", 0.0))
+        tracked = self._entries.get(incident_id)
+        if tracked is not None:
+            incident = _merge(tracked[2], incident, self.max_items)
+            score = risk_score({key: value for key, value in incident.items() if not _absent(value)})
+            incident["risk_score"] = score
+        elif len(self._entries) >= self.capacity:
+            lowest = self._lowest()
+            if lowest is not None and score <= lowest[0]:
+                return False
+            if lowest is not None:
+                heapq.heappop(self._heap)
+                del self._entries[lowest[2]]
+                self.evicted += 1
+        sequence = next(self._sequence)
+        self._entries[incident_id] = (score, sequence, incident)
+        heapq.heappush(self._heap, (score, sequence, incident_id))
+        if len(self._heap) > 2 * self.capacity:
+            self._compact()
+        return True
+
+    def update_many(self, incidents: Union[Iterable[Dict[str, Any]], EventBatch]) -> int:
+        """Fold enriched incidents into the index and return how many were kept.
+
+        For an :class:`EventBatch` only rows that are already tracked or beat
+        the current threshold are materialised as dictionaries.
+        """
+
+        if isinstance(incidents, EventBatch):
+            scores = column_floats(incidents.columns.get("risk_score"), len(incidents), 0.0)
+            ids = column_objects(incidents.columns.get("id"), len(incidents))
+            tracked = np.fromiter((str(value) in self._entries for value in ids), bool, len(incidents))
+            candidates = np.flatnonzero(tracked | (scores > self.threshold))
+            incidents = incidents.take(candidates).to_records()
+        return sum(self.update(incident) for incident in incidents)
+
+    def remove(self, incident_id: str) -> None:
+        """Forget an incident, e.g. once it has been closed."""
+
+        del self._entries[incident_id]
+
+    def _compact(self) -> None:
+        self._heap = [(score, sequence, key) for key, (score, sequence, _) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return up to ``n`` (default ``k``) incidents, riskiest first."""
+
+        ranked = heapq.nlargest(
+            min(n or self.k, len(self._entries)),
+            self._entries.values(),
+            key=lambda entry: (entry[0], -entry[1]),
+        )
+        return [incident for _, _, incident in ranked]
+
+    def max_score(self, default: float = 0.0) -> float:
+        """Return the highest tracked ``risk_score``."""
+
+        best = self.top(1)
+        return float(best[0].get("risk_score", default)) if best else default
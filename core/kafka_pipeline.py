@@ -2,94 +2,618 @@
 
 from __future__ import annotations
 
+import asyncio
+import heapq
+import itertools
 import json
-import queue
+import os
 import random
 import threading
 import time
+import zlib
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
+from .codec import pack_topic_messages, unpack_topic_messages
+from .metrics import REGISTRY, SIZE_BUCKETS
 
-@dataclass
+if TYPE_CHECKING:
+    from .event_batch import EventBatch
+
+DEFAULT_GROUP = "default"
+DEFAULT_TOPICS = ("threat-events", "policy-audit", "intel-feed")
+OVERFLOW_POLICIES = ("drop", "block", "error")
+_EVENT_SEQUENCE = itertools.count()
+_POLL_BATCH = REGISTRY.histogram(
+    "secops_poll_batch_size", "Records returned by one KafkaPipeline.poll call.", buckets=SIZE_BUCKETS
+)
+
+
+class BackpressureError(RuntimeError):
+    """Raised when publishing would overrun the slowest consumer group."""
+
+
+@dataclass(slots=True)
 class TopicMessage:
     """Represents an event transported on the simulated Kafka bus."""
 
     topic: str
     value: Dict[str, Any]
     timestamp: float = field(default_factory=lambda: time.time())
+    key: Optional[str] = None
+    partition: int = 0
+    offset: int = -1
 
     def to_json(self) -> str:
         """Return the message payload as JSON for downstream processors."""
 
-        return json.dumps({"topic": self.topic, "value": self.value, "timestamp": self.timestamp})
+        return json.dumps(
+            {
+                "topic": self.topic,
+                "value": self.value,
+                "timestamp": self.timestamp,
+                "key": self.key,
+                "partition": self.partition,
+                "offset": self.offset,
+            }
+        )
+
+    def to_bytes(self) -> bytes:
+        """Return the message in the compact binary wire format."""
+
+        return encode_messages([self])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TopicMessage":
+        """Rebuild a message encoded with :meth:`to_bytes`."""
+
+        return decode_messages(data)[0]
+
+
+def encode_messages(messages: Sequence[TopicMessage]) -> bytes:
+    """Encode a batch of messages into one columnar binary frame."""
+
+    return pack_topic_messages(
+        [
+            (message.topic, message.key, message.timestamp, message.partition, message.offset, message.value)
+            for message in messages
+        ]
+    )
+
+
+def decode_messages(data: bytes) -> List[TopicMessage]:
+    """Decode a frame produced by :func:`encode_messages`."""
+
+    return [
+        TopicMessage(topic=topic, value=value, timestamp=timestamp, key=key, partition=partition, offset=offset)
+        for topic, key, timestamp, partition, offset, value in unpack_topic_messages(data)
+    ]
+
+
+def message_key(value: Dict[str, Any]) -> str:
+    """Return the incident key used both for partitioning and correlation."""
+
+    return str(value.get("id") or value.get("asset") or value.get("ttp"))
+
+
+def partition_for(key: str, partitions: int) -> int:
+    """Map a message key onto a partition using a stable hash."""
+
+    return zlib.crc32(key.encode()) % partitions
+
+
+class RingBufferLog:
+    """Preallocated ring buffer holding one topic partition.
+
+    Producers append whole batches under a single lock while readers never
+    lock: a writer reserves its offsets before touching any slot and advances
+    ``end_offset`` only afterwards, and a reader re-checks the reservation after
+    copying so records overwritten mid-read are discarded rather than returned
+    out of order.
+    """
+
+    def __init__(self, topic: str, partition: int, retention: int = 1000) -> None:
+        self.topic = topic
+        self.partition = partition
+        self.capacity = retention
+        self._slots: List[Optional[TopicMessage]] = [None] * retention
+        self._next_offset = 0
+        self._reserved = 0
+        self._lock = threading.Lock()
+
+    @property
+    def start_offset(self) -> int:
+        """Return the oldest offset still retained by the log."""
+
+        return max(self._next_offset - self.capacity, 0)
+
+    @property
+    def end_offset(self) -> int:
+        """Return the offset that will be assigned to the next record."""
+
+        return self._next_offset
+
+    def append(self, value: Dict[str, Any], key: str) -> TopicMessage:
+        """Append a single value, overwriting the oldest record when full."""
+
+        return self.append_batch([value], [key])[0]
+
+    def append_batch(self, values: List[Dict[str, Any]], keys: List[str]) -> List[TopicMessage]:
+        """Append values in order with one lock acquisition for the whole batch."""
+
+        timestamp = time.time()
+        with self._lock:
+            offset = self._next_offset
+            messages = [
+                TopicMessage(
+                    topic=self.topic,
+                    value=value,
+                    timestamp=timestamp,
+                    key=key,
+                    partition=self.partition,
+                    offset=offset + index,
+                )
+                for index, (value, key) in enumerate(zip(values, keys))
+            ]
+            self._reserved = offset + len(messages)
+            for message in messages[-self.capacity :]:
+                self._slots[message.offset % self.capacity] = message
+            self._next_offset = offset + len(messages)
+        return messages
+
+    def read(self, offset: int, max_records: Optional[int] = None) -> List[TopicMessage]:
+        """Return records starting at ``offset`` without removing them."""
+
+        end = self._next_offset
+        start = max(offset, end - self.capacity, 0)
+        if max_records is not None:
+            end = min(end, start + max_records)
+        if start >= end:
+            return []
+        first, last = start % self.capacity, (end - 1) % self.capacity + 1
+        if first < last:
+            records = self._slots[first:last]
+        else:
+            records = self._slots[first:] + self._slots[:last]
+        overwritten = self._reserved - self.capacity - start
+        if overwritten > 0:
+            records = records[overwritten:]
+        return records  # type: ignore[return-value]
+
+    def replay(
+        self,
+        offset: Optional[int] = None,
+        timestamp: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[TopicMessage]:
+        """Yield retained records from an offset or timestamp onwards."""
+
+        for message in self.read(self.start_offset if offset is None else offset):
+            if timestamp is not None and message.timestamp < timestamp:
+                continue
+            if until is not None and message.timestamp > until:
+                return
+            yield message
 
 
 class MockKafkaTopic:
-    """In-memory Kafka topic simulation with bounded retention."""
+    """Kafka topic simulation with keyed partitions and consumer groups.
+
+    Partitions live in memory by default. Passing ``log_dir`` switches them to
+    durable :class:`~core.segment_log.SegmentLog` files (extra keyword
+    arguments configure segment rolling) and persists committed offsets so
+    consumers resume where they stopped after a restart.
+
+    ``overflow`` decides what happens once a partition is ``max_lag`` records
+    (or the ring buffer capacity) ahead of the slowest consumer group: the
+    legacy ``"drop"`` overwrites the oldest records, ``"block"`` waits up to
+    ``block_timeout`` seconds for consumers to catch up and ``"error"`` raises
+    :class:`BackpressureError` immediately.
+    """
 
-    def __init__(self, name: str, maxsize: int = 1000) -> None:
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1000,
+        partitions: int = 1,
+        log_dir: Optional[Union[str, Path]] = None,
+        max_lag: Optional[int] = None,
+        overflow: str = "drop",
+        block_timeout: Optional[float] = None,
+        **segment_options: Any,
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow}")
         self.name = name
-        self._queue: "queue.Queue[TopicMessage]" = queue.Queue(maxsize=maxsize)
+        self.max_lag = max_lag
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped: Dict[str, int] = {}
+        self._progress = threading.Condition()
+        self._offsets: Dict[str, List[int]] = {}
+        self._group_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._offsets_path: Optional[Path] = None
+        if log_dir is None:
+            self.partitions = [RingBufferLog(name, index, retention=maxsize) for index in range(partitions)]
+        else:
+            from .segment_log import SegmentLog
 
-    def publish(self, value: Dict[str, Any]) -> None:
-        """Publish a JSON-serialisable message to the topic."""
+            directory = Path(log_dir) / name
+            self.partitions = [
+                SegmentLog(name, index, directory / str(index), **segment_options) for index in range(partitions)
+            ]
+            self._offsets_path = directory / "offsets.json"
+            if self._offsets_path.exists():
+                self._offsets = json.loads(self._offsets_path.read_text())
+                self._group_locks = {group: threading.Lock() for group in self._offsets}
 
-        message = TopicMessage(topic=self.name, value=value)
-        try:
-            self._queue.put_nowait(message)
-        except queue.Full:  # pragma: no cover - defensive path
-            _ = self._queue.get_nowait()
-            self._queue.put_nowait(message)
+    def publish(self, value: Dict[str, Any], key: Optional[str] = None) -> TopicMessage:
+        """Publish a JSON-serialisable message to the partition owning its key."""
+
+        key = message_key(value) if key is None else key
+        index = partition_for(key, len(self.partitions))
+        if self.overflow == "drop":
+            return self.partitions[index].append(value, key)
+        with self._progress:
+            self._await_capacity(index, 1)
+            return self.partitions[index].append(value, key)
+
+    def publish_batch(
+        self, values: Iterable[Dict[str, Any]], keys: Optional[Iterable[str]] = None
+    ) -> List[TopicMessage]:
+        """Publish many values, appending to each partition once per batch."""
+
+        values = list(values)
+        keys = [message_key(value) for value in values] if keys is None else list(keys)
+        if len(self.partitions) == 1:
+            routed = {0: (values, keys)}
+        else:
+            routed = {}
+            for value, key in zip(values, keys):
+                bucket = routed.setdefault(partition_for(key, len(self.partitions)), ([], []))
+                bucket[0].append(value)
+                bucket[1].append(key)
+        messages: List[TopicMessage] = []
+        for index, (batch_values, batch_keys) in routed.items():
+            if self.overflow == "drop":
+                messages.extend(self.partitions[index].append_batch(batch_values, batch_keys))
+                continue
+            with self._progress:
+                self._await_capacity(index, len(batch_values))
+                messages.extend(self.partitions[index].append_batch(batch_values, batch_keys))
+        return messages
+
+    def _await_capacity(self, index: int, count: int) -> None:
+        """Apply the overflow policy until ``count`` records fit; caller holds ``_progress``."""
+
+        log = self.partitions[index]
+        limit = self.max_lag if self.max_lag is not None else getattr(log, "capacity", None)
+        if limit is None:
+            return
+        if count > limit:
+            raise BackpressureError(f"Batch of {count} exceeds the lag limit {limit} of {self.name}[{index}]")
+        deadline = None if self.block_timeout is None else time.monotonic() + self.block_timeout
+        while True:
+            with self._lock:
+                slowest = min((offsets[index] for offsets in self._offsets.values()), default=log.end_offset)
+            if log.end_offset + count - max(slowest, log.start_offset) <= limit:
+                return
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if self.overflow == "error" or (remaining is not None and remaining <= 0):
+                raise BackpressureError(f"Consumers of {self.name}[{index}] are {limit} records behind")
+            self._progress.wait(remaining)
+
+    def _notify_progress(self) -> None:
+        if self.overflow != "drop":
+            with self._progress:
+                self._progress.notify_all()
+
+    def _group(self, group: str) -> threading.Lock:
+        with self._lock:
+            if group not in self._offsets:
+                self._offsets[group] = [0] * len(self.partitions)
+                self._group_locks[group] = threading.Lock()
+            return self._group_locks[group]
+
+    def groups(self) -> List[str]:
+        """Return the consumer groups that have read from this topic."""
+
+        with self._lock:
+            return list(self._offsets)
+
+    def committed(self, group: str) -> List[int]:
+        """Return the committed offset of every partition for a consumer group."""
+
+        with self._group(group):
+            return list(self._offsets[group])
+
+    def commit(self, group: str, partition: int, offset: int) -> None:
+        """Commit the next offset the group should read from ``partition``."""
+
+        with self._group(group):
+            self._offsets[group][partition] = offset
+            self._persist_offsets()
+        self._notify_progress()
+
+    def remove_group(self, group: str) -> None:
+        """Forget a consumer group so it no longer holds back publishers."""
+
+        with self._lock:
+            self._offsets.pop(group, None)
+            self._group_locks.pop(group, None)
+        self._notify_progress()
+
+    def _persist_offsets(self) -> None:
+        if self._offsets_path is None:
+            return
+        staging = self._offsets_path.with_suffix(".tmp")
+        staging.write_text(json.dumps(self._offsets))
+        os.replace(staging, self._offsets_path)
+
+    def lag(self, group: str) -> int:
+        """Return how many retained records the group has not consumed yet."""
+
+        offsets = self.committed(group)
+        return sum(log.end_offset - max(offset, log.start_offset) for log, offset in zip(self.partitions, offsets))
+
+    def poll(
+        self,
+        group: str = DEFAULT_GROUP,
+        max_records: Optional[int] = None,
+        partitions: Optional[Iterable[int]] = None,
+        commit: bool = True,
+    ) -> List[TopicMessage]:
+        """Read records past the group's committed offsets without removing them.
+
+        Offsets are committed as part of the poll unless ``commit`` is false, in
+        which case the caller commits explicitly once processing succeeded.
+        """
+
+        selected = range(len(self.partitions)) if partitions is None else partitions
+        records: List[TopicMessage] = []
+        with self._group(group):
+            offsets = self._offsets[group]
+            for index in selected:
+                budget = None if max_records is None else max_records - len(records)
+                if budget == 0:
+                    break
+                batch = self.partitions[index].read(offsets[index], budget)
+                if batch and batch[0].offset > offsets[index]:
+                    self.dropped[group] = self.dropped.get(group, 0) + batch[0].offset - offsets[index]
+                if batch and commit:
+                    offsets[index] = batch[-1].offset + 1
+                records.extend(batch)
+            if records and commit:
+                self._persist_offsets()
+        if records and commit:
+            self._notify_progress()
+        return records
+
+    def replay(
+        self,
+        offset: Optional[int] = None,
+        timestamp: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[TopicMessage]:
+        """Lazily merge every partition's records in timestamp order."""
+
+        streams = [log.replay(offset=offset, timestamp=timestamp, until=until) for log in self.partitions]
+        return heapq.merge(*streams, key=lambda message: message.timestamp)
 
     def consume(self) -> Iterable[TopicMessage]:
-        """Yield messages until the queue is empty."""
+        """Yield unread messages for the default consumer group."""
 
-        while not self._queue.empty():
-            yield self._queue.get()
+        yield from self.poll(DEFAULT_GROUP)
+
+    def consume_batch(self, n: int, group: str = DEFAULT_GROUP) -> List[TopicMessage]:
+        """Return up to ``n`` unread messages for ``group`` in one call."""
+
+        return self.poll(group, max_records=n)
 
 
 class KafkaPipeline:
-    """Convenience wrapper hosting multiple topics for the demo."""
-
-    def __init__(self) -> None:
-        self.topics = {
-            "threat-events": MockKafkaTopic("threat-events"),
-            "policy-audit": MockKafkaTopic("policy-audit"),
-            "intel-feed": MockKafkaTopic("intel-feed"),
-        }
+    """Convenience wrapper hosting multiple partitioned topics for the demo."""
+
+    def __init__(
+        self, partitions: int = 4, log_dir: Optional[Union[str, Path]] = None, **topic_options: Any
+    ) -> None:
+        self.partitions = partitions
+        self.log_dir = log_dir
+        self._topic_options = topic_options
+        self._waiters_lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self.topics = {name: self._create_topic(name) for name in DEFAULT_TOPICS}
+        if log_dir is not None:
+            for path in sorted(Path(log_dir).iterdir()):
+                if path.is_dir() and path.name not in self.topics:
+                    self.topics[path.name] = self._create_topic(path.name)
         self._lock = threading.Lock()
+        self._cursors: Dict[str, int] = {}
+
+    def _create_topic(self, name: str) -> MockKafkaTopic:
+        return MockKafkaTopic(name, partitions=self.partitions, log_dir=self.log_dir, **self._topic_options)
+
+    def topic(self, name: str) -> MockKafkaTopic:
+        """Return the named topic, creating it on first use."""
+
+        topic = self.topics.get(name)
+        if topic is None:
+            with self._lock:
+                topic = self.topics.get(name)
+                if topic is None:
+                    topic = self.topics[name] = self._create_topic(name)
+        return topic
 
-    def publish(self, topic: str, value: Dict[str, Any]) -> None:
-        """Publish an event to the requested topic."""
+    def publish(self, topic: str, value: Dict[str, Any], key: Optional[str] = None) -> TopicMessage:
+        """Publish an event to the requested topic, partitioned by its key."""
 
+        message = self.topic(topic).publish(value, key=key)
+        self._notify()
+        return message
+
+    def publish_batch(
+        self, topic: str, values: Union[Iterable[Dict[str, Any]], "EventBatch"], keys: Optional[Iterable[str]] = None
+    ) -> List[TopicMessage]:
+        """Publish a batch of events to one topic with per-partition appends.
+
+        ``values`` may also be an :class:`~core.event_batch.EventBatch`, whose
+        payload columns are published as individual records.
+        """
+
+        if hasattr(values, "to_records"):
+            values = values.to_records()
+        messages = self.topic(topic).publish_batch(values, keys=keys)
+        self._notify()
+        return messages
+
+    def _notify(self) -> None:
+        """Wake consumers blocked in :meth:`stream`."""
+
+        with self._waiters_lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def assignment(self, member: int = 0, members: int = 1) -> List[int]:
+        """Return the partitions owned by one member of a consumer group."""
+
+        if not 0 <= member < members:
+            raise ValueError(f"Member {member} outside group of {members}")
+        return [index for index in range(self.partitions) if index % members == member]
+
+    def poll(
+        self,
+        group: str,
+        max_records: Optional[int] = None,
+        member: int = 0,
+        members: int = 1,
+    ) -> List[TopicMessage]:
+        """Return up to ``max_records`` unread messages for a consumer group.
+
+        Polling is non-destructive: every group tracks its own committed
+        offsets, so independent consumers each observe the full stream. Group
+        members split the partitions between them via :meth:`assignment`.
+        """
+
+        partitions = self.assignment(member, members)
         with self._lock:
-            if topic not in self.topics:
-                self.topics[topic] = MockKafkaTopic(topic)
-            self.topics[topic].publish(value)
+            topics = list(self.topics.values())
+            start = self._cursors.get(group, 0) % len(topics)
+            self._cursors[group] = start + 1
+        records: List[TopicMessage] = []
+        for topic in topics[start:] + topics[:start]:
+            budget = None if max_records is None else max_records - len(records)
+            if budget == 0:
+                break
+            records.extend(topic.poll(group, budget, partitions=partitions))
+        _POLL_BATCH.observe(len(records))
+        return records
+
+    async def stream(
+        self,
+        group: str,
+        max_batch: int = 500,
+        max_wait_ms: int = 100,
+        min_batch: int = 1,
+        member: int = 0,
+        members: int = 1,
+    ) -> AsyncIterator[List[TopicMessage]]:
+        """Yield batches of at most ``max_batch`` messages as soon as they arrive.
+
+        The consumer sleeps until a publish wakes it, then waits at most
+        ``max_wait_ms`` for ``min_batch`` records to accumulate before yielding.
+        """
+
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+        with self._waiters_lock:
+            self._waiters.add(waiter)
+        try:
+            while True:
+                event.clear()
+                batch = self.poll(group, max_batch, member, members)
+                deadline = loop.time() + max_wait_ms / 1000
+                while len(batch) < min(min_batch, max_batch):
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(event.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    event.clear()
+                    batch.extend(self.poll(group, max_batch - len(batch), member, members))
+                if batch:
+                    yield batch
+        finally:
+            with self._waiters_lock:
+                self._waiters.discard(waiter)
+
+    def lag(self, group: str) -> Dict[str, int]:
+        """Return the unconsumed record count per topic for a consumer group."""
+
+        return {name: topic.lag(group) for name, topic in list(self.topics.items())}
+
+    def consume_batch(self, n: int, group: str = DEFAULT_GROUP) -> List[TopicMessage]:
+        """Return up to ``n`` unread messages across all topics for ``group``."""
+
+        return self.poll(group, max_records=n)
+
+    def poll_batch(
+        self,
+        group: str = DEFAULT_GROUP,
+        max_records: Optional[int] = None,
+        member: int = 0,
+        members: int = 1,
+    ) -> "EventBatch":
+        """Like :meth:`poll` but return the messages as a columnar batch."""
+
+        from .event_batch import EventBatch
+
+        return EventBatch.from_messages(self.poll(group, max_records, member=member, members=members))
+
+    def replay(
+        self,
+        topics: Optional[Iterable[str]] = None,
+        offset: Optional[int] = None,
+        timestamp: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[TopicMessage]:
+        """Stream retained records of several topics in timestamp order.
+
+        The iterator can be handed straight to ``process_stream`` to re-run an
+        incident window, e.g. ``pipeline.replay(timestamp=start, until=end)``.
+        """
+
+        names = list(self.topics) if topics is None else list(topics)
+        streams = [self.topic(name).replay(offset=offset, timestamp=timestamp, until=until) for name in names]
+        return heapq.merge(*streams, key=lambda message: message.timestamp)
 
     def drain(self) -> List[TopicMessage]:
-        """Drain all topic queues and return their messages."""
+        """Return every message not yet seen by the default consumer group."""
 
-        events: List[TopicMessage] = []
-        with self._lock:
-            for topic in self.topics.values():
-                events.extend(list(topic.consume()))
-        return events
+        return self.poll(DEFAULT_GROUP)
 
 
 def simulate_threat_event(seed: Optional[int] = None) -> Dict[str, Any]:
-    """Generate a synthetic threat event used by the streaming demo."""
+    """Generate a synthetic threat event used by the streaming demo.
+
+    A ``seed`` makes the event reproducible without touching the global
+    ``random`` state; ids stay unique even when many events share a millisecond.
+    """
 
-    random.seed(seed or time.time())
+    rng = random.Random(seed) if seed is not None else random
     severities = ["low", "medium", "high"]
-    severity = random.choice(severities)
+    severity = rng.choice(severities)
     return {
-        "id": f"evt-{int(time.time()*1000)}",
+        "id": f"evt-{int(time.time()*1000)}-{next(_EVENT_SEQUENCE)}",
         "severity": severity,
-        "anomaly_score": round(random.random(), 3),
-        "source": random.choice(["endpoint", "k8s", "cloud", "identity"]),
-        "description": random.choice(
+        "anomaly_score": round(rng.random(), 3),
+        "source": rng.choice(["endpoint", "k8s", "cloud", "identity"]),
+        "description": rng.choice(
             [
                 "Multiple failed logins",
                 "Container escape attempt",
@@ -0,0 +1,198 @@
+"""Vectorised synthetic event generator for load testing the streaming stack."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .kafka_pipeline import KafkaPipeline
+
+DEFAULT_SEVERITY_WEIGHTS = {"low": 0.5, "medium": 0.35, "high": 0.15}
+DEFAULT_SOURCE_WEIGHTS = {"endpoint": 0.25, "k8s": 0.25, "cloud": 0.25, "identity": 0.25}
+DESCRIPTIONS = (
+    "Multiple failed logins",
+    "Container escape attempt",
+    "Suspicious network beacon",
+    "Privilege escalation",
+)
+POLICIES = ("NIST-800-53", "ZeroTrust-Core", "PCI-DSS")
+ASSETS = ("prod-cluster", "gov-edge", "dev-lab")
+INTEL_SOURCES = ("CrowdStrike", "Mandiant", "Internal")
+TTPS = ("T1059", "T1204", "T1486", "T1021")
+
+
+@dataclass
+class SyntheticBatch:
+    """Columnar batch of generated records for one topic.
+
+    Integer columns listed in ``categories`` hold codes into the matching
+    label tuple; ``keyed`` columns hold incident key numbers (``-1`` = absent).
+    Records are only materialised as dictionaries on demand.
+    """
+
+    topic: str
+    columns: Dict[str, np.ndarray]
+    categories: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    keyed: Tuple[str, ...] = ()
+    prefix: str = "evt"
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def _labels(self, name: str) -> List[Any]:
+        values = self.columns[name]
+        if name in self.categories:
+            return np.asarray(self.categories[name], dtype=object)[values].tolist()
+        if name in self.keyed:
+            return [f"inc-{value}" if value >= 0 else None for value in values.tolist()]
+        if name == "event_id":
+            return [f"{self.prefix}-{value}" for value in values.tolist()]
+        return values.tolist()
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Materialise the batch as the dictionaries the pipeline publishes."""
+
+        names = list(self.columns)
+        columns = [self._labels(name) for name in names]
+        records = []
+        for row in zip(*columns):
+            records.append({name: value for name, value in zip(names, row) if value is not None})
+        return records
+
+
+class LoadGenerator:
+    """Produce threat-events, policy-audit and intel-feed records at high rates.
+
+    Incident keys are drawn from ``key_cardinality`` values (optionally Zipf
+    skewed) and a ``join_rate`` fraction of policy and intel records carry an
+    incident ``id`` so ``correlate_events`` sees a realistic hit rate. Every
+    record gets a unique ``event_id`` and an ``event_time`` advancing at
+    ``events_per_second``; the same ``seed`` always yields the same stream.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        key_cardinality: int = 10_000,
+        key_skew: float = 0.0,
+        join_rate: float = 0.3,
+        severity_weights: Optional[Mapping[str, float]] = None,
+        source_weights: Optional[Mapping[str, float]] = None,
+        policy_pass_rate: float = 0.7,
+        events_per_second: float = 10_000.0,
+        start_time: Optional[float] = None,
+    ) -> None:
+        if key_cardinality < 1:
+            raise ValueError("key_cardinality must be positive")
+        self.seed = seed
+        self.key_cardinality = key_cardinality
+        self.join_rate = join_rate
+        self.policy_pass_rate = policy_pass_rate
+        self.events_per_second = events_per_second
+        self.start_time = time.time() if start_time is None else start_time
+        self._rng = np.random.default_rng(seed)
+        self._sequence = 0
+        self._severities, self._severity_p = self._distribution(severity_weights or DEFAULT_SEVERITY_WEIGHTS)
+        self._sources, self._source_p = self._distribution(source_weights or DEFAULT_SOURCE_WEIGHTS)
+        self._key_p: Optional[np.ndarray] = None
+        if key_skew > 0:
+            weights = 1.0 / np.arange(1, key_cardinality + 1, dtype=np.float64) ** key_skew
+            self._key_p = weights / weights.sum()
+
+    @staticmethod
+    def _distribution(weights: Mapping[str, float]) -> Tuple[Tuple[str, ...], np.ndarray]:
+        labels = tuple(weights)
+        probabilities = np.asarray([weights[label] for label in labels], dtype=np.float64)
+        if probabilities.sum() <= 0:
+            raise ValueError("Distribution weights must sum to a positive value")
+        return labels, probabilities / probabilities.sum()
+
+    def _base_columns(self, n: int) -> Dict[str, np.ndarray]:
+        sequence = np.arange(self._sequence, self._sequence + n, dtype=np.int64)
+        self._sequence += n
+        jitter = self._rng.random(n)
+        return {
+            "event_id": sequence,
+            "event_time": self.start_time + (sequence + jitter) / self.events_per_second,
+        }
+
+    def _keys(self, n: int) -> np.ndarray:
+        if self._key_p is None:
+            return self._rng.integers(0, self.key_cardinality, size=n)
+        return self._rng.choice(self.key_cardinality, size=n, p=self._key_p)
+
+    def _joined_keys(self, n: int) -> np.ndarray:
+        keys = self._keys(n)
+        keys[self._rng.random(n) >= self.join_rate] = -1
+        return keys
+
+    def threat_events(self, n: int) -> SyntheticBatch:
+        """Generate ``n`` threat events keyed by incident id."""
+
+        columns = self._base_columns(n)
+        columns.update(
+            {
+                "id": self._keys(n),
+                "severity": self._rng.choice(len(self._severities), size=n, p=self._severity_p),
+                "anomaly_score": np.round(self._rng.random(n), 3),
+                "source": self._rng.choice(len(self._sources), size=n, p=self._source_p),
+                "description": self._rng.integers(0, len(DESCRIPTIONS), size=n),
+            }
+        )
+        categories = {"severity": self._severities, "source": self._sources, "description": DESCRIPTIONS}
+        return SyntheticBatch("threat-events", columns, categories, keyed=("id",), prefix=f"evt{self.seed}")
+
+    def policy_audits(self, n: int) -> SyntheticBatch:
+        """Generate ``n`` policy audit results, some joined to incidents."""
+
+        columns = self._base_columns(n)
+        columns.update(
+            {
+                "id": self._joined_keys(n),
+                "policy": self._rng.integers(0, len(POLICIES), size=n),
+                "passed": self._rng.random(n) < self.policy_pass_rate,
+                "asset": self._rng.integers(0, len(ASSETS), size=n),
+            }
+        )
+        categories = {"policy": POLICIES, "asset": ASSETS}
+        return SyntheticBatch("policy-audit", columns, categories, keyed=("id",), prefix=f"pol{self.seed}")
+
+    def intel_feeds(self, n: int) -> SyntheticBatch:
+        """Generate ``n`` intel records, some joined to incidents."""
+
+        columns = self._base_columns(n)
+        columns.update(
+            {
+                "id": self._joined_keys(n),
+                "source": self._rng.integers(0, len(INTEL_SOURCES), size=n),
+                "risk": np.round(self._rng.random(n), 2),
+                "ttp": self._rng.integers(0, len(TTPS), size=n),
+            }
+        )
+        categories = {"source": INTEL_SOURCES, "ttp": TTPS}
+        return SyntheticBatch("intel-feed", columns, categories, keyed=("id",), prefix=f"int{self.seed}")
+
+    def mixed(self, n: int, mix: Sequence[float] = (0.6, 0.2, 0.2)) -> List[SyntheticBatch]:
+        """Split ``n`` records across the three demo topics by ``mix``."""
+
+        threat, policy, _ = (int(n * share) for share in mix)
+        return [self.threat_events(threat), self.policy_audits(policy), self.intel_feeds(n - threat - policy)]
+
+    def publish(
+        self,
+        pipeline: KafkaPipeline,
+        n: int,
+        batch_size: int = 10_000,
+        mix: Sequence[float] = (0.6, 0.2, 0.2),
+    ) -> int:
+        """Publish ``n`` generated records in batches and return the count sent."""
+
+        sent = 0
+        while sent < n:
+            for batch in self.mixed(min(batch_size, n - sent), mix):
+                pipeline.publish_batch(batch.topic, batch.to_records())
+                sent += len(batch)
+        return sent
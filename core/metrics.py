@@ -0,0 +1,310 @@
+"""Low-overhead counters, gauges and histograms with Prometheus text exposition.
+
+Hot-path updates go to a per-thread shard so they never take a lock; shards
+are only summed when the registry is scraped. Values that already live
+elsewhere (queue depth, consumer lag) are read by collectors at scrape time
+instead of being pushed on every event.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+Labels = Tuple[str, ...]
+# name, labels, value
+Sample = Tuple[str, Dict[str, str], float]
+# name, type, help, samples
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Sharded:
+    """Per-thread value cells merged on read."""
+
+    def __init__(self, width: int) -> None:
+        self._width = width
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = self._local.cell = [0.0] * self._width
+            with self._lock:
+                self._shards.append(cell)
+        return cell
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(values) for values in zip(*shards)] if shards else [0.0] * self._width
+
+
+class _Metric:
+    """Base for labelled metric families."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Labels, "_Metric"] = {}
+        self._children_lock = threading.Lock()
+
+    def _new_child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def labels(self, *values: object) -> "_Metric":
+        """Return the child metric for one combination of label values."""
+
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._children_lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self, labels: Dict[str, str]) -> List[Sample]:
+        raise NotImplementedError
+
+    def collect(self) -> Family:
+        """Return this family's samples for exposition."""
+
+        if not self.labelnames:
+            return self.name, self.kind, self.documentation, self._samples({})
+        samples: List[Sample] = []
+        for key, child in sorted(self._children.items()):
+            samples.extend(child._samples(dict(zip(self.labelnames, key))))
+        return self.name, self.kind, self.documentation, samples
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values = _Sharded(1)
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add ``amount`` (must be non-negative)."""
+
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._values.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._values.totals()[0]
+
+    def _samples(self, labels: Dict[str, str]) -> List[Sample]:
+        return [(f"{self.name}_total", labels, self.value)]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation)
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the value lazily on every scrape."""
+
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return float(self._function()) if self._function is not None else self._value
+
+    def _samples(self, labels: Dict[str, str]) -> List[Sample]:
+        return [(self.name, labels, self.value)]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket distribution with per-thread bucket counts."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # one cell per bucket, then +Inf, then the running sum
+        self._values = _Sharded(len(self.buckets) + 2)
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+
+        cell = self._values.cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall-clock duration of a ``with`` block in seconds."""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _samples(self, labels: Dict[str, str]) -> List[Sample]:
+        totals = self._values.totals()
+        samples: List[Sample] = []
+        cumulative = 0.0
+        for bound, count in zip(self.buckets + (math.inf,), totals):
+            cumulative += count
+            samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+        samples.append((f"{self.name}_sum", labels, totals[-1]))
+        samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """Named metric families plus scrape-time collectors."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args: object, **kwargs: object) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)  # type: ignore[return-value]
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """Add a callable producing metric families on every scrape."""
+
+        with self._lock:
+            self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        with self._lock:
+            self._collectors.remove(collector)
+
+    def collect(self) -> List[Family]:
+        """Return every family currently known to the registry."""
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        """Render all families in the Prometheus text exposition format."""
+
+        lines: List[str] = []
+        for name, kind, documentation, samples in self.collect():
+            if kind == "counter":
+                name = f"{name}_total"
+            lines.append(f"# HELP {name} {_escape(documentation)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                if labels:
+                    rendered = ",".join(f'{key}="{_escape(str(item))}"' for key, item in labels.items())
+                    sample_name = f"{sample_name}{{{rendered}}}"
+                lines.append(f"{sample_name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def pipeline_collector(pipeline: "object") -> Callable[[], List[Family]]:
+    """Build a collector reporting depth, lag and drops of a ``KafkaPipeline``.
+
+    Everything is read from the topics at scrape time, so publishing and
+    polling pay nothing for these series.
+    """
+
+    def collect() -> List[Family]:
+        depth: List[Sample] = []
+        lag: List[Sample] = []
+        dropped: List[Sample] = []
+        for name, topic in list(pipeline.topics.items()):  # type: ignore[attr-defined]
+            for index, log in enumerate(topic.partitions):
+                depth.append(("secops_topic_depth", {"topic": name, "partition": str(index)}, log.end_offset - log.start_offset))
+            for group in topic.groups():
+                lag.append(("secops_consumer_lag", {"topic": name, "group": group}, topic.lag(group)))
+            for group, count in list(topic.dropped.items()):
+                dropped.append(("secops_topic_dropped_total", {"topic": name, "group": group}, count))
+        return [
+            ("secops_topic_depth", "gauge", "Records retained per topic partition.", depth),
+            ("secops_consumer_lag", "gauge", "Records not yet consumed per topic and group.", lag),
+            ("secops_topic_dropped", "counter", "Records overwritten before a group read them.", dropped),
+        ]
+
+    return collect
@@ -0,0 +1,129 @@
+"""Metadata and lexical (BM25) inverted indexes for the vector store."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+Filters = Mapping[str, Union[str, Sequence[str]]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric terms, so ``T1021`` and ``t1021`` match."""
+
+    return _TOKEN.findall(text.lower())
+
+
+class MetadataIndex:
+    """Posting sets of row ids per metadata field and value."""
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[str, Set[int]]] = {}
+        self._fields: Dict[int, Dict[str, str]] = {}
+
+    def add(self, row: int, metadata: Mapping[str, str]) -> None:
+        """Index ``row`` under its metadata, replacing what it had before."""
+
+        self.remove(row)
+        fields = {field: str(value) for field, value in metadata.items()}
+        for field, value in fields.items():
+            self._postings.setdefault(field, {}).setdefault(value, set()).add(row)
+        self._fields[row] = fields
+
+    def remove(self, row: int) -> None:
+        for field, value in self._fields.pop(row, {}).items():
+            values = self._postings[field]
+            values[value].discard(row)
+            if not values[value]:
+                del values[value]
+
+    def rows(self, filters: Filters) -> np.ndarray:
+        """Return sorted rows matching every field; a list of values means any of them."""
+
+        matches: List[Set[int]] = []
+        for field, wanted in filters.items():
+            values = self._postings.get(field, {})
+            options = [wanted] if isinstance(wanted, str) else wanted
+            postings = [values.get(str(value), set()) for value in options]
+            matches.append(set().union(*postings) if len(postings) != 1 else postings[0])
+        if not matches:
+            return np.array(sorted(self._fields), dtype=np.int64)
+        matches.sort(key=len)  # intersect from the most selective field
+        selected = set(matches[0]).intersection(*matches[1:])
+        return np.array(sorted(selected), dtype=np.int64)
+
+
+class BM25Index:
+    """Okapi BM25 over a term -> {row: term frequency} inverted index.
+
+    Scoring walks only the postings of the query terms, so cost grows with
+    how common those terms are rather than with the size of the store.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._terms: Dict[int, Tuple[str, ...]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, row: int, text: str) -> None:
+        """Index ``text`` under ``row``, replacing what it had before."""
+
+        self.remove(row)
+        counts = Counter(tokenize(text))
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[row] = count
+        length = sum(counts.values())
+        self._lengths[row] = length
+        self._terms[row] = tuple(counts)
+        self._total_length += length
+
+    def remove(self, row: int) -> None:
+        for term in self._terms.pop(row, ()):
+            postings = self._postings[term]
+            del postings[row]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(row, 0)
+
+    def scores(self, query: str, allowed: Optional[Iterable[int]] = None) -> Dict[int, float]:
+        """Return the BM25 score of every row containing a query term."""
+
+        documents = len(self._lengths)
+        if not documents:
+            return {}
+        allowed_rows = None if allowed is None else set(allowed)
+        average = self._total_length / documents or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+            for row, count in postings.items():
+                if allowed_rows is not None and row not in allowed_rows:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[row] / average)
+                scores[row] = scores.get(row, 0.0) + idf * count * (self.k1 + 1) / (count + norm)
+        return scores
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> Dict[int, float]:
+    """Fuse ranked row lists with RRF: ``sum(1 / (k + rank))`` over the lists."""
+
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (k + rank)
+    return fused
@@ -2,10 +2,47 @@
 
 from __future__ import annotations
 
+import heapq
 import itertools
-from typing import Dict, Iterable, List, Tuple
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
-from .kafka_pipeline import TopicMessage
+import numpy as np
+
+from .event_batch import DictColumn, EventBatch, ListColumn, column_floats, column_objects
+from .kafka_pipeline import TopicMessage, decode_messages, encode_messages, message_key, partition_for
+from .metrics import REGISTRY
+
+SEVERITY_LEVELS = ("low", "medium", "high")
+SEVERITY_BASE = {"low": 0.3, "medium": 0.6, "high": 0.9}
+# Code ``len(SEVERITY_LEVELS)`` marks a severity outside the known levels.
+_SEVERITY_CODES = {level: code for code, level in enumerate(SEVERITY_LEVELS)}
+_BASE_BY_CODE = np.array([SEVERITY_BASE[level] for level in SEVERITY_LEVELS] + [0.5])
+VECTORIZE_THRESHOLD = 256
+_PROCESS_LATENCY = REGISTRY.histogram(
+    "secops_process_stream_seconds", "Wall time of one process_stream call.", ["path"]
+)
+
+
+def _new_incident(incident_id: str) -> Dict[str, object]:
+    return {"id": incident_id, "severity": "medium", "signals": [], "intel": [], "policy": []}
+
+
+def _join(bucket: Dict[str, object], message: TopicMessage) -> None:
+    """Fold one message into an incident candidate."""
+
+    if message.topic == "threat-events":
+        bucket["severity"] = message.value.get("severity", bucket["severity"])
+        bucket["anomaly_score"] = message.value.get("anomaly_score", 0.5)
+        bucket["signals"].append(message.value)
+    elif message.topic == "intel-feed":
+        bucket["intel"].append(message.value)
+    elif message.topic == "policy-audit":
+        bucket["policy"].append(message.value)
 
 
 def correlate_events(messages: Iterable[TopicMessage]) -> List[Dict[str, object]]:
@@ -13,61 +50,506 @@ def correlate_events(messages: Iterable[TopicMessage]) -> List[Dict[str, object]
 
     grouped: Dict[str, Dict[str, object]] = {}
     for message in messages:
-        incident_id = message.value.get("id") or message.value.get("asset") or message.value.get("ttp")
-        incident_id = str(incident_id)
-        bucket = grouped.setdefault(
-            incident_id,
-            {
-                "id": incident_id,
-                "severity": "medium",
-                "signals": [],
-                "intel": [],
-                "policy": [],
-            },
-        )
-        if message.topic == "threat-events":
-            bucket["severity"] = message.value.get("severity", bucket["severity"])
-            bucket["anomaly_score"] = message.value.get("anomaly_score", 0.5)
-            bucket["signals"].append(message.value)
-        elif message.topic == "intel-feed":
-            bucket["intel"].append(message.value)
-        elif message.topic == "policy-audit":
-            bucket["policy"].append(message.value)
+        incident_id = message_key(message.value)
+        bucket = grouped.get(incident_id)
+        if bucket is None:
+            bucket = grouped[incident_id] = _new_incident(incident_id)
+        _join(bucket, message)
     return list(grouped.values())
 
 
 def risk_score(event: Dict[str, object]) -> float:
     """Compute a deterministic risk score used for prioritisation."""
 
-    base = {"low": 0.3, "medium": 0.6, "high": 0.9}.get(event.get("severity", "medium"), 0.5)
+    base = SEVERITY_BASE.get(event.get("severity", "medium"), 0.5)
     anomaly = float(event.get("anomaly_score", 0.4))
     intel_boost = sum(feed.get("risk", 0.0) for feed in event.get("intel", [])) / 10
     policy_penalty = 0.1 * sum(1 for result in event.get("policy", []) if not result.get("passed", True))
     return round(min(base + anomaly + intel_boost + policy_penalty, 1.0), 3)
 
 
-def process_stream(messages: Iterable[TopicMessage]) -> List[Dict[str, object]]:
-    """Perform streaming joins and augment events with risk scoring."""
+def risk_scores(
+    severity_codes: np.ndarray,
+    anomaly_scores: np.ndarray,
+    intel_risk_sums: np.ndarray,
+    policy_failures: np.ndarray,
+) -> np.ndarray:
+    """Score a columnar batch of incidents in one vectorised pass.
+
+    The arithmetic mirrors :func:`risk_score` operation for operation, and the
+    few values whose third decimal sits on a rounding tie after scaling are
+    re-rounded with Python's ``round`` so both paths agree bit for bit.
+    """
+
+    raw = _BASE_BY_CODE[severity_codes] + anomaly_scores + intel_risk_sums / 10 + 0.1 * policy_failures
+    capped = np.minimum(raw, 1.0)
+    scaled = capped * 1000
+    scores = np.rint(scaled) / 1000
+    ties = np.flatnonzero(np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < 1e-6)
+    for index in ties.tolist():
+        scores[index] = round(float(capped[index]), 3)
+    return scores
+
+
+def risk_columns(events: Sequence[Dict[str, object]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Extract the columns consumed by :func:`risk_scores` from incident dicts."""
+
+    unknown = len(SEVERITY_LEVELS)
+    codes = np.fromiter(
+        (_SEVERITY_CODES.get(event.get("severity", "medium"), unknown) for event in events), np.intp, len(events)
+    )
+    anomaly = np.fromiter((float(event.get("anomaly_score", 0.4)) for event in events), np.float64, len(events))
+    intel = np.fromiter(
+        (sum(feed.get("risk", 0.0) for feed in event.get("intel", [])) for event in events), np.float64, len(events)
+    )
+    failures = np.fromiter(
+        (sum(1 for result in event.get("policy", []) if not result.get("passed", True)) for event in events),
+        np.float64,
+        len(events),
+    )
+    return codes, anomaly, intel, failures
+
+
+def _incident_keys(batch: EventBatch) -> List[str]:
+    """Vectorised :func:`message_key` over a message batch."""
+
+    keys = np.full(len(batch), None, dtype=object)
+    for name in ("ttp", "asset", "id"):  # lowest priority first, later fields win
+        column = batch.columns.get(name)
+        if column is None:
+            continue
+        if isinstance(column, DictColumn):
+            truthy = np.append(np.array([bool(value) for value in column.categories], dtype=bool), False)
+            present = truthy[column.codes]
+        else:
+            present = np.array([bool(value) for value in column_objects(column, len(batch))], dtype=bool)
+        keys[present] = column_objects(column, len(batch))[present]
+    return [str(key) for key in keys.tolist()]
+
+
+def _nested(batch: EventBatch, rows: np.ndarray, inverse: np.ndarray, incidents: int) -> ListColumn:
+    """Group ``rows`` per incident into a list column, keeping arrival order."""
+
+    ordered = rows[np.argsort(inverse[rows], kind="stable")]
+    offsets = np.zeros(incidents + 1, dtype=np.int64)
+    np.cumsum(np.bincount(inverse[rows], minlength=incidents), out=offsets[1:])
+    return ListColumn(offsets, EventBatch(batch.columns, len(batch), nulls=batch.nulls).take(ordered))
+
+
+def process_batch(batch: EventBatch) -> EventBatch:
+    """Columnar equivalent of :func:`process_stream` for a message batch.
+
+    Joins, severity/anomaly selection, intel sums and policy failure counts
+    are computed with array operations and scored by :func:`risk_scores`;
+    ``to_records()`` on the result equals ``process_stream`` on the messages.
+    """
+
+    length = len(batch)
+    order: Dict[str, int] = {}
+    inverse = np.fromiter(
+        (order.setdefault(key, len(order)) for key in _incident_keys(batch)), np.int64, length
+    )
+    incidents = len(order)
+    topics = column_objects(batch.meta.get("topic"), length)
+    threat = np.flatnonzero(topics == "threat-events")
+    intel = np.flatnonzero(topics == "intel-feed")
+    policy = np.flatnonzero(topics == "policy-audit")
+
+    severity_values = column_objects(batch.columns.get("severity"), length)
+    rated = threat[severity_values[threat] != None]  # noqa: E711 - elementwise comparison
+    last_rated = np.full(incidents, -1, dtype=np.int64)
+    np.maximum.at(last_rated, inverse[rated], rated)
+    severity = np.full(incidents, "medium", dtype=object)
+    severity[last_rated >= 0] = severity_values[last_rated[last_rated >= 0]]
+
+    last_threat = np.full(incidents, -1, dtype=np.int64)
+    np.maximum.at(last_threat, inverse[threat], threat)
+    anomaly = np.full(incidents, np.nan)
+    observed = last_threat >= 0
+    anomaly[observed] = column_floats(batch.columns.get("anomaly_score"), length, 0.5)[last_threat[observed]]
+
+    risk = column_floats(batch.columns.get("risk"), length, 0.0)
+    intel_sums = np.bincount(inverse[intel], weights=risk[intel], minlength=incidents)
+    passed = column_objects(batch.columns.get("passed"), length)
+    failed = policy[np.array([value is not None and not value for value in passed[policy]], dtype=bool)]
+    failures = np.bincount(inverse[failed], minlength=incidents).astype(np.float64)
+
+    unknown = len(SEVERITY_LEVELS)
+    codes = np.fromiter((_SEVERITY_CODES.get(value, unknown) for value in severity), np.intp, incidents)
+    scores = risk_scores(codes, np.where(observed, anomaly, 0.4), intel_sums, failures)
+    columns = {
+        "id": DictColumn(np.arange(incidents, dtype=np.int32), np.array(list(order), dtype=object)),
+        "severity": DictColumn.encode(severity.tolist()),
+        "signals": _nested(batch, threat, inverse, incidents),
+        "intel": _nested(batch, intel, inverse, incidents),
+        "policy": _nested(batch, policy, inverse, incidents),
+        "anomaly_score": anomaly,
+        "risk_score": scores,
+    }
+    return EventBatch(columns, incidents)
+
+
+def process_stream(
+    messages: Union[Iterable[TopicMessage], EventBatch],
+) -> Union[List[Dict[str, object]], EventBatch]:
+    """Perform streaming joins and augment events with risk scoring.
+
+    An :class:`EventBatch` is processed column-wise and returned as an
+    enriched ``EventBatch``; any other iterable yields incident dictionaries.
+    """
+
+    if isinstance(messages, EventBatch):
+        with _PROCESS_LATENCY.labels("columnar").time():
+            return process_batch(messages)
+    with _PROCESS_LATENCY.labels("records").time():
+        correlated = correlate_events(messages)
+        if len(correlated) >= VECTORIZE_THRESHOLD:
+            scores = risk_scores(*risk_columns(correlated))
+            for event, score in zip(correlated, scores.tolist()):
+                event["risk_score"] = score
+            return correlated
+        for event in correlated:
+            event["risk_score"] = risk_score(event)
+        return correlated
+
+
+def _process_shard(frame: bytes) -> List[Dict[str, object]]:
+    """Worker entry point: decode one shard and run the regular processor."""
+
+    return process_stream(decode_messages(frame))
+
+
+def process_stream_sharded(
+    messages: Iterable[TopicMessage],
+    shards: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    min_batch: int = 2000,
+) -> List[Dict[str, object]]:
+    """Correlate and score messages across a pool of worker processes.
+
+    Messages are hash-partitioned on the same incident key used by
+    :func:`correlate_events`, so every incident is built entirely inside one
+    shard. Shards travel to the workers as binary frames and the results are
+    merged back in first-seen order, matching :func:`process_stream`. Pass a
+    long-lived ``executor`` to avoid paying pool start-up on every call;
+    batches smaller than ``min_batch`` are processed inline.
+    """
+
+    messages = list(messages)
+    shards = shards or os.cpu_count() or 1
+    if shards == 1 or len(messages) < min_batch:
+        return process_stream(messages)
+    buckets: List[List[TopicMessage]] = [[] for _ in range(shards)]
+    order: Dict[str, int] = {}
+    for message in messages:
+        key = message_key(message.value)
+        if key not in order:
+            order[key] = len(order)
+        buckets[partition_for(key, shards)].append(message)
+    frames = [encode_messages(bucket) for bucket in buckets if bucket]
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=shards) as pool:
+            results = list(pool.map(_process_shard, frames))
+    else:
+        results = list(executor.map(_process_shard, frames))
+    merged = [event for shard in results for event in shard]
+    merged.sort(key=lambda event: order[event["id"]])  # type: ignore[index]
+    return merged
+
 
-    correlated = correlate_events(messages)
-    for event in correlated:
-        event["risk_score"] = risk_score(event)
-    return correlated
+def _batch_severities(batch: EventBatch) -> np.ndarray:
+    severities = column_objects(batch.columns.get("severity"), len(batch))
+    severities[severities == None] = "medium"  # noqa: E711 - elementwise comparison
+    return severities
 
 
-def derive_threat_summary(enriched_events: Iterable[Dict[str, object]]) -> Dict[str, float]:
+def derive_threat_summary(enriched_events: Union[Iterable[Dict[str, object]], EventBatch]) -> Dict[str, float]:
     """Produce aggregated KPI metrics for the dashboard."""
 
-    events = list(enriched_events)
-    if not events:
-        return {"high": 0, "medium": 0, "low": 0, "average_risk": 0.0}
-    severity_counts = {key: 0 for key in ("high", "medium", "low")}
-    risk_total = 0.0
-    for event in events:
+    if isinstance(enriched_events, EventBatch):
+        summary: Dict[str, float] = {key: 0 for key in ("high", "medium", "low")}
+        labels, counts = np.unique(_batch_severities(enriched_events).astype(str), return_counts=True)
+        summary.update(zip(labels.tolist(), counts.tolist()))
+        risk = column_floats(enriched_events.columns.get("risk_score"), len(enriched_events), 0.0)
+        # cumsum adds left to right like the per-event path, so rounding matches exactly
+        summary["average_risk"] = round(float(np.cumsum(risk)[-1]) / len(risk), 3) if len(risk) else 0.0
+        return summary
+    aggregator = ThreatSummaryAggregator(breakdowns=())
+    aggregator.update_many(enriched_events)
+    return aggregator.snapshot()
+
+
+class ThreatSummaryAggregator:
+    """Running KPI aggregates updated in O(1) per enriched event.
+
+    Severity counts and the risk total are maintained incrementally, with
+    optional per-dimension breakdowns (``source`` is read from the first
+    signal when the incident itself does not carry it). With ``window`` set,
+    events older than ``window`` seconds are subtracted again as time moves
+    on, so :meth:`snapshot` always reflects the recent stream only.
+    """
+
+    def __init__(self, window: Optional[float] = None, breakdowns: Sequence[str] = ("source", "tenant")) -> None:
+        self.window = window
+        self.breakdowns = tuple(breakdowns)
+        self._counts: Dict[str, int] = {key: 0 for key in ("high", "medium", "low")}
+        self._risk_total = 0.0
+        self._total = 0
+        self._dimensions: Dict[str, Dict[str, List[float]]] = {name: {} for name in self.breakdowns}
+        self._entries: Deque[Tuple[float, str, float, Tuple[Optional[str], ...]]] = deque()
+
+    def __len__(self) -> int:
+        return self._total
+
+    def _dimension(self, event: Dict[str, Any], name: str) -> Optional[str]:
+        value = event.get(name)
+        if value is None and event.get("signals"):
+            value = event["signals"][0].get(name)
+        return None if value is None else str(value)
+
+    def _apply(self, severity: str, risk: float, dimensions: Tuple[Optional[str], ...], sign: int) -> None:
+        count = self._counts.get(severity, 0) + sign
+        if count or severity in ("high", "medium", "low"):
+            self._counts[severity] = count
+        else:
+            del self._counts[severity]
+        self._total += sign
+        self._risk_total = self._risk_total + sign * risk if self._total else 0.0
+        for name, value in zip(self.breakdowns, dimensions):
+            if value is None:
+                continue
+            stats = self._dimensions[name].setdefault(value, [0, 0.0])
+            stats[0] += sign
+            stats[1] = stats[1] + sign * risk if stats[0] else 0.0
+            if not stats[0]:
+                del self._dimensions[name][value]
+
+    def update(self, event: Dict[str, Any], timestamp: Optional[float] = None) -> None:
+        """Fold one enriched event into the running aggregates."""
+
         severity = str(event.get("severity", "medium"))
-        if severity not in severity_counts:
-            severity_counts[severity] = 0
-        severity_counts[severity] += 1
-        risk_total += float(event.get("risk_score", 0.0))
-    severity_counts["average_risk"] = round(risk_total / len(events), 3)
-    return severity_counts
+        risk = float(event.get("risk_score", 0.0))
+        dimensions = tuple(self._dimension(event, name) for name in self.breakdowns)
+        self._apply(severity, risk, dimensions, 1)
+        if self.window is not None:
+            now = time.time() if timestamp is None else timestamp
+            self._entries.append((now, severity, risk, dimensions))
+            self.expire(now)
+
+    def update_many(
+        self, events: Union[Iterable[Dict[str, Any]], EventBatch], timestamp: Optional[float] = None
+    ) -> None:
+        """Fold a batch of enriched events into the running aggregates."""
+
+        if isinstance(events, EventBatch):
+            self._update_batch(events, timestamp)
+            return
+        for event in events:
+            self.update(event, timestamp)
+
+    def _batch_dimension(self, batch: EventBatch, name: str) -> List[Optional[str]]:
+        values = column_objects(batch.columns.get(name), len(batch))
+        signals = batch.columns.get("signals")
+        if isinstance(signals, ListColumn):
+            fallback = np.flatnonzero((values == None) & (signals.lengths() > 0))  # noqa: E711
+            nested = column_objects(signals.values.columns.get(name), len(signals.values))
+            values[fallback] = nested[signals.offsets[fallback]]
+        return [None if value is None else str(value) for value in values.tolist()]
+
+    def _update_batch(self, batch: EventBatch, timestamp: Optional[float]) -> None:
+        severities = [str(value) for value in _batch_severities(batch).tolist()]
+        risks = column_floats(batch.columns.get("risk_score"), len(batch), 0.0).tolist()
+        dimensions = list(zip(*(self._batch_dimension(batch, name) for name in self.breakdowns)))
+        if not self.breakdowns:
+            dimensions = [()] * len(batch)
+        now = time.time() if timestamp is None else timestamp
+        for severity, risk, dimension in zip(severities, risks, dimensions):
+            self._apply(severity, risk, dimension, 1)
+            if self.window is not None:
+                self._entries.append((now, severity, risk, dimension))
+        self.expire(now)
+
+    def expire(self, now: Optional[float] = None) -> None:
+        """Drop events that fell out of the sliding window."""
+
+        if self.window is None:
+            return
+        horizon = (time.time() if now is None else now) - self.window
+        while self._entries and self._entries[0][0] <= horizon:
+            _, severity, risk, dimensions = self._entries.popleft()
+            self._apply(severity, risk, dimensions, -1)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return KPI metrics in the shape produced by ``derive_threat_summary``."""
+
+        summary: Dict[str, float] = dict(self._counts)
+        summary["average_risk"] = round(self._risk_total / self._total, 3) if self._total else 0.0
+        return summary
+
+    def breakdown(self, name: str) -> Dict[str, Dict[str, float]]:
+        """Return event counts and average risk per value of one dimension."""
+
+        return {
+            value: {"count": count, "average_risk": round(total / count, 3)}
+            for value, (count, total) in self._dimensions[name].items()
+        }
+
+
+class _WindowState:
+    """Incident candidate accumulated for one key and event-time window."""
+
+    __slots__ = ("incident", "sequence", "fired")
+
+    def __init__(self, incident: Dict[str, object], sequence: int) -> None:
+        self.incident = incident
+        self.sequence = sequence
+        self.fired = False
+
+
+class WindowedCorrelator:
+    """Stateful event-time correlation across a continuous stream.
+
+    Messages are joined per incident key inside tumbling windows of ``size``
+    seconds, or sliding windows when ``slide`` is given. Event time comes from
+    ``value[time_field]`` and falls back to the message timestamp. The
+    watermark trails the newest event time by ``max_out_of_orderness`` and
+    advances with every event. A window fires once the watermark passes its
+    end, late events within ``allowed_lateness`` re-emit the updated window
+    and events too late for all of their windows are counted in
+    ``late_dropped``. At most ``max_state`` windows are held: the least
+    recently updated window is emitted early (flagged ``evicted``) to keep
+    memory flat, unless it already fired, in which case it stays closed to
+    later events instead of firing twice.
+    """
+
+    def __init__(
+        self,
+        size: float = 60.0,
+        slide: Optional[float] = None,
+        allowed_lateness: float = 0.0,
+        max_out_of_orderness: float = 5.0,
+        max_state: int = 10_000,
+        time_field: str = "event_time",
+    ) -> None:
+        if size <= 0 or (slide is not None and not 0 < slide <= size):
+            raise ValueError("Window size must be positive and slide within (0, size]")
+        self.size = size
+        self.slide = slide or size
+        self.allowed_lateness = allowed_lateness
+        self.max_out_of_orderness = max_out_of_orderness
+        self.max_state = max_state
+        self.time_field = time_field
+        self.watermark = -math.inf
+        self.late_dropped = 0
+        self.evicted = 0
+        self._max_event_time = -math.inf
+        self._state: "OrderedDict[Tuple[str, float], _WindowState]" = OrderedDict()
+        self._fire_queue: List[Tuple[float, int, Tuple[str, float]]] = []
+        self._purge_queue: List[Tuple[float, int, Tuple[str, float]]] = []
+        # fired windows whose state was evicted before their lateness ran out
+        self._closed: Set[Tuple[str, float]] = set()
+        # fired windows updated by late events and not re-emitted yet, in update order
+        self._updated: Dict[Tuple[str, float], None] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def _window_starts(self, event_time: float) -> List[float]:
+        last = math.floor(event_time / self.slide) * self.slide
+        starts = []
+        start = last
+        while start > event_time - self.size:
+            starts.append(start)
+            start -= self.slide
+        return starts
+
+    def _emit(self, window: Tuple[str, float], state: _WindowState, **flags: bool) -> Dict[str, object]:
+        incident = dict(state.incident)
+        for name in ("signals", "intel", "policy"):
+            incident[name] = list(incident[name])  # type: ignore[call-overload]
+        incident["window_start"] = window[1]
+        incident["window_end"] = window[1] + self.size
+        incident["risk_score"] = risk_score(incident)
+        incident.update(flags)
+        return incident
+
+    def process(self, messages: Iterable[TopicMessage]) -> List[Dict[str, object]]:
+        """Join messages into their windows and return every window that fired."""
+
+        emitted: List[Dict[str, object]] = []
+        for message in messages:
+            event_time = float(message.value.get(self.time_field, message.timestamp))
+            self._max_event_time = max(self._max_event_time, event_time)
+            incident_id = message_key(message.value)
+            joined = False
+            for start in self._window_starts(event_time):
+                end = start + self.size
+                window = (incident_id, start)
+                if end + self.allowed_lateness <= self.watermark or window in self._closed:
+                    continue
+                state = self._state.get(window)
+                if state is None:
+                    state = self._state[window] = _WindowState(_new_incident(incident_id), next(self._sequence))
+                    heapq.heappush(self._fire_queue, (end, state.sequence, window))
+                    if len(self._state) > self.max_state:
+                        emitted.extend(self._evict())
+                else:
+                    self._state.move_to_end(window)
+                _join(state.incident, message)
+                joined = True
+                if state.fired:
+                    self._updated[window] = None
+            if not joined:
+                self.late_dropped += 1
+            self.watermark = max(self.watermark, self._max_event_time - self.max_out_of_orderness)
+            emitted.extend(self._fire(self.watermark))
+        for window in self._updated:
+            emitted.append(self._emit(window, self._state[window], late=True))
+        self._updated.clear()
+        return emitted
+
+    def _evict(self) -> List[Dict[str, object]]:
+        """Drop the least recently updated window, emitting it unless it already fired."""
+
+        window, state = self._state.popitem(last=False)
+        self.evicted += 1
+        if not state.fired:
+            return [self._emit(window, state, evicted=True)]
+        self._closed.add(window)
+        if window in self._updated:
+            del self._updated[window]
+            return [self._emit(window, state, late=True)]
+        return []
+
+    def _fire(self, watermark: float) -> List[Dict[str, object]]:
+        emitted: List[Dict[str, object]] = []
+        while self._fire_queue and self._fire_queue[0][0] <= watermark:
+            end, sequence, window = heapq.heappop(self._fire_queue)
+            state = self._state.get(window)
+            if state is None or state.sequence != sequence:
+                continue
+            state.fired = True
+            emitted.append(self._emit(window, state))
+            heapq.heappush(self._purge_queue, (end + self.allowed_lateness, sequence, window))
+        while self._purge_queue and self._purge_queue[0][0] <= watermark:
+            _, sequence, window = heapq.heappop(self._purge_queue)
+            self._closed.discard(window)
+            state = self._state.get(window)
+            if state is not None and state.sequence == sequence:
+                if window in self._updated:
+                    del self._updated[window]
+                    emitted.append(self._emit(window, state, late=True))
+                del self._state[window]
+        return emitted
+
+    def flush(self) -> List[Dict[str, object]]:
+        """Fire every pending window, e.g. at the end of a replay."""
+
+        emitted = self._fire(math.inf)
+        self._state.clear()
+        self._fire_queue.clear()
+        self._purge_queue.clear()
+        self._closed.clear()
+        self._updated.clear()
+        return emitted
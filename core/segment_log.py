@@ -0,0 +1,311 @@
+"""Durable append-only segment log backing Kafka topic partitions on disk."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .kafka_pipeline import TopicMessage
+
+# offset, timestamp, key length, value length
+RECORD_HEADER = struct.Struct("<qdII")
+# offset, byte position, timestamp
+INDEX_ENTRY = struct.Struct("<qQd")
+
+
+class _Segment:
+    """One ``.log`` file plus its sparse ``.index`` of offset positions."""
+
+    def __init__(self, directory: Path, base_offset: int) -> None:
+        self.base_offset = base_offset
+        self.log_path = directory / f"{base_offset:020d}.log"
+        self.index_path = directory / f"{base_offset:020d}.index"
+        self.index_offsets: List[int] = []
+        self.index_positions: List[int] = []
+        self.index_timestamps: List[float] = []
+        self.next_offset = base_offset
+        self.created = time.time()
+        self.size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._map_lock = threading.Lock()
+
+    def load_index(self) -> None:
+        """Read the sparse index written alongside the segment."""
+
+        if not self.index_path.exists():
+            return
+        data = self.index_path.read_bytes()
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        for offset, position, timestamp in INDEX_ENTRY.iter_unpack(data[:usable]):
+            self.index_offsets.append(offset)
+            self.index_positions.append(position)
+            self.index_timestamps.append(timestamp)
+        if self.index_timestamps:
+            self.created = self.index_timestamps[0]
+
+    def view(self) -> Optional[mmap.mmap]:
+        """Return a read-only map covering every byte flushed so far."""
+
+        with self._map_lock:
+            if self.size == 0:
+                return None
+            if self._map is None or len(self._map) < self.size:
+                with open(self.log_path, "rb") as handle:
+                    self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map
+
+    def seek_offset(self, offset: int) -> int:
+        """Return the byte position of the last indexed record at or before ``offset``."""
+
+        slot = bisect.bisect_right(self.index_offsets, offset) - 1
+        return self.index_positions[slot] if slot >= 0 else 0
+
+    def seek_timestamp(self, timestamp: float) -> int:
+        """Return a byte position no later than the first record at ``timestamp``."""
+
+        slot = bisect.bisect_left(self.index_timestamps, timestamp) - 1
+        return self.index_positions[slot] if slot >= 0 else 0
+
+    def records(self, position: int, limit: int) -> Iterator[tuple]:
+        """Decode record headers from ``position`` up to byte ``limit``."""
+
+        view = self.view()
+        if view is None:
+            return
+        limit = min(limit, len(view))
+        while position + RECORD_HEADER.size <= limit:
+            offset, timestamp, key_length, value_length = RECORD_HEADER.unpack_from(view, position)
+            body = position + RECORD_HEADER.size
+            end = body + key_length + value_length
+            if end > limit:
+                return
+            yield offset, timestamp, view, body, key_length, value_length, end
+            position = end
+
+
+class SegmentLog:
+    """Append-only on-disk partition split into size- and time-rolled segments.
+
+    Records are appended to the active segment and a sparse index entry is
+    written every ``index_interval_bytes``. Reads memory-map the segment files
+    and decode records one at a time, so replay never materialises a whole
+    segment in Python.
+    """
+
+    def __init__(
+        self,
+        topic: str,
+        partition: int,
+        directory: Path,
+        segment_bytes: int = 16 * 1024 * 1024,
+        segment_ms: Optional[int] = None,
+        index_interval_bytes: int = 4096,
+        retention_segments: Optional[int] = None,
+        fsync: bool = False,
+    ) -> None:
+        self.topic = topic
+        self.partition = partition
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.segment_ms = segment_ms
+        self.index_interval_bytes = index_interval_bytes
+        self.retention_segments = retention_segments
+        self.fsync = fsync
+        self._segments: List[_Segment] = []
+        self._lock = threading.Lock()
+        self._recover()
+        self._log_handle = open(self._active.log_path, "ab")
+        self._index_handle = open(self._active.index_path, "ab")
+        self._since_index = self.index_interval_bytes
+
+    def _recover(self) -> None:
+        for path in sorted(self.directory.glob("*.log")):
+            segment = _Segment(self.directory, int(path.stem))
+            segment.load_index()
+            segment.size = path.stat().st_size
+            self._segments.append(segment)
+        if not self._segments:
+            self._segments.append(_Segment(self.directory, 0))
+        for previous, following in zip(self._segments, self._segments[1:]):
+            previous.next_offset = following.base_offset
+        active = self._segments[-1]
+        slot = bisect.bisect_left(active.index_positions, active.size) - 1
+        valid = active.index_positions[slot] if slot >= 0 else 0
+        active.next_offset = active.index_offsets[slot] if slot >= 0 else active.base_offset
+        for offset, _, _, _, _, _, end in active.records(valid, active.size):
+            active.next_offset = offset + 1
+            valid = end
+        if valid < active.size:  # drop a torn write left by a crash
+            active._map = None
+            with open(active.log_path, "r+b") as handle:
+                handle.truncate(valid)
+            active.size = valid
+        keep = bisect.bisect_left(active.index_positions, valid)
+        if keep < len(active.index_positions):  # forget index entries past the torn write
+            del active.index_offsets[keep:], active.index_positions[keep:], active.index_timestamps[keep:]
+            active.index_path.write_bytes(
+                b"".join(
+                    INDEX_ENTRY.pack(*entry)
+                    for entry in zip(active.index_offsets, active.index_positions, active.index_timestamps)
+                )
+            )
+
+    @property
+    def _active(self) -> _Segment:
+        return self._segments[-1]
+
+    @property
+    def start_offset(self) -> int:
+        """Return the oldest offset still retained on disk."""
+
+        return self._segments[0].base_offset
+
+    @property
+    def end_offset(self) -> int:
+        """Return the offset that will be assigned to the next record."""
+
+        return self._active.next_offset
+
+    def _roll(self, now: float) -> None:
+        self._log_handle.close()
+        self._index_handle.close()
+        segment = _Segment(self.directory, self._active.next_offset)
+        segment.created = now
+        self._segments.append(segment)
+        self._log_handle = open(segment.log_path, "ab")
+        self._index_handle = open(segment.index_path, "ab")
+        self._since_index = self.index_interval_bytes
+        if self.retention_segments is not None:
+            while len(self._segments) > self.retention_segments:
+                expired = self._segments.pop(0)
+                expired.log_path.unlink(missing_ok=True)
+                expired.index_path.unlink(missing_ok=True)
+
+    def append(self, value: Dict[str, Any], key: str) -> TopicMessage:
+        """Append a single value to the active segment."""
+
+        return self.append_batch([value], [key])[0]
+
+    def append_batch(self, values: List[Dict[str, Any]], keys: List[str]) -> List[TopicMessage]:
+        """Append values in order, rolling segments by size or age."""
+
+        timestamp = time.time()
+        messages: List[TopicMessage] = []
+        with self._lock:
+            active = self._active
+            if active.size and (
+                active.size >= self.segment_bytes
+                or (self.segment_ms is not None and (timestamp - active.created) * 1000 >= self.segment_ms)
+            ):
+                self._roll(timestamp)
+                active = self._active
+            elif not active.size:
+                active.created = timestamp
+            chunks: List[bytes] = []
+            position = active.size
+            for value, key in zip(values, keys):
+                offset = active.next_offset + len(messages)
+                key_bytes = key.encode()
+                value_bytes = json.dumps(value).encode()
+                if self._since_index >= self.index_interval_bytes:
+                    self._index_handle.write(INDEX_ENTRY.pack(offset, position, timestamp))
+                    active.index_offsets.append(offset)
+                    active.index_positions.append(position)
+                    active.index_timestamps.append(timestamp)
+                    self._since_index = 0
+                record = RECORD_HEADER.pack(offset, timestamp, len(key_bytes), len(value_bytes))
+                chunks.extend((record, key_bytes, value_bytes))
+                length = len(record) + len(key_bytes) + len(value_bytes)
+                position += length
+                self._since_index += length
+                messages.append(
+                    TopicMessage(
+                        topic=self.topic,
+                        value=value,
+                        timestamp=timestamp,
+                        key=key,
+                        partition=self.partition,
+                        offset=offset,
+                    )
+                )
+            self._log_handle.write(b"".join(chunks))
+            self._log_handle.flush()
+            self._index_handle.flush()
+            if self.fsync:
+                os.fsync(self._log_handle.fileno())
+            active.size = position
+            active.next_offset += len(messages)
+        return messages
+
+    def _decode(self, entry: tuple) -> TopicMessage:
+        offset, timestamp, view, body, key_length, value_length, _ = entry
+        key = view[body : body + key_length].decode()
+        value = json.loads(view[body + key_length : body + key_length + value_length])
+        return TopicMessage(
+            topic=self.topic, value=value, timestamp=timestamp, key=key, partition=self.partition, offset=offset
+        )
+
+    def replay(
+        self,
+        offset: Optional[int] = None,
+        timestamp: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[TopicMessage]:
+        """Lazily yield records from an offset or timestamp onwards.
+
+        ``until`` stops the replay at the first record newer than the given
+        timestamp, which makes incident windows cheap to re-run.
+        """
+
+        segments = list(self._segments)
+        if offset is not None:
+            first = max(bisect.bisect_right([segment.base_offset for segment in segments], offset) - 1, 0)
+        elif timestamp is not None:
+            created = [segment.created for segment in segments]
+            first = max(bisect.bisect_right(created, timestamp) - 1, 0)
+        else:
+            first = 0
+        for segment in segments[first:]:
+            limit = segment.size
+            if offset is not None:
+                position = segment.seek_offset(offset)
+            elif timestamp is not None:
+                position = segment.seek_timestamp(timestamp)
+            else:
+                position = 0
+            for entry in segment.records(position, limit):
+                record_offset, record_time = entry[0], entry[1]
+                if offset is not None and record_offset < offset:
+                    continue
+                if timestamp is not None and record_time < timestamp:
+                    continue
+                if until is not None and record_time > until:
+                    return
+                yield self._decode(entry)
+
+    def read(self, offset: int, max_records: Optional[int] = None) -> List[TopicMessage]:
+        """Return records starting at ``offset`` without removing them."""
+
+        records: List[TopicMessage] = []
+        if offset >= self.end_offset:
+            return records
+        for message in self.replay(offset=max(offset, self.start_offset)):
+            records.append(message)
+            if max_records is not None and len(records) >= max_records:
+                break
+        return records
+
+    def close(self) -> None:
+        """Flush and close the active segment files."""
+
+        with self._lock:
+            self._log_handle.close()
+            self._index_handle.close()
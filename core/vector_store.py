@@ -2,17 +2,110 @@
 
 from __future__ import annotations
 
+import json
 import math
-from typing import Dict, List, Tuple
+import os
+import shutil
+import struct
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .ann_index import IVFIndex
+from .search_index import BM25Index, Filters, MetadataIndex, reciprocal_rank_fusion
+
+DIMENSIONS = 32
+SNAPSHOT_VECTORS = "vectors.npy"
+SNAPSHOT_TABLE = "table.json"
+DELTA_LOG = "delta.log"
+# names the live snapshot directory; replacing it publishes a snapshot
+SNAPSHOT_MANIFEST = "CURRENT"
+SNAPSHOT_PREFIX = "snapshot-"
+# seconds a superseded snapshot is kept for readers and writers still using it
+SNAPSHOT_GRACE = 300.0
+# operation, key length, metadata length, text length; adds are followed by the float32 vector
+_DELTA_HEADER = struct.Struct("<BIII")
+_OP_ADD = 1
+_OP_DELETE = 2
 
 
 def embed(text: str) -> List[float]:
     """Create a deterministic embedding based on character ordinals."""
 
-    base = [float((ord(char) % 32) / 32) for char in text[:32]]
-    if len(base) < 32:
-        base.extend([0.0] * (32 - len(base)))
-    return base
+    return embed_many([text])[0].tolist()
+
+
+def embed_many(texts: Sequence[str]) -> np.ndarray:
+    """Embed many texts into a ``(len(texts), DIMENSIONS)`` float32 array.
+
+    Every text is clipped and NUL-padded to ``DIMENSIONS`` characters and
+    the whole batch is encoded as UTF-32 once, so the code points come out
+    of a single buffer instead of a Python loop per character.
+    """
+
+    padded = "".join(text[:DIMENSIONS].ljust(DIMENSIONS, "\0") for text in texts)
+    codes = np.frombuffer(padded.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    vectors = (codes % DIMENSIONS).astype(np.float32).reshape(len(texts), DIMENSIONS)
+    vectors /= DIMENSIONS
+    return vectors
+
+
+class EmbeddingCache:
+    """Bounded LRU cache of text embeddings with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must not be negative")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """Return embeddings for ``texts``, computing all misses in one batch."""
+
+        vectors = np.empty((len(texts), DIMENSIONS), dtype=np.float32)
+        missing: Dict[str, List[int]] = {}
+        for position, text in enumerate(texts):
+            cached = self._entries.get(text)
+            if cached is None:
+                missing.setdefault(text, []).append(position)
+            else:
+                self._entries.move_to_end(text)
+                vectors[position] = cached
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            computed = embed_many(list(missing))
+            for row, (text, positions) in zip(computed, missing.items()):
+                vectors[positions] = row
+                if self.maxsize:
+                    self._entries[text] = row
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return vectors
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the current hit ratio."""
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
 
 
 def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
@@ -24,28 +117,646 @@ def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
     return round(dot / (norm_a * norm_b), 3)
 
 
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length as float32; all-zero rows stay zero."""
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _write_durably(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` and flush it to disk before returning."""
+
+    with open(path, "wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
 class VectorStore:
-    """In-memory vector database with similarity search."""
+    """In-memory vector database with similarity search.
+
+    Vectors are kept pre-normalised in one contiguous float32 matrix whose
+    capacity doubles as it fills, next to a side table of keys and metadata.
+    A search is a single matrix product followed by a partial sort.
+    Deleted rows are tombstoned and reclaimed once they make up half of the
+    matrix. :meth:`build_index` switches searches to an approximate IVF
+    index that is kept up to date by later inserts and deletes. Query
+    embeddings are memoised in an :class:`EmbeddingCache`. Metadata filters
+    and BM25 over the stored text are served from inverted indexes built on
+    first use, so filtered and hybrid queries only touch matching postings.
+
+    A store written with :meth:`save` and opened with :meth:`load` keeps the
+    snapshot rows in a read-only memory map shared by every process that
+    opens it; new rows live in an in-memory tail and every change is
+    appended to a delta log until :meth:`compact` writes a new snapshot.
+    Each snapshot is a versioned directory holding its matrix, side table and
+    delta log, and a ``CURRENT`` manifest names the live one. Writers check
+    the manifest before appending and follow a snapshot published by another
+    writer; superseded snapshots are removed only after ``SNAPSHOT_GRACE``
+    seconds.
+    """
+
+    def __init__(self, dim: int = DIMENSIONS, capacity: int = 16, cache_size: int = 1024) -> None:
+        self.dim = dim
+        self.embeddings = EmbeddingCache(cache_size)
+        self._base: Optional[np.ndarray] = None
+        self._matrix = np.zeros((max(capacity, 1), dim), dtype=np.float32)
+        self._live = np.zeros(max(capacity, 1), dtype=bool)
+        self._size = 0
+        self._keys: List[Optional[str]] = []
+        self._metadata: List[Optional[Dict[str, str]]] = []
+        self._texts: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self.index: Optional[IVFIndex] = None
+        self._filter_index: Optional[MetadataIndex] = None
+        self._term_index: Optional[BM25Index] = None
+        self.path: Optional[Path] = None
+        self._snapshot: Optional[Path] = None
+        self._manifest_stamp: Optional[Tuple[int, int]] = None
+        self._delta: Optional[BinaryIO] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
 
-    def __init__(self) -> None:
-        self._store: Dict[str, Tuple[List[float], Dict[str, str]]] = {}
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows
+
+    @property
+    def _base_rows(self) -> int:
+        return 0 if self._base is None else len(self._base)
+
+    def _grow(self, needed: int) -> None:
+        """Make room for ``needed`` rows in total, doubling the tail buffer."""
+
+        tail = needed - self._base_rows
+        if tail > len(self._matrix):
+            capacity = len(self._matrix)
+            while capacity < tail:
+                capacity *= 2
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            matrix[: self._size - self._base_rows] = self._matrix[: self._size - self._base_rows]
+            self._matrix = matrix
+        if needed > len(self._live):
+            live = np.zeros(max(needed, 2 * len(self._live)), dtype=bool)
+            live[: self._size] = self._live[: self._size]
+            self._live = live
+
+    def _vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Gather the stored vectors of ``rows`` from the snapshot and the tail."""
+
+        base_rows = self._base_rows
+        if self._base is None:
+            return self._matrix[rows]
+        in_base = rows < base_rows
+        vectors = np.empty((len(rows), self.dim), dtype=np.float32)
+        vectors[in_base] = self._base[rows[in_base]]
+        vectors[~in_base] = self._matrix[rows[~in_base] - base_rows]
+        return vectors
+
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        """Score ``queries`` against every row, snapshot first."""
+
+        tail = queries @ self._matrix[: self._size - self._base_rows].T
+        if self._base is None:
+            return tail
+        return np.concatenate([queries @ self._base.T, tail], axis=1)
 
     def add(self, key: str, text: str, metadata: Dict[str, str]) -> None:
         """Insert a vector into the store."""
 
-        self._store[key] = (embed(text), metadata)
+        self.add_texts([key], [text], [metadata])
+
+    def add_texts(
+        self,
+        keys: Sequence[str],
+        texts: Sequence[str],
+        metadata: Optional[Sequence[Dict[str, str]]] = None,
+    ) -> None:
+        """Embed and insert many texts in one pass."""
+
+        if len(keys) != len(texts):
+            raise ValueError("keys and texts must have the same length")
+        self.add_vectors(keys, embed_many(texts), metadata, texts)
+
+    def add_vector(self, key: str, vector: np.ndarray, metadata: Dict[str, str]) -> None:
+        """Insert or replace a raw embedding under ``key``."""
+
+        self.add_vectors([key], np.asarray(vector)[None, :], [metadata])
+
+    def add_vectors(
+        self,
+        keys: Sequence[str],
+        vectors: np.ndarray,
+        metadata: Optional[Sequence[Dict[str, str]]] = None,
+        texts: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Insert or replace many raw embeddings in one pass.
+
+        ``texts`` is the source text of each vector, used for lexical search.
+        """
+
+        if len(keys) != len(vectors):
+            raise ValueError("keys and vectors must have the same length")
+        metadata = [{} for _ in keys] if metadata is None else metadata
+        texts = ["" for _ in keys] if texts is None else texts
+        self._grow(self._size + len(keys))
+        rows = np.empty(len(keys), dtype=np.int64)
+        for position, (key, meta, text) in enumerate(zip(keys, metadata, texts)):
+            row = self._rows.get(key)
+            if row is not None and row < self._base_rows:  # snapshot rows are read-only
+                self._tombstone(key)
+                row = None
+            if row is None:
+                row = self._rows[key] = self._size
+                self._size += 1
+                self._keys.append(key)
+                self._metadata.append(meta)
+                self._texts.append(text)
+            else:
+                self._metadata[row] = meta
+                self._texts[row] = text
+            rows[position] = row
+            if self._filter_index is not None:
+                self._filter_index.add(row, meta)
+            if self._term_index is not None:
+                self._term_index.add(row, self._document(row))
+        normalized = normalize(vectors)
+        self._matrix[rows - self._base_rows] = normalized
+        self._live[rows] = True
+        if self.index is not None:
+            self.index.add(rows, normalized)
+        if self._delta is not None:
+            self._log_adds(keys, normalized, metadata, texts)
+
+    def _document(self, row: int) -> str:
+        """Text indexed for lexical search: the stored text plus metadata values."""
+
+        return " ".join([self._texts[row] or "", *self._metadata[row].values()])  # type: ignore[union-attr]
+
+    @property
+    def filter_index(self) -> MetadataIndex:
+        """Metadata postings, built on first use and kept current afterwards."""
+
+        if self._filter_index is None:
+            index = MetadataIndex()
+            for row in np.flatnonzero(self._live[: self._size]).tolist():
+                index.add(row, self._metadata[row])  # type: ignore[arg-type]
+            self._filter_index = index
+        return self._filter_index
+
+    @property
+    def term_index(self) -> BM25Index:
+        """BM25 postings, built on first use and kept current afterwards."""
+
+        if self._term_index is None:
+            index = BM25Index()
+            for row in np.flatnonzero(self._live[: self._size]).tolist():
+                index.add(row, self._document(row))
+            self._term_index = index
+        return self._term_index
+
+    def build_index(self, nlist: Optional[int] = None, nprobe: int = 8, seed: int = 0) -> IVFIndex:
+        """Train an IVF index over the stored vectors and route searches through it.
+
+        ``nlist`` defaults to ``4 * sqrt(n)`` lists; ``nprobe`` is the number
+        of lists scanned per query and can be overridden per search.
+        """
+
+        rows = np.flatnonzero(self._live[: self._size])
+        if nlist is None:
+            nlist = max(1, int(4 * math.sqrt(len(rows))))
+        index = IVFIndex(self.dim, nlist=nlist, nprobe=nprobe, seed=seed)
+        vectors = self._vectors(rows)
+        index.train(vectors)
+        index.add(rows, vectors)
+        self.index = index
+        return index
+
+    def drop_index(self) -> None:
+        """Return to exact search."""
+
+        self.index = None
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` from the store, raising ``KeyError`` if it is unknown."""
 
-    def search(self, query: str, top_k: int = 3) -> List[Dict[str, str]]:
+        self._tombstone(key)
+        if self._delta is not None:
+            self._write_delta([_DELTA_HEADER.pack(_OP_DELETE, len(key.encode()), 0, 0), key.encode()])
+        if self._size - len(self._rows) > max(len(self._rows), 16):
+            self.compact()
+
+    def _tombstone(self, key: str) -> None:
+        row = self._rows.pop(key)
+        self._live[row] = False
+        if row >= self._base_rows:
+            self._matrix[row - self._base_rows] = 0.0
+        self._keys[row] = None
+        self._metadata[row] = None
+        self._texts[row] = None
+        if self.index is not None:
+            self.index.remove(np.array([row]))
+        if self._filter_index is not None:
+            self._filter_index.remove(row)
+        if self._term_index is not None:
+            self._term_index.remove(row)
+
+    def _adopt(
+        self,
+        base: Optional[np.ndarray],
+        tail: np.ndarray,
+        keys: List[str],
+        metadata: List[Dict[str, str]],
+        texts: List[str],
+    ) -> None:
+        """Replace the storage with ``base`` + ``tail`` rows, all of them live."""
+
+        if self.index is not None:
+            mapping = np.full(self._size, -1, dtype=np.int64)
+            mapping[[self._rows[key] for key in keys]] = np.arange(len(keys))
+            self.index.remap(mapping)
+        self._base = base
+        self._matrix = np.zeros((max(2 * len(tail), 16), self.dim), dtype=np.float32)
+        self._matrix[: len(tail)] = tail
+        self._size = len(keys)
+        self._live = np.zeros(max(self._size, 16), dtype=bool)
+        self._live[: self._size] = True
+        self._keys = list(keys)
+        self._metadata = list(metadata)
+        self._texts = list(texts)
+        self._rows = {key: row for row, key in enumerate(keys)}
+        # row ids changed; the inverted indexes are rebuilt lazily on next use
+        self._filter_index = None
+        self._term_index = None
+
+    def _live_table(self) -> Tuple[np.ndarray, List[str], List[Dict[str, str]], List[str]]:
+        keep = np.flatnonzero(self._live[: self._size])
+        rows = keep.tolist()
+        return (
+            keep,
+            [self._keys[row] for row in rows],  # type: ignore[misc]
+            [self._metadata[row] for row in rows],  # type: ignore[misc]
+            [self._texts[row] for row in rows],  # type: ignore[misc]
+        )
+
+    def _compact(self) -> None:
+        """Drop tombstoned rows and renumber the side table in memory."""
+
+        keep, keys, metadata, texts = self._live_table()
+        self._adopt(None, self._vectors(keep), keys, metadata, texts)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write a compacted snapshot to ``path`` and log later changes there.
+
+        The matrix is stored as ``.npy`` so :meth:`load` can memory-map it;
+        keys, metadata and texts go to a JSON side table. Both land in a new
+        versioned directory next to an empty delta log, and the ``CURRENT``
+        manifest is replaced last, so readers see either the previous
+        snapshot with its delta log or the new one, never a mix.
+        """
+
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        snapshot = self._next_snapshot(directory)
+        keep, keys, metadata, texts = self._live_table()
+        table = {"dim": self.dim, "keys": keys, "metadata": metadata, "texts": texts}
+        with open(snapshot / SNAPSHOT_VECTORS, "wb") as handle:
+            np.save(handle, self._vectors(keep))
+            os.fsync(handle.fileno())
+        _write_durably(snapshot / SNAPSHOT_TABLE, json.dumps(table).encode())
+        _write_durably(snapshot / DELTA_LOG, b"")
+        _write_durably(directory / f"{SNAPSHOT_MANIFEST}.tmp", json.dumps({"snapshot": snapshot.name}).encode())
+        os.replace(directory / f"{SNAPSHOT_MANIFEST}.tmp", directory / SNAPSHOT_MANIFEST)
+        self.close()
+        base = np.load(snapshot / SNAPSHOT_VECTORS, mmap_mode="r")
+        self._adopt(base, np.zeros((0, self.dim), dtype=np.float32), keys, metadata, texts)
+        self._open_delta(directory, snapshot)
+        self._remove_stale(directory, snapshot)
+
+    @classmethod
+    def _next_snapshot(cls, directory: Path) -> Path:
+        """Create and return an unused versioned snapshot directory."""
+
+        version = max(cls._versions(directory), default=0) + 1
+        while True:
+            snapshot = directory / f"{SNAPSHOT_PREFIX}{version:06d}"
+            try:
+                snapshot.mkdir()
+                return snapshot
+            except FileExistsError:  # another writer claimed it first
+                version += 1
+
+    @staticmethod
+    def _versions(directory: Path) -> Dict[int, Path]:
+        return {
+            int(child.name[len(SNAPSHOT_PREFIX) :]): child
+            for child in directory.glob(f"{SNAPSHOT_PREFIX}*")
+            if child.name[len(SNAPSHOT_PREFIX) :].isdigit()
+        }
+
+    @classmethod
+    def _remove_stale(cls, directory: Path, current: Path, grace: float = SNAPSHOT_GRACE) -> None:
+        """Best-effort removal of long-superseded snapshots and the legacy flat layout.
+
+        A snapshot older than ``current`` is removed once the snapshot that
+        replaced it has been around for ``grace`` seconds, so loads and writers
+        that resolved it before the switch can finish. Newer directories
+        belong to saves still in progress and are left alone.
+        """
+
+        versions = cls._versions(directory)
+        live = int(current.name[len(SNAPSHOT_PREFIX) :])
+        now = time.time()
+        older = sorted(version for version in versions if version < live)
+        for version, successor in zip(older, older[1:] + [live]):
+            try:
+                superseded = versions[successor].stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if now - superseded >= grace:
+                shutil.rmtree(versions[version], ignore_errors=True)
+        for name in (SNAPSHOT_VECTORS, SNAPSHOT_TABLE, DELTA_LOG):
+            (directory / name).unlink(missing_ok=True)
+
+    @staticmethod
+    def snapshot_dir(path: Union[str, Path]) -> Optional[Path]:
+        """Return the live snapshot directory under ``path``, or ``None`` if there is none.
+
+        Stores saved before snapshots were versioned are read from ``path`` itself.
+        """
+
+        directory = Path(path)
+        manifest = directory / SNAPSHOT_MANIFEST
+        if manifest.exists():
+            return directory / json.loads(manifest.read_text())["snapshot"]
+        if (directory / SNAPSHOT_TABLE).exists():
+            return directory
+        return None
+
+    def compact(self) -> None:
+        """Fold the delta log into a fresh snapshot (or just drop tombstones in memory)."""
+
+        if self.path is not None:
+            self.save(self.path)
+        else:
+            self._compact()
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "VectorStore":
+        """Open a snapshot written by :meth:`save` and replay its delta log.
+
+        With ``mmap`` the snapshot matrix is mapped read-only, so loading is
+        near-instant and the pages are shared between processes.
+        """
+
+        directory = Path(path)
+        while True:
+            snapshot = cls.snapshot_dir(directory)
+            if snapshot is None:
+                raise FileNotFoundError(f"No vector store snapshot in {directory}")
+            try:
+                table = json.loads((snapshot / SNAPSHOT_TABLE).read_text())
+                base = np.load(snapshot / SNAPSHOT_VECTORS, mmap_mode="r" if mmap else None)
+                break
+            except FileNotFoundError:
+                if cls.snapshot_dir(directory) == snapshot:
+                    raise
+                # superseded and removed while we read it; start over from the new manifest
+        store = cls(dim=table["dim"])
+        texts = table.get("texts") or ["" for _ in table["keys"]]
+        store._adopt(base, np.zeros((0, store.dim), dtype=np.float32), table["keys"], table["metadata"], texts)
+        store._replay(snapshot / DELTA_LOG)
+        store._open_delta(directory, snapshot)
+        return store
+
+    def _manifest_version(self) -> Optional[Tuple[int, int]]:
+        assert self.path is not None
+        try:
+            stat = (self.path / SNAPSHOT_MANIFEST).stat()
+        except FileNotFoundError:  # legacy flat layout
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _open_delta(self, directory: Path, snapshot: Path) -> None:
+        """Append future changes to ``snapshot``'s delta log."""
+
+        self.close()
+        self.path = directory
+        self._snapshot = snapshot
+        self._manifest_stamp = self._manifest_version()
+        self._delta = open(snapshot / DELTA_LOG, "ab")
+
+    def _follow_manifest(self) -> None:
+        """Switch the delta log to the live snapshot if another writer published one."""
+
+        stamp = self._manifest_version()
+        if stamp == self._manifest_stamp:
+            return
+        snapshot = self.snapshot_dir(self.path)  # type: ignore[arg-type]
+        if snapshot is not None and snapshot != self._snapshot:
+            self._open_delta(self.path, snapshot)  # type: ignore[arg-type]
+        self._manifest_stamp = stamp
+
+    def _log_adds(
+        self,
+        keys: Sequence[str],
+        vectors: np.ndarray,
+        metadata: Sequence[Dict[str, str]],
+        texts: Sequence[str],
+    ) -> None:
+        chunks: List[bytes] = []
+        for key, vector, meta, text in zip(keys, vectors, metadata, texts):
+            key_bytes, meta_bytes, text_bytes = key.encode(), json.dumps(meta).encode(), text.encode()
+            header = _DELTA_HEADER.pack(_OP_ADD, len(key_bytes), len(meta_bytes), len(text_bytes))
+            chunks.extend((header, key_bytes, meta_bytes, text_bytes, vector.tobytes()))
+        self._write_delta(chunks)
+
+    def _write_delta(self, chunks: List[bytes]) -> None:
+        self._follow_manifest()
+        assert self._delta is not None
+        self._delta.write(b"".join(chunks))
+        self._delta.flush()
+
+    def _replay(self, log_path: Path) -> None:
+        """Apply logged changes, truncating a torn record left by a crash."""
+
+        if not log_path.exists():
+            return
+        data = log_path.read_bytes()
+        vector_bytes = 4 * self.dim
+        position = 0
+        keys: List[str] = []
+        vectors: List[np.ndarray] = []
+        metadata: List[Dict[str, str]] = []
+        texts: List[str] = []
+
+        def flush() -> None:
+            if keys:
+                self.add_vectors(keys, np.stack(vectors), metadata, texts)
+                keys.clear()
+                vectors.clear()
+                metadata.clear()
+                texts.clear()
+
+        while position + _DELTA_HEADER.size <= len(data):
+            operation, key_length, meta_length, text_length = _DELTA_HEADER.unpack_from(data, position)
+            body = position + _DELTA_HEADER.size
+            text_start = body + key_length + meta_length
+            end = text_start + text_length + (vector_bytes if operation == _OP_ADD else 0)
+            if end > len(data):
+                break
+            key = data[body : body + key_length].decode()
+            if operation == _OP_ADD:
+                keys.append(key)
+                metadata.append(json.loads(data[body + key_length : text_start]))
+                texts.append(data[text_start : text_start + text_length].decode())
+                vectors.append(np.frombuffer(data, dtype=np.float32, count=self.dim, offset=end - vector_bytes))
+            else:
+                flush()
+                if key in self._rows:
+                    self._tombstone(key)
+            position = end
+        flush()
+        if position < len(data):
+            with open(log_path, "r+b") as handle:
+                handle.truncate(position)
+
+    def close(self) -> None:
+        """Close the delta log; the store stays usable but stops persisting."""
+
+        if self._delta is not None:
+            self._delta.close()
+            self._delta = None
+
+    def _top_rows(self, rows: np.ndarray, scores: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the best ``top_k`` candidate ``rows`` and their scores, best first."""
+
+        count = min(top_k, len(rows))
+        if count <= 0:
+            return rows[:0], scores[:0]
+        boundary = round(float(np.partition(scores, len(scores) - count)[len(scores) - count]), 3)
+        # widen the partition to every row that rounds onto the boundary score so
+        # ties resolve by insertion order, as the original stable sort did
+        keep = scores >= boundary - 0.0005 - 1e-6
+        rows, scores = rows[keep], scores[keep]
+        order = np.lexsort((rows, -np.round(scores.astype(np.float64), 3)))[:count]
+        return rows[order], scores[order]
+
+    def _format(self, rows: np.ndarray, scores: np.ndarray) -> List[Dict[str, object]]:
+        return [
+            {"key": self._keys[row], "score": round(score, 3), "metadata": self._metadata[row]}
+            for row, score in zip(rows.tolist(), scores.tolist())
+        ]
+
+    def _nearest_rows(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        exact: bool = False,
+        nprobe: Optional[int] = None,
+        filters: Optional[Filters] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Return the best rows and scores per normalised query."""
+
+        allowed = None if filters is None else self.filter_index.rows(filters)
+        if self.index is None or exact:
+            if allowed is None:
+                allowed = np.flatnonzero(self._live[: self._size])
+                scores = self._scores(queries)[:, allowed]
+            else:  # pre-filter: score only the rows the metadata index selected
+                scores = queries @ self._vectors(allowed).T
+            return [self._top_rows(allowed, query_scores, top_k) for query_scores in scores]
+        results = []
+        for query, rows in zip(queries, self.index.candidates(queries, nprobe)):
+            if allowed is not None:
+                probed = rows[np.isin(rows, allowed)]
+                # a selective filter can leave the probed lists short; score its rows exactly instead
+                rows = probed if len(probed) >= min(top_k, len(allowed)) else allowed
+            results.append(self._top_rows(rows, self._vectors(rows) @ query, top_k))
+        return results
+
+    def search_vectors(
+        self,
+        vectors: np.ndarray,
+        top_k: int = 3,
+        exact: bool = False,
+        nprobe: Optional[int] = None,
+        filters: Optional[Filters] = None,
+    ) -> List[List[Dict[str, object]]]:
+        """Return the ``top_k`` matches for each row of ``vectors``.
+
+        With an index built, only the probed inverted lists are scored unless
+        ``exact`` is set. ``filters`` maps metadata fields to a required value
+        (or a list of accepted values) and restricts the candidates up front;
+        when the probed lists hold fewer than ``top_k`` matching rows, all
+        matching rows are scored exactly.
+        """
+
+        queries = normalize(np.atleast_2d(vectors))
+        return [self._format(rows, scores) for rows, scores in self._nearest_rows(queries, top_k, exact, nprobe, filters)]
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        top_k: int = 3,
+        exact: bool = False,
+        nprobe: Optional[int] = None,
+        filters: Optional[Filters] = None,
+    ) -> List[List[Dict[str, object]]]:
+        """Run many text queries with one matrix product."""
+
+        if not queries:
+            return []
+        vectors = self.embeddings.embed_many(queries)
+        return self.search_vectors(vectors, top_k, exact=exact, nprobe=nprobe, filters=filters)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        exact: bool = False,
+        nprobe: Optional[int] = None,
+        filters: Optional[Filters] = None,
+    ) -> List[Dict[str, str]]:
         """Perform cosine similarity search across stored vectors."""
 
-        query_vec = embed(query)
-        scored = [
+        return self.search_batch([query], top_k, exact=exact, nprobe=nprobe, filters=filters)[0]  # type: ignore[return-value]
+
+    def hybrid_search(
+        self,
+        query: str,
+        top_k: int = 3,
+        filters: Optional[Filters] = None,
+        depth: int = 50,
+        rrf_k: int = 60,
+    ) -> List[Dict[str, object]]:
+        """Fuse BM25 and vector rankings of ``query`` with reciprocal rank fusion.
+
+        The lexical side scores only the postings of the query terms and the
+        vector side uses the normal (optionally IVF-backed) search; both take
+        their best ``depth`` rows among those matching ``filters``.
+        """
+
+        allowed = None if filters is None else self.filter_index.rows(filters)
+        if allowed is not None and not len(allowed):
+            return []
+        lexical = self.term_index.scores(query, None if allowed is None else allowed.tolist())
+        lexical_rows = sorted(lexical, key=lambda row: (-lexical[row], row))[:depth]
+        queries = normalize(self.embeddings.embed_many([query]))
+        vector_rows, vector_scores = self._nearest_rows(queries, depth, filters=filters)[0]
+        similarity = dict(zip(vector_rows.tolist(), vector_scores.tolist()))
+        fused = reciprocal_rank_fusion([lexical_rows, vector_rows.tolist()], k=rrf_k)
+        # equal fused ranks go to the stronger term match
+        best = sorted(fused, key=lambda row: (-fused[row], -lexical.get(row, 0.0), row))[:top_k]
+        return [
             {
-                "key": key,
-                "score": cosine_similarity(query_vec, vector),
-                "metadata": metadata,
+                "key": self._keys[row],
+                "score": round(fused[row], 4),
+                "lexical": round(lexical.get(row, 0.0), 3),
+                "vector": round(similarity[row], 3) if row in similarity else None,
+                "metadata": self._metadata[row],
             }
-            for key, (vector, metadata) in self._store.items()
+            for row in best
         ]
-        scored.sort(key=lambda item: item["score"], reverse=True)
-        return scored[:top_k]
@@ -0,0 +1,64 @@
+"""Batched agent reasoning must match the per-incident path exactly."""
+
+from __future__ import annotations
+
+import random
+import threading
+
+from agents.base import STATUS_TIMEOUT
+from agents.security_agents import build_agent_registry
+
+
+def _incidents(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"inc-{index}",
+            "priority": rng.choice(["low", "medium", "high", "unknown"]),
+            "indicators": ["ioc"] * rng.randint(0, 6),
+            "anomaly_score": rng.random(),
+            "feeds": [{"risk": rng.random()} for _ in range(rng.randint(0, 4))],
+            "policy_results": {"mfa": rng.random() > 0.3, "patching": rng.random() > 0.3},
+        }
+        for index in range(count)
+    ]
+
+
+def test_batch_hooks_match_scalar_hooks():
+    registry = build_agent_registry()
+    incidents = _incidents(50)
+    for name in ("ThreatHunterAgent", "ForensicCollectorAgent", "PolicyValidatorAgent", "ThreatIntelAgent"):
+        agent = registry.get(name)
+        assert agent.handle_batch(incidents) == [agent.plan(incident) for incident in incidents]
+    commander = registry.get("IncidentCommanderAgent")
+    assert commander.plan_batch(incidents) == [commander.plan(incident) for incident in incidents]
+
+
+def test_coordinate_batch_matches_coordinate():
+    registry = build_agent_registry()
+    commander = registry.get("IncidentCommanderAgent")
+    incidents = _incidents(40)
+    try:
+        assert commander.coordinate_batch(incidents) == [commander.coordinate(incident) for incident in incidents]
+        assert commander.coordinate_batch([]) == []
+    finally:
+        registry.close()
+
+
+def test_batch_timeout_marks_every_incident():
+    registry = build_agent_registry()
+    release = threading.Event()
+    slow = registry.get("ThreatIntelAgent")
+
+    def blocking(contexts):
+        release.wait(5)
+        return contexts
+
+    slow.batch_hook = blocking
+    commander = registry.get("IncidentCommanderAgent")
+    try:
+        plans = commander.coordinate_batch(_incidents(5), timeout=0.1)
+    finally:
+        release.set()
+        registry.close()
+    assert [plan["missing"] for plan in plans] == [{"ThreatIntelAgent": STATUS_TIMEOUT}] * 5
@@ -0,0 +1,150 @@
+"""Concurrent agent broadcast: deadlines, errors and cancellation."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+from agents.base import AGENT_ERROR, STATUS_CANCELLED, STATUS_ERROR, STATUS_TIMEOUT, AgentRegistry, SecurityAgent
+from agents.security_agents import build_agent_registry
+
+
+def _agent(name, hook):
+    return SecurityAgent(name=name, description=name, reasoning_hook=hook)
+
+
+def _fixed(score):
+    def hook(context):
+        context.update({"decision_score": score, "action": "observe"})
+        return context
+
+    return hook
+
+
+def _blocking(release):
+    def hook(context):
+        release.wait(5)
+        context.update({"decision_score": 1.0})
+        return context
+
+    return hook
+
+
+def _failing(context):
+    raise RuntimeError("hook exploded")
+
+
+def test_concurrent_broadcast_matches_sequential():
+    registry = AgentRegistry()
+    for index in range(3):
+        registry.register(_agent(f"agent-{index}", _fixed(index / 10)))
+    payload = {"id": "inc-1"}
+    try:
+        assert registry.broadcast("agent-0", payload) == registry.broadcast("agent-0", payload, concurrent=True)
+    finally:
+        registry.close()
+
+
+def test_slow_agent_times_out_and_others_reply():
+    release = threading.Event()
+    registry = AgentRegistry()
+    registry.register(_agent("fast", _fixed(0.5)))
+    registry.register(_agent("slow", _blocking(release)))
+    registry.register(_agent("broken", _failing))
+    try:
+        start = time.monotonic()
+        replies = registry.broadcast("orchestrator", {"id": "inc-1"}, concurrent=True, timeout=0.1)
+        assert time.monotonic() - start < 2
+    finally:
+        release.set()
+        registry.close()
+    assert replies["fast"]["decision_score"] == 0.5
+    assert replies["slow"][AGENT_ERROR] == STATUS_TIMEOUT
+    assert replies["broken"][AGENT_ERROR] == STATUS_ERROR
+    assert "hook exploded" in replies["broken"]["detail"]
+
+
+def test_per_agent_timeout_mapping():
+    release = threading.Event()
+    registry = AgentRegistry()
+    registry.register(_agent("slow", _blocking(release)))
+    registry.register(_agent("patient", _fixed(0.2)))
+    try:
+        replies = registry.broadcast(
+            "orchestrator", {}, concurrent=True, timeout={"slow": 0.05, "patient": 5.0}
+        )
+    finally:
+        release.set()
+        registry.close()
+    assert replies["slow"][AGENT_ERROR] == STATUS_TIMEOUT
+    assert replies["patient"]["decision_score"] == 0.2
+
+
+def test_cancel_event_marks_outstanding_agents():
+    release = threading.Event()
+    cancel = threading.Event()
+    registry = AgentRegistry()
+    registry.register(_agent("fast", _fixed(0.3)))
+    registry.register(_agent("slow", _blocking(release)))
+    threading.Timer(0.05, cancel.set).start()
+    try:
+        replies = registry.broadcast("orchestrator", {}, concurrent=True, cancel=cancel)
+    finally:
+        release.set()
+        registry.close()
+    assert replies["fast"]["decision_score"] == 0.3
+    assert replies["slow"][AGENT_ERROR] == STATUS_CANCELLED
+
+
+def test_async_broadcast_cancels_slow_coroutine():
+    cancelled = []
+
+    async def slow(context):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return context
+
+    registry = AgentRegistry()
+    registry.register(_agent("slow", slow))
+    registry.register(_agent("fast", _fixed(0.4)))
+    replies = asyncio.run(registry.abroadcast("orchestrator", {}, timeout=0.05))
+    assert replies["slow"][AGENT_ERROR] == STATUS_TIMEOUT
+    assert replies["fast"]["decision_score"] == 0.4
+    assert cancelled == [True]
+
+
+def test_coordinate_lists_missing_agents():
+    registry = build_agent_registry()
+    release = threading.Event()
+    registry.get("ForensicCollectorAgent").reasoning_hook = _blocking(release)
+    commander = registry.get("IncidentCommanderAgent")
+    try:
+        summary = commander.coordinate({"id": "inc-7", "priority": "high"}, timeout=0.1)
+    finally:
+        release.set()
+        registry.close()
+    assert summary["missing"] == {"ForensicCollectorAgent": STATUS_TIMEOUT}
+    assert set(summary["responses"]) == {
+        "ThreatHunterAgent",
+        "ForensicCollectorAgent",
+        "PolicyValidatorAgent",
+        "ThreatIntelAgent",
+    }
+
+
+def test_incident_status_field_is_not_a_missing_agent():
+    registry = build_agent_registry()
+    commander = registry.get("IncidentCommanderAgent")
+    incident = {"id": "x", "status": "open", "priority": "high"}
+    try:
+        summary = commander.coordinate(incident)
+        [batched] = commander.coordinate_batch([incident])
+    finally:
+        registry.close()
+    assert summary["missing"] == {} and batched["missing"] == {}
+    assert summary["recommendation"] == "contain"
+    assert all(reply["status"] == "open" for reply in summary["responses"].values())
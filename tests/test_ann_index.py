@@ -0,0 +1,56 @@
+import numpy as np
+
+from core.vector_store import VectorStore
+
+
+def _clustered(count, clusters=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, 32))
+    return (centers[rng.integers(0, clusters, size=count)] + 0.05 * rng.normal(size=(count, 32))).astype(np.float32)
+
+
+def _keys(results):
+    return [[hit["key"] for hit in hits] for hits in results]
+
+
+def test_probing_every_list_equals_exact_search():
+    vectors = _clustered(2000)
+    store = VectorStore()
+    store.add_vectors([f"v{row}" for row in range(len(vectors))], vectors)
+    index = store.build_index(nlist=16)
+    queries = _clustered(20, seed=1)
+
+    assert _keys(store.search_vectors(queries, 10, nprobe=index.nlist)) == _keys(
+        store.search_vectors(queries, 10, exact=True)
+    )
+
+
+def test_recall_on_clustered_data_with_few_probes():
+    vectors = _clustered(4000)
+    store = VectorStore()
+    store.add_vectors([f"v{row}" for row in range(len(vectors))], vectors)
+    store.build_index(nlist=32, nprobe=4)
+    queries = _clustered(50, seed=2)
+
+    approximate = _keys(store.search_vectors(queries, 10))
+    exact = _keys(store.search_vectors(queries, 10, exact=True))
+    recall = np.mean([len(set(found) & set(truth)) / 10 for found, truth in zip(approximate, exact)])
+
+    assert recall >= 0.9
+
+
+def test_index_tracks_inserts_replacements_deletes_and_compaction():
+    vectors = _clustered(600)
+    store = VectorStore()
+    store.add_vectors([f"v{row}" for row in range(300)], vectors[:300])
+    index = store.build_index(nlist=8)
+    store.add_vectors([f"v{row}" for row in range(300, 600)], vectors[300:])
+    store.add_vectors(["v0", "v1"], vectors[500:502])  # re-added keys move lists
+    for row in range(2, 400):
+        store.delete(f"v{row}")  # enough tombstones to trigger compaction
+    queries = _clustered(10, seed=3)
+
+    assert len(index) == len(store) == 202
+    assert _keys(store.search_vectors(queries, 5, nprobe=index.nlist)) == _keys(
+        store.search_vectors(queries, 5, exact=True)
+    )
@@ -0,0 +1,54 @@
+import asyncio
+
+from core.api import ClientSession
+
+
+class FakeSocket:
+    def __init__(self, stalled=False):
+        self.sent = []
+        self.closed_with = None
+        self.release = asyncio.Event()
+        if not stalled:
+            self.release.set()
+
+    async def send_text(self, frame):
+        await self.release.wait()
+        self.sent.append(frame)
+
+    async def send_bytes(self, frame):
+        await self.send_text(frame)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def test_drop_oldest_and_coalesce_bound_the_backlog():
+    oldest = ClientSession(None, maxsize=2, policy="drop_oldest")
+    newest = ClientSession(None, maxsize=2, policy="coalesce")
+    for frame in ("a", "b", "c"):
+        assert oldest.offer(frame) and newest.offer(frame)
+
+    assert (len(oldest), oldest.dropped) == (2, 1)
+    assert (len(newest), newest.dropped) == (1, 2)
+
+
+def test_stalled_client_does_not_hold_up_others_and_is_disconnected():
+    async def run():
+        fast, stalled = FakeSocket(), FakeSocket(stalled=True)
+        sessions = [ClientSession(fast, maxsize=2, policy="disconnect"), ClientSession(stalled, 2, "disconnect")]
+        for session in sessions:
+            session.start()
+        for frame in ("a", b"b", "c", "d"):
+            for session in sessions:
+                session.offer(frame)
+            await asyncio.sleep(0)
+        assert sessions[1].closed  # its queue overflowed while the socket was stuck
+        stalled.release.set()
+        sessions[0].close()
+        await asyncio.wait_for(asyncio.gather(*(session.task for session in sessions)), 1.0)
+        return fast, stalled, sessions
+
+    fast, stalled, sessions = asyncio.run(run())
+    assert fast.sent == ["a", b"b", "c", "d"]
+    assert stalled.closed_with == 1013
+    assert not sessions[1].offer("e")
@@ -0,0 +1,41 @@
+import pytest
+
+from agents.base import AgentMessage, decode_agent_messages, encode_agent_messages
+from core.codec import CodecError, pack_rows, unpack_rows
+from core.kafka_pipeline import TopicMessage, decode_messages, encode_messages
+
+
+def test_topic_messages_round_trip_with_off_schema_values():
+    messages = [
+        TopicMessage("threat-events", {"id": "inc-1", "severity": "high", "anomaly_score": 0.9}, 1.5, "inc-1", 2, 7),
+        # an int score and a nested field do not fit the schema columns and travel as JSON extras
+        TopicMessage("threat-events", {"id": "inc-2", "anomaly_score": 1, "tags": ["a", None]}, 2.5, None, 0, 8),
+        TopicMessage("policy-audit", {"policy": "PCI-DSS", "passed": False, "asset": "dev-lab"}, 3.0, "dev-lab", 1, 0),
+        TopicMessage("custom-topic", {"anything": {"nested": True}}, 4.0, "k", 0, 1),
+    ]
+
+    decoded = decode_messages(encode_messages(messages))
+
+    assert decoded == messages
+    assert type(decoded[1].value["anomaly_score"]) is int
+    assert TopicMessage.from_bytes(messages[2].to_bytes()) == messages[2]
+
+
+def test_agent_messages_round_trip():
+    messages = [
+        AgentMessage("ThreatHunterAgent", "IncidentCommanderAgent", {"action": "hunt", "decision_score": 0.4}, 1.0),
+        AgentMessage("ComplianceAgent", "broadcast", {"notes": "ok", "evidence": [1, 2]}, 2.0),
+    ]
+
+    assert decode_agent_messages(encode_agent_messages(messages)) == messages
+
+
+def test_incident_rows_round_trip_and_reject_foreign_frames():
+    rows = [{"id": "inc-1", "severity": "low", "anomaly_score": 0.2, "risk_score": 0.3}, {"id": "inc-2"}]
+    frame = pack_rows(rows)
+
+    assert unpack_rows(frame) == rows
+    with pytest.raises(CodecError):
+        unpack_rows(frame[:10])
+    with pytest.raises(CodecError):
+        decode_messages(frame)
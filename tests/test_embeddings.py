@@ -0,0 +1,39 @@
+import numpy as np
+
+from core.vector_store import DIMENSIONS, EmbeddingCache, VectorStore, embed, embed_many
+
+
+def _legacy_embed(text):
+    """The original per-character embedding loop."""
+
+    base = [float((ord(char) % 32) / 32) for char in text[:32]]
+    return base + [0.0] * (32 - len(base))
+
+
+def test_embed_many_is_bit_identical_to_the_character_loop():
+    texts = ["", "okta", "Lateral movement credential abuse " * 3, "naïve ünïcode ☃ 🚀", "\ud800 lone surrogate"]
+
+    vectors = embed_many(texts)
+
+    assert vectors.shape == (len(texts), DIMENSIONS) and vectors.dtype == np.float32
+    assert vectors.tolist() == [np.asarray(_legacy_embed(text), dtype=np.float32).tolist() for text in texts]
+    assert embed("okta") == vectors[1].tolist()
+
+
+def test_cache_is_a_bounded_lru_with_counters():
+    cache = EmbeddingCache(maxsize=2)
+    cache.embed_many(["a", "b", "a"])  # "a" repeats inside one batch: one miss each
+    cache.embed_many(["a", "c"])  # hit on "a" evicts the least recently used "b"
+    cache.embed_many(["b"])
+
+    assert cache.stats() == {"hits": 2, "misses": 4, "size": 2, "maxsize": 2, "hit_ratio": 0.333}
+    assert EmbeddingCache(maxsize=0).embed_many(["a"]).tolist() == embed_many(["a"]).tolist()
+
+
+def test_repeated_queries_hit_the_store_cache():
+    store = VectorStore(cache_size=8)
+    store.add_texts(["ransomware", "lateral"], ["Ransomware T1486", "Lateral movement"], [{}, {}])
+
+    first = store.search("ransomware", 1)
+    assert store.search_batch(["ransomware", "ransomware"], 1) == [first, first]
+    assert store.embeddings.hits == 2 and store.embeddings.misses == 1
@@ -0,0 +1,44 @@
+import numpy as np
+
+from core.event_batch import DictColumn, EventBatch
+from core.kafka_pipeline import TopicMessage
+
+
+def _messages():
+    return [
+        TopicMessage(topic="intel-feed", value={"id": "a", "risk": 0.9, "tenant": "acme", "count": 3}, key="a"),
+        TopicMessage(topic="intel-feed", value={"id": "b", "risk": 0.2, "tenant": "globex", "count": 5}, key="b"),
+    ]
+
+
+def test_to_pandas_shares_numeric_buffers():
+    batch = EventBatch.from_messages(_messages())
+    frame = batch.to_pandas()
+
+    for name in ("risk", "count"):
+        assert np.shares_memory(frame[name].to_numpy(), batch.columns[name])
+    for name in ("timestamp", "partition", "offset"):
+        assert np.shares_memory(frame[name].to_numpy(), batch.meta[name])
+    assert isinstance(batch.columns["tenant"], DictColumn)
+    assert frame["tenant"].tolist() == ["acme", "globex"]
+
+
+def test_records_round_trip_explicit_none_and_nested_lists():
+    records = [
+        {"id": "a", "severity": None, "intel": [{"risk": 0.5, "tenant": None}]},
+        {"id": "b", "intel": [], "anomaly_score": 0.7},
+        {"id": "c", "severity": "high", "anomaly_score": None},
+    ]
+    batch = EventBatch.from_records(records)
+
+    assert batch.to_records() == records
+    assert batch.take(np.array([2, 0])).to_records() == [records[2], records[0]]
+
+
+def test_mixed_int_and_float_column_comes_back_as_floats():
+    records = [{"risk": 1}, {"risk": 0.5}, {"count": 2}]
+    batch = EventBatch.from_records(records)
+
+    assert batch.columns["risk"].dtype == np.float64
+    assert batch.to_records() == [{"risk": 1.0}, {"risk": 0.5}, {"count": 2}]
+    assert isinstance(batch.to_records()[0]["risk"], float)
@@ -0,0 +1,81 @@
+from core.event_batch import EventBatch
+from core.incident_index import TopKIncidentIndex
+from core.kafka_pipeline import TopicMessage
+from core.secops_stream_processor import process_batch, process_stream, risk_score
+
+
+def _threat(incident_id, severity, anomaly):
+    return TopicMessage(
+        topic="threat-events", value={"id": incident_id, "severity": severity, "anomaly_score": anomaly}
+    )
+
+
+def _intel(incident_id, risk, ttp="T1021"):
+    return TopicMessage(topic="intel-feed", value={"id": incident_id, "risk": risk, "ttp": ttp})
+
+
+def test_intel_only_row_keeps_severity_and_rescores():
+    index = TopKIncidentIndex(k=2)
+    [threat] = process_stream([_threat("inc-1", "low", 0.1)])
+    [intel] = process_stream([_intel("inc-1", 0.9)])
+    assert (threat["risk_score"], intel["severity"], intel["risk_score"]) == (0.4, "medium", 1.0)
+
+    index.update(threat)
+    index.update(intel)
+
+    [incident] = index.top()
+    assert incident["severity"] == "low"
+    assert incident["anomaly_score"] == 0.1
+    assert incident["intel"] == intel["intel"]
+    assert incident["risk_score"] == 0.49
+    [joined] = process_stream([_threat("inc-1", "low", 0.1), _intel("inc-1", 0.9)])
+    assert incident["risk_score"] == risk_score(joined)
+
+
+def test_batch_rows_merge_like_one_correlated_stream():
+    messages = [_threat("inc-1", "high", 0.2), _intel("inc-1", 0.3), _intel("inc-1", 0.5, ttp="T1059")]
+    index = TopKIncidentIndex(k=2)
+    for message in messages:
+        index.update_many(process_batch(EventBatch.from_messages([message])))
+
+    [incident] = index.top()
+    [expected] = process_stream(messages)
+    assert incident["severity"] == expected["severity"]
+    assert incident["intel"] == expected["intel"]
+    assert incident["risk_score"] == expected["risk_score"]
+
+
+def test_nested_lists_are_deduplicated_and_capped():
+    index = TopKIncidentIndex(k=1, max_items=3)
+    index.update(process_stream([_threat("inc-1", "medium", 0.1)])[0])
+    for _ in range(2):
+        for ttp in ("T1", "T2", "T3", "T4", "T5"):
+            index.update(process_stream([_intel("inc-1", 0.1, ttp=ttp)])[0])
+
+    [incident] = index.top()
+    assert [feed["ttp"] for feed in incident["intel"]] == ["T3", "T4", "T5"]
+    assert len(incident["signals"]) == 1
+
+
+def test_partial_update_merges_nested_fields():
+    index = TopKIncidentIndex(k=2)
+    index.update({"id": "inc-1", "risk_score": 0.9, "source": "okta", "context": {"ioc": "1.2.3.4"}, "signals": ["a"]})
+    index.update({"id": "inc-1", "risk_score": 0.4, "context": {"ttp": "T1021"}, "signals": ["b"], "source": None})
+
+    [incident] = index.top()
+    assert incident["source"] == "okta"
+    assert incident["context"] == {"ioc": "1.2.3.4", "ttp": "T1021"}
+    assert incident["signals"] == ["a", "b"]
+
+
+def test_rescore_raises_rank_and_evicts_lowest():
+    index = TopKIncidentIndex(k=1, capacity=2)
+    index.update({"id": "a", "risk_score": 0.5, "severity": "low", "anomaly_score": 0.2})
+    index.update({"id": "b", "risk_score": 0.6})
+    index.update({"id": "a", "severity": "high", "anomaly_score": 0.05})
+    assert index.top()[0]["id"] == "a"
+    assert index.top()[0]["risk_score"] == 0.95
+
+    assert index.update({"id": "c", "risk_score": 0.7})
+    assert "b" not in index and index.evicted == 1
+    assert not index.update({"id": "d", "risk_score": 0.1})
@@ -0,0 +1,26 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from core.api import build_app
+from core.kafka_pipeline import KafkaPipeline
+
+
+def test_ingest_rejects_unknown_topic_without_creating_it():
+    pipeline = KafkaPipeline()
+    client = TestClient(build_app(pipeline))
+
+    response = client.post("/topics/made-up/events", content=b'{"id": "a"}\n')
+
+    assert response.status_code == 404
+    assert response.json()["status"] == "unknown_topic"
+    assert "made-up" not in pipeline.topics
+
+
+def test_ingest_publishes_to_known_topic():
+    client = TestClient(build_app(KafkaPipeline()))
+
+    response = client.post("/topics/intel-feed/events", content=(json.dumps({"id": "a", "risk": 0.3}) + "\n").encode())
+
+    assert response.status_code == 200
+    assert response.json()["published"] == 1
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.kafka_pipeline import BackpressureError, KafkaPipeline, MockKafkaTopic, RingBufferLog, partition_for
+
+
+def test_same_key_lands_on_one_partition_in_order():
+    topic = MockKafkaTopic("threat-events", partitions=4)
+    messages = [topic.publish({"id": "inc-1", "seq": seq}) for seq in range(5)]
+
+    assert {message.partition for message in messages} == {partition_for("inc-1", 4)}
+    assert [message.offset for message in messages] == list(range(5))
+
+
+def test_consumer_groups_track_offsets_independently():
+    pipeline = KafkaPipeline(partitions=2)
+    for index in range(6):
+        pipeline.publish("intel-feed", {"id": f"ioc-{index}"})
+
+    assert len(pipeline.poll("dashboard")) == 6
+    assert pipeline.poll("dashboard") == []
+    assert len(pipeline.poll("correlator")) == 6
+    assert pipeline.lag("dashboard")["intel-feed"] == 0
+
+
+def test_uncommitted_poll_is_replayed_until_committed():
+    topic = MockKafkaTopic("threat-events", partitions=1)
+    for index in range(3):
+        topic.publish({"id": f"inc-{index}"})
+
+    first = topic.poll("workers", commit=False)
+    assert [message.offset for message in topic.poll("workers", commit=False)] == [0, 1, 2]
+
+    topic.commit("workers", 0, first[-1].offset + 1)
+    assert topic.poll("workers") == []
+    assert topic.lag("workers") == 0
+
+
+def test_group_members_split_partitions():
+    pipeline = KafkaPipeline(partitions=4)
+    for index in range(40):
+        pipeline.publish("threat-events", {"id": f"inc-{index}"})
+
+    first = pipeline.poll("shards", member=0, members=2)
+    second = pipeline.poll("shards", member=1, members=2)
+
+    assert {message.partition for message in first}.isdisjoint({message.partition for message in second})
+    assert len(first) + len(second) == 40
+
+
+def test_ring_buffer_overwrites_oldest_and_wraps():
+    log = RingBufferLog("threat-events", 0, retention=4)
+    log.append_batch([{"id": index} for index in range(6)], ["k"] * 6)
+
+    assert (log.start_offset, log.end_offset) == (2, 6)
+    assert [message.value["id"] for message in log.read(0)] == [2, 3, 4, 5]
+    assert [message.offset for message in log.read(3, max_records=2)] == [3, 4]
+
+
+def test_ring_buffer_batch_larger_than_capacity_keeps_newest():
+    log = RingBufferLog("threat-events", 0, retention=3)
+    messages = log.append_batch([{"id": index} for index in range(10)], ["k"] * 10)
+
+    assert [message.offset for message in messages] == list(range(10))
+    assert [message.offset for message in log.read(0)] == [7, 8, 9]
+
+
+def test_publish_batch_matches_single_publishes():
+    batched, single = MockKafkaTopic("t", partitions=3), MockKafkaTopic("t", partitions=3)
+    values = [{"id": f"inc-{index % 5}", "seq": index} for index in range(20)]
+    batched.publish_batch(values)
+    for value in values:
+        single.publish(value)
+
+    def layout(topic):
+        return [[(message.offset, message.value) for message in log.read(0)] for log in topic.partitions]
+
+    assert layout(batched) == layout(single)
+
+
+def test_error_overflow_raises_until_slowest_group_catches_up():
+    topic = MockKafkaTopic("t", partitions=1, max_lag=3, overflow="error")
+    topic.poll("slow")  # registers the group at offset 0
+    topic.publish_batch([{"id": "a"}, {"id": "b"}, {"id": "c"}])
+
+    with pytest.raises(BackpressureError):
+        topic.publish({"id": "d"})
+    topic.poll("slow", max_records=1)
+    assert topic.publish({"id": "d"}).offset == 3
+
+
+def test_block_overflow_waits_for_consumer_or_times_out():
+    topic = MockKafkaTopic("t", partitions=1, max_lag=2, overflow="block", block_timeout=0.05)
+    topic.poll("slow")
+    topic.publish_batch([{"id": "a"}, {"id": "b"}])
+    with pytest.raises(BackpressureError):
+        topic.publish({"id": "c"})
+
+    topic.block_timeout = 5.0
+    consumer = threading.Timer(0.05, lambda: topic.poll("slow"))
+    consumer.start()
+    assert topic.publish({"id": "c"}).offset == 2
+    consumer.join()
+
+
+def test_drop_overflow_counts_records_a_group_missed():
+    topic = MockKafkaTopic("t", maxsize=3, partitions=1)
+    topic.poll("slow")
+    topic.publish_batch([{"id": index} for index in range(5)])
+
+    assert [message.offset for message in topic.poll("slow")] == [2, 3, 4]
+    assert topic.dropped["slow"] == 2
+
+
+def test_stream_wakes_on_cross_thread_publish_and_caps_batches():
+    pipeline = KafkaPipeline(partitions=1)
+
+    async def consume():
+        batches = []
+        async for batch in pipeline.stream("dashboard", max_batch=4, max_wait_ms=20):
+            batches.append(len(batch))
+            if sum(batches) == 10:
+                return batches
+
+    async def run():
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.01)
+        publisher = threading.Thread(
+            target=pipeline.publish_batch, args=("intel-feed", [{"id": index} for index in range(10)])
+        )
+        publisher.start()
+        batches = await asyncio.wait_for(task, 2.0)
+        publisher.join()
+        return batches
+
+    batches = asyncio.run(run())
+    assert sum(batches) == 10 and max(batches) <= 4
@@ -0,0 +1,46 @@
+import random
+
+from core.kafka_pipeline import KafkaPipeline, simulate_threat_event
+from core.load_generator import LoadGenerator
+
+
+def _strip_ids(event):
+    return {key: value for key, value in event.items() if key != "id"}
+
+
+def test_same_seed_yields_same_stream():
+    first = LoadGenerator(seed=7, key_skew=1.1, start_time=0.0).threat_events(200).to_records()
+    second = LoadGenerator(seed=7, key_skew=1.1, start_time=0.0).threat_events(200).to_records()
+    other = LoadGenerator(seed=8, key_skew=1.1, start_time=0.0).threat_events(200).to_records()
+
+    assert first == second
+    assert first != other
+
+
+def test_event_ids_are_unique_and_join_rate_controls_incident_keys():
+    generator = LoadGenerator(seed=1, key_cardinality=50, join_rate=0.0, start_time=0.0)
+    batches = generator.mixed(1000)
+    records = [record for batch in batches for record in batch.to_records()]
+
+    assert len({record["event_id"] for record in records}) == 1000
+    assert all("id" in record for record in batches[0].to_records())
+    assert not any("id" in record for batch in batches[1:] for record in batch.to_records())
+
+
+def test_publish_feeds_every_record_to_the_pipeline():
+    pipeline = KafkaPipeline(partitions=2)
+
+    assert LoadGenerator(seed=3).publish(pipeline, 2500, batch_size=1000) == 2500
+    assert sum(pipeline.lag("audit").values()) == 2500
+
+
+def test_seeded_threat_event_leaves_global_random_untouched():
+    random.seed(42)
+    expected = [random.random() for _ in range(3)]
+    random.seed(42)
+    first = simulate_threat_event(seed=5)
+    second = simulate_threat_event(seed=5)
+
+    assert [random.random() for _ in range(3)] == expected
+    assert _strip_ids(first) == _strip_ids(second)
+    assert first["id"] != second["id"]
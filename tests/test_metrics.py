@@ -0,0 +1,76 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from core.api import build_app
+from core.kafka_pipeline import KafkaPipeline
+from core.metrics import MetricsRegistry, pipeline_collector
+
+
+def test_exposition_format_for_each_metric_type():
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests", 'Requests "served".', ["route"])
+    depth = registry.gauge("demo_depth", "Queue depth.")
+    latency = registry.histogram("demo_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.labels("/metrics").inc()
+    requests.labels("/metrics").inc(2)
+    depth.set_function(lambda: 7)
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert lines[:3] == [
+        "# HELP demo_requests_total Requests \\\"served\\\".",
+        "# TYPE demo_requests_total counter",
+        'demo_requests_total{route="/metrics"} 3',
+    ]
+    assert "demo_depth 7" in lines
+    assert [line for line in lines if line.startswith("demo_latency_seconds")] == [
+        'demo_latency_seconds_bucket{le="0.1"} 1',
+        'demo_latency_seconds_bucket{le="1"} 2',
+        'demo_latency_seconds_bucket{le="+Inf"} 3',
+        "demo_latency_seconds_sum 5.55",
+        "demo_latency_seconds_count 3",
+    ]
+
+
+def test_per_thread_updates_are_summed_on_scrape():
+    counter = MetricsRegistry().counter("demo_events", "Events.")
+
+    def work():
+        for _ in range(1000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value == 4000
+
+
+def test_pipeline_collector_reads_depth_lag_and_drops():
+    pipeline = KafkaPipeline(partitions=1, maxsize=2)
+    pipeline.poll("dashboard")
+    for index in range(3):
+        pipeline.publish("intel-feed", {"id": f"ioc-{index}"})
+    pipeline.poll("dashboard")
+
+    families = {name: samples for name, _, _, samples in pipeline_collector(pipeline)()}
+
+    assert ("secops_topic_depth", {"topic": "intel-feed", "partition": "0"}, 2) in families["secops_topic_depth"]
+    assert ("secops_consumer_lag", {"topic": "intel-feed", "group": "dashboard"}, 0) in families["secops_consumer_lag"]
+    assert families["secops_topic_dropped"] == [
+        ("secops_topic_dropped_total", {"topic": "intel-feed", "group": "dashboard"}, 1)
+    ]
+
+
+def test_metrics_route_serves_prometheus_text():
+    with TestClient(build_app(KafkaPipeline())) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE secops_topic_depth gauge" in response.text
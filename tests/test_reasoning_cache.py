@@ -0,0 +1,107 @@
+"""Reasoning cache: TTL, LRU eviction and ignored identity fields."""
+
+from __future__ import annotations
+
+import pytest
+
+from agents.base import ReasoningCache, SecurityAgent
+from agents.security_agents import build_agent_registry
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _counting_agent(calls):
+    def hook(context):
+        calls.append(context.get("id"))
+        context.update({"decision_score": 0.1 * len(context.get("indicators", [])), "action": "observe"})
+        return context
+
+    return SecurityAgent(name="counting", description="counting", reasoning_hook=hook)
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ReasoningCache(maxsize=4, ttl=10.0, clock=clock)
+    payload = {"indicators": ["a"]}
+    key = cache.key(payload)
+    cache.put(key, payload, dict(payload, decision_score=0.5))
+    clock.now = 9.9
+    assert cache.get(key, payload)["decision_score"] == 0.5
+    clock.now = 10.0
+    assert cache.get(key, payload) is None
+    assert cache.stats()["expired"] == 1
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ReasoningCache(maxsize=2, ttl=60.0)
+    payloads = [{"n": index} for index in range(3)]
+    keys = [cache.key(payload) for payload in payloads]
+    cache.put(keys[0], payloads[0], dict(payloads[0], score=0))
+    cache.put(keys[1], payloads[1], dict(payloads[1], score=1))
+    assert cache.get(keys[0], payloads[0]) is not None  # 0 is now most recent
+    cache.put(keys[2], payloads[2], dict(payloads[2], score=2))
+    assert cache.get(keys[1], payloads[1]) is None
+    assert cache.get(keys[0], payloads[0])["score"] == 0
+    stats = cache.stats()
+    assert (stats["evictions"], stats["size"], stats["hits"], stats["misses"]) == (1, 2, 2, 1)
+
+
+def test_ignored_fields_share_an_entry_but_come_from_the_caller():
+    calls = []
+    agent = _counting_agent(calls)
+    agent.enable_cache(ttl=60.0, ignore=("id", "timestamp"))
+    first = agent.plan({"id": "inc-1", "timestamp": 1.0, "indicators": ["a", "b"]})
+    second = agent.plan({"id": "inc-2", "timestamp": 2.0, "indicators": ["a", "b"]})
+    assert calls == ["inc-1"]
+    assert (second["id"], second["timestamp"]) == ("inc-2", 2.0)
+    assert second["decision_score"] == first["decision_score"]
+    agent.plan({"id": "inc-3", "timestamp": 3.0, "indicators": ["a"]})
+    assert calls == ["inc-1", "inc-3"]
+    assert agent.cache.stats()["hits"] == 1
+
+
+def test_cached_results_are_isolated_from_caller_mutation():
+    agent = _counting_agent([])
+    agent.enable_cache(ttl=60.0, ignore=("id",))
+    result = agent.plan({"id": "a", "indicators": ["x"], "tags": ["t"]})
+    result["tags"].append("mutated")
+    result["decision_score"] = 99
+    again = agent.plan({"id": "b", "indicators": ["x"], "tags": ["t"]})
+    assert again["tags"] == ["t"]
+    assert again["decision_score"] == pytest.approx(0.1)
+
+
+def test_cached_registry_matches_uncached_plans():
+    incidents = [
+        {"id": f"inc-{index}", "timestamp": float(index), "priority": "high", "indicators": ["ioc"] * (index % 3)}
+        for index in range(12)
+    ]
+    plain = build_agent_registry()
+    cached = build_agent_registry(cache_ttl=60.0)
+    try:
+        expected = plain.get("IncidentCommanderAgent").coordinate_batch(incidents)
+        commander = cached.get("IncidentCommanderAgent")
+        assert commander.coordinate_batch(incidents) == expected
+        assert commander.coordinate_batch(incidents) == expected
+        stats = cached.get("ThreatHunterAgent").cache.stats()
+        assert (stats["misses"], stats["hits"], stats["size"]) == (12, 12, 3)
+    finally:
+        plain.close()
+        cached.close()
+
+
+def test_refuses_random_and_async_hooks():
+    async def hook(context):
+        return context
+
+    with pytest.raises(ValueError):
+        SecurityAgent(name="random", description="random").enable_cache()
+    with pytest.raises(ValueError):
+        SecurityAgent(name="async", description="async", reasoning_hook=hook).enable_cache()
@@ -0,0 +1,47 @@
+import random
+
+import numpy as np
+
+from core.kafka_pipeline import TopicMessage
+from core.secops_stream_processor import VECTORIZE_THRESHOLD, process_stream, risk_columns, risk_score, risk_scores
+
+
+def _incidents(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"inc-{index}",
+            "severity": rng.choice(["low", "medium", "high", "unknown"]),
+            "anomaly_score": round(rng.random() * 0.5, rng.choice([1, 2, 3])),
+            "intel": [{"risk": round(rng.random(), 2)} for _ in range(rng.randint(0, 3))],
+            "policy": [{"passed": rng.random() < 0.7} for _ in range(rng.randint(0, 2))],
+        }
+        for index in range(count)
+    ]
+
+
+def test_vectorised_scores_match_scalar_bit_for_bit():
+    incidents = _incidents(5000)
+    # values landing exactly on a rounding tie after scaling
+    incidents += [{"severity": "low", "anomaly_score": value / 2000} for value in range(0, 1400, 3)]
+
+    scores = risk_scores(*risk_columns(incidents))
+
+    assert scores.tolist() == [risk_score(incident) for incident in incidents]
+
+
+def test_process_stream_scores_match_on_both_paths():
+    def messages(count):
+        return [
+            TopicMessage("threat-events", {"id": f"inc-{index}", "severity": "high", "anomaly_score": index / count})
+            for index in range(count)
+        ]
+
+    for count in (VECTORIZE_THRESHOLD - 1, VECTORIZE_THRESHOLD * 2):
+        for incident in process_stream(messages(count)):
+            assert incident["risk_score"] == risk_score(incident)
+
+
+def test_empty_batch():
+    assert risk_scores(*risk_columns([])).shape == (0,)
+    assert np.asarray(risk_columns([])[0]).dtype == np.intp
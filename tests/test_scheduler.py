@@ -0,0 +1,74 @@
+import gc
+
+from agents.scheduler import _QUEUE_DEPTH, IncidentScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Commander:
+    def coordinate_batch(self, incidents, timeout=None):
+        return [{"recommendation": incident["id"]} for incident in incidents]
+
+
+def _scheduler(clock, **kwargs):
+    return IncidentScheduler(Commander(), workers=2, batch_size=1, aging=1.0, clock=clock, **kwargs)
+
+
+def test_aged_low_incident_is_not_starved_by_sustained_medium_load():
+    clock = Clock()
+    scheduler = _scheduler(clock)
+    scheduler.submit({"id": "hunt", "priority": "low"})
+    taken = []
+    for step in range(10):
+        clock.now = 0.5 * step
+        scheduler.submit({"id": f"medium-{step}", "priority": "medium"})
+        taken.extend(entry.incident["id"] for entry in scheduler._take(reserved=False))
+
+    # promoted to medium after one aging interval, it overtakes mediums that arrived later
+    assert taken.index("hunt") == 2
+
+
+def test_aging_never_overtakes_containment():
+    clock = Clock()
+    scheduler = _scheduler(clock)
+    scheduler.submit({"id": "hunt", "priority": "low"})
+    clock.now = 100.0
+    scheduler.submit({"id": "contain", "priority": "high"})
+
+    assert [entry.incident["id"] for entry in scheduler._take(reserved=False)] == ["contain"]
+
+
+def test_queue_depth_gauge_sums_live_schedulers():
+    gc.collect()
+    gauge = _QUEUE_DEPTH.labels("low")
+    baseline = gauge.value
+    first, second = _scheduler(Clock()), _scheduler(Clock())
+    first.submit({"id": "a", "priority": "low"})
+    second.submit({"id": "b", "priority": "low"})
+    assert gauge.value == baseline + 2
+
+    del second
+    gc.collect()
+    assert gauge.value == baseline + 1
+
+
+def test_batch_only_carries_entries_at_the_chosen_effective_level():
+    clock = Clock()
+    scheduler = IncidentScheduler(Commander(), workers=2, batch_size=4, aging=1.0, clock=clock)
+    scheduler.submit({"id": "old-hunt", "priority": "low"})
+    clock.now = 0.5
+    scheduler.submit({"id": "medium", "priority": "medium"})
+    clock.now = 1.2
+    scheduler.submit({"id": "new-hunt-1", "priority": "low"})
+    scheduler.submit({"id": "new-hunt-2", "priority": "low"})
+
+    # only the aged hunt runs in the medium lane; the fresh hunts wait behind the medium incident
+    assert [entry.incident["id"] for entry in scheduler._take(reserved=False)] == ["old-hunt"]
+    assert [entry.incident["id"] for entry in scheduler._take(reserved=False)] == ["medium"]
+    assert [entry.incident["id"] for entry in scheduler._take(reserved=False)] == ["new-hunt-1", "new-hunt-2"]
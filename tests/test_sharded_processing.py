@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from core.kafka_pipeline import TopicMessage
+from core.load_generator import LoadGenerator
+from core.secops_stream_processor import process_stream, process_stream_sharded
+
+
+def _messages(count, seed=0):
+    generator = LoadGenerator(seed=seed, key_cardinality=200, join_rate=0.5, start_time=0.0)
+    return [
+        TopicMessage(batch.topic, record, timestamp=record["event_time"])
+        for batch in generator.mixed(count)
+        for record in batch.to_records()
+    ]
+
+
+def test_sharded_output_matches_inline():
+    messages = _messages(3000)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        sharded = process_stream_sharded(messages, shards=4, executor=executor, min_batch=0)
+
+    assert sharded == process_stream(messages)
+
+
+def test_sharded_output_matches_inline_across_processes():
+    messages = _messages(600, seed=1)
+
+    assert process_stream_sharded(messages, shards=2, min_batch=0) == process_stream(messages)
+
+
+def test_small_batches_stay_inline():
+    messages = _messages(50, seed=2)
+
+    assert process_stream_sharded(messages, shards=4) == process_stream(messages)
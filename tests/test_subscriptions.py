@@ -0,0 +1,120 @@
+import json
+import random
+
+import pytest
+
+from core.api import (
+    TOPIC_FIELDS,
+    ClientSession,
+    DeltaFrame,
+    SecOpsBackend,
+    Subscription,
+    SubscriptionGroup,
+    SubscriptionIndex,
+    incident_facts,
+)
+from core.kafka_pipeline import KafkaPipeline
+from core.secops_stream_processor import SEVERITY_LEVELS
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        {"subscribe": {"tenant": 5}},
+        {"topics": 5},
+        {"source": ["okta", 3]},
+        {"min_severity": ["high"]},
+        {"compress": "false"},
+    ],
+)
+def test_parse_rejects_wrong_value_types(message):
+    with pytest.raises(ValueError):
+        Subscription.parse(json.dumps(message))
+
+
+def test_parse_accepts_string_or_list():
+    subscription = Subscription.parse(json.dumps({"subscribe": {"tenant": "acme", "source": ["okta", "edr"]}}))
+    assert subscription.tenants == frozenset({"acme"})
+    assert subscription.sources == frozenset({"okta", "edr"})
+
+
+def _rows(*incidents):
+    return [(incident, incident_facts(incident), json.dumps(incident)) for incident in incidents]
+
+
+def _encode(rows):
+    return "[" + ",".join(row[2] for row in rows) + "]"
+
+
+def test_coalesce_merges_delta_frames_by_incident_id():
+    group = SubscriptionGroup(Subscription(), max_tracked=100)
+    client = ClientSession(websocket=None, maxsize=1, policy="coalesce")
+    for batch in (
+        _rows({"id": "a", "v": 1}),
+        _rows({"id": "b", "v": 1}),
+        _rows({"id": "a", "v": 2}),
+    ):
+        rows = [batch[position] for position in group.delta(batch)]
+        assert client.offer(_encode(rows), DeltaFrame(rows, _encode))
+
+    [(frame, _)] = client._queue
+    assert json.loads(frame) == [{"id": "b", "v": 1}, {"id": "a", "v": 2}]
+    assert client.dropped == 2
+
+
+def _random_subscription(rng):
+    def pick(options):
+        return None if rng.random() < 0.4 else frozenset(rng.sample(options, rng.randint(1, 2)))
+
+    return Subscription(
+        topics=pick(sorted(TOPIC_FIELDS)),
+        min_severity=rng.choice([None, *SEVERITY_LEVELS]),
+        tenants=pick(["acme", "globex", "initech"]),
+        sources=pick(["okta", "edr", "firewall"]),
+    )
+
+
+def _random_incident(rng, index):
+    incident = {"id": f"inc-{index}", "severity": rng.choice([*SEVERITY_LEVELS, "unknown"])}
+    for field in TOPIC_FIELDS.values():
+        incident[field] = [
+            {"tenant": rng.choice(["acme", "globex", "initech"]), "source": rng.choice(["okta", "edr", "firewall"])}
+            for _ in range(rng.randint(0, 2))
+        ]
+    return incident
+
+
+def test_index_matches_linear_filter():
+    rng = random.Random(3)
+    subscriptions = {_random_subscription(rng) for _ in range(60)}
+    index = SubscriptionIndex()
+    for subscription in subscriptions:
+        index.add(subscription)
+    removed = set(list(subscriptions)[:10])
+    for subscription in removed:
+        index.remove(subscription)
+
+    for position in range(200):
+        facts = incident_facts(_random_incident(rng, position))
+        expected = {subscription for subscription in subscriptions - removed if subscription.matches(facts)}
+        assert index.matches(facts) == expected
+
+
+def test_publish_routes_incidents_through_the_index():
+    backend = SecOpsBackend(pipeline=KafkaPipeline())
+    high = ClientSession(websocket=None, maxsize=10)
+    acme = ClientSession(websocket=None, maxsize=10)
+    backend._join(high, Subscription(min_severity="high"))
+    backend._join(acme, Subscription(tenants=frozenset({"acme"})))
+    incidents = [
+        {"id": "a", "severity": "high", "signals": [{"tenant": "globex"}]},
+        {"id": "b", "severity": "low", "intel": [{"tenant": "acme"}]},
+        {"id": "c", "severity": "medium", "policy": [{"tenant": "initech"}]},
+    ]
+
+    assert backend.publish_incidents(incidents) == 2
+    assert [row["id"] for row in json.loads(high._queue[0][0])] == ["a"]
+    assert [row["id"] for row in json.loads(acme._queue[0][0])] == ["b"]
+
+    backend._leave(acme)
+    assert backend._index.matches(incident_facts(incidents[1])) == set()
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from core.secops_stream_processor import ThreatSummaryAggregator, derive_threat_summary
+
+
+def _recount(events):
+    """Reference: the original full-recount summary."""
+
+    if not events:
+        return {"high": 0, "medium": 0, "low": 0, "average_risk": 0.0}
+    counts = {key: 0 for key in ("high", "medium", "low")}
+    for event in events:
+        severity = str(event.get("severity", "medium"))
+        counts[severity] = counts.get(severity, 0) + 1
+    counts["average_risk"] = round(sum(float(event.get("risk_score", 0.0)) for event in events) / len(events), 3)
+    return counts
+
+
+def _events(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "severity": rng.choice(["low", "medium", "high", "critical"]),
+            "risk_score": round(rng.random(), 3),
+            "signals": [{"source": rng.choice(["okta", "edr"])}],
+            "tenant": rng.choice(["acme", "globex"]),
+        }
+        for _ in range(count)
+    ]
+
+
+def test_derive_threat_summary_matches_full_recount():
+    events = _events(500)
+
+    assert derive_threat_summary(events) == _recount(events)
+    assert derive_threat_summary([]) == _recount([])
+
+
+def test_sliding_window_matches_recount_of_recent_events():
+    events = _events(300, seed=1)
+    aggregator = ThreatSummaryAggregator(window=50.0)
+    for second, event in enumerate(events):
+        aggregator.update(event, timestamp=float(second))
+        recent = events[max(0, second - 49) : second + 1]
+        snapshot, expected = aggregator.snapshot(), _recount(recent)
+        # the running risk total picks up float error as events are subtracted, which can flip the last rounded digit
+        assert snapshot.pop("average_risk") == pytest.approx(expected.pop("average_risk"), abs=1.5e-3)
+        assert snapshot == expected
+        assert len(aggregator) == len(recent)
+
+    aggregator.expire(now=1000.0)
+    assert aggregator.snapshot() == _recount([])
+
+
+def test_breakdown_reads_source_from_first_signal():
+    aggregator = ThreatSummaryAggregator()
+    aggregator.update_many(
+        [
+            {"severity": "high", "risk_score": 0.9, "signals": [{"source": "okta"}], "tenant": "acme"},
+            {"severity": "low", "risk_score": 0.2, "source": "edr", "signals": [{"source": "okta"}]},
+            {"severity": "low", "risk_score": 0.4, "signals": [{"source": "okta"}]},
+        ]
+    )
+
+    assert aggregator.breakdown("source") == {
+        "okta": {"count": 2, "average_risk": 0.65},
+        "edr": {"count": 1, "average_risk": 0.2},
+    }
+    assert aggregator.breakdown("tenant") == {"acme": {"count": 1, "average_risk": 0.9}}
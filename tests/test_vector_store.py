@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+
+from core.vector_store import VectorStore, cosine_similarity, embed
+
+
+def _reference(documents, query, top_k):
+    """Brute-force ranking of the original list-backed store."""
+
+    scored = [(key, cosine_similarity(embed(text), embed(query))) for key, text in documents.items()]
+    return [(key, score) for key, score in sorted(scored, key=lambda item: item[1], reverse=True)[:top_k]]
+
+
+def _documents(count, seed=0):
+    rng = random.Random(seed)
+    words = ["ransomware", "lateral", "okta", "beacon", "T1486", "T1021", "phishing", "escalation"]
+    return {f"doc-{index}": " ".join(rng.choices(words, k=rng.randint(1, 4))) for index in range(count)}
+
+
+def _ranking(store, query, top_k):
+    return [(hit["key"], hit["score"]) for hit in store.search(query, top_k)]
+
+
+def test_search_matches_brute_force_ranking():
+    documents = _documents(500)
+    store = VectorStore(capacity=4)
+    for key, text in documents.items():
+        store.add(key, text, {"source": "intel"})
+
+    for query in ["ransomware okta", "lateral movement", "T1486", "phishing beacon escalation"]:
+        assert _ranking(store, query, 5) == _reference(documents, query, 5)
+
+
+def test_delete_compacts_and_replace_overwrites_in_place():
+    documents = _documents(200, seed=1)
+    store = VectorStore()
+    for key, text in documents.items():
+        store.add(key, text, {})
+    for key in list(documents)[:150]:
+        store.delete(key)
+        del documents[key]
+    store.add("doc-199", "ransomware T1486", {"replaced": "yes"})
+    documents["doc-199"] = "ransomware T1486"
+
+    assert len(store) == 50 and "doc-0" not in store
+    assert _ranking(store, "ransomware T1486", 3) == _reference(documents, "ransomware T1486", 3)
+    assert store.search("ransomware T1486", 1)[0]["metadata"] == {"replaced": "yes"}
+
+
+def test_search_batch_matches_single_queries_and_handles_zero_vectors():
+    store = VectorStore()
+    for key, text in _documents(50, seed=2).items():
+        store.add(key, text, {})
+    queries = ["okta", "beacon lateral", ""]
+
+    assert store.search_batch(queries, 4) == [store.search(query, 4) for query in queries]
+    assert all(hit["score"] == 0.0 for hit in store.search_vectors(np.zeros(32), 3)[0])
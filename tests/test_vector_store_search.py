@@ -0,0 +1,32 @@
+import numpy as np
+
+from core.vector_store import VectorStore
+
+
+def _clustered_store():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(8, 32))
+    vectors = np.repeat(centers, 50, axis=0) + 0.01 * rng.normal(size=(400, 32))
+    store = VectorStore()
+    keys = [f"doc-{row}" for row in range(len(vectors))]
+    metadata = [{"tenant": "rare" if row == 399 else "common"} for row in range(len(vectors))]
+    store.add_vectors(keys, vectors.astype(np.float32), metadata)
+    store.build_index(nlist=8, nprobe=1)
+    return store, vectors
+
+
+def test_ivf_search_with_selective_filter_scores_matching_rows():
+    store, vectors = _clustered_store()
+
+    hits = store.search_vectors(vectors[0], top_k=3, filters={"tenant": "rare"})[0]
+
+    assert [hit["key"] for hit in hits] == ["doc-399"]
+
+
+def test_ivf_filtered_search_matches_exact_when_probe_has_enough_rows():
+    store, vectors = _clustered_store()
+
+    approximate = store.search_vectors(vectors[0], top_k=3, filters={"tenant": "common"})[0]
+    exact = store.search_vectors(vectors[0], top_k=3, exact=True, filters={"tenant": "common"})[0]
+
+    assert [hit["key"] for hit in approximate] == [hit["key"] for hit in exact]
@@ -0,0 +1,106 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from core.vector_store import SNAPSHOT_GRACE, SNAPSHOT_MANIFEST, VectorStore
+
+
+def _store():
+    store = VectorStore()
+    store.add_texts(
+        ["ransomware", "lateral"],
+        ["Ransomware T1486 encryption patterns", "Lateral movement credential abuse"],
+        [{"ttp": "T1486"}, {"ttp": "T1021"}],
+    )
+    return store
+
+
+def test_save_load_replays_delta_log(tmp_path):
+    store = _store()
+    store.save(tmp_path)
+    store.add_texts(["phishing"], ["Credential phishing lure"], [{"ttp": "T1566"}])
+    store.delete("lateral")
+    store.close()
+
+    loaded = VectorStore.load(tmp_path)
+    assert len(loaded) == 2
+    assert "phishing" in loaded and "lateral" not in loaded
+    [hit] = loaded.search("Credential phishing lure", top_k=1)
+    assert hit["key"] == "phishing"
+
+
+def test_compact_publishes_new_snapshot_and_keeps_old_for_grace_period(tmp_path):
+    store = _store()
+    store.save(tmp_path)
+    first = VectorStore.snapshot_dir(tmp_path)
+    store.add_texts(["phishing"], ["Credential phishing lure"], [{"ttp": "T1566"}])
+    store.compact()
+
+    second = VectorStore.snapshot_dir(tmp_path)
+    assert second != first and first.exists()
+    assert json.loads((tmp_path / SNAPSHOT_MANIFEST).read_text())["snapshot"] == second.name
+    assert (second / "delta.log").read_bytes() == b""
+
+    superseded = time.time() - SNAPSHOT_GRACE - 1
+    os.utime(second, (superseded, superseded))
+    store.compact()
+    assert not first.exists() and second.exists()
+    store.close()
+    assert len(VectorStore.load(tmp_path)) == 3
+
+
+def test_writer_follows_snapshot_published_by_another_writer(tmp_path):
+    seed = _store()
+    seed.save(tmp_path)
+    seed.close()
+    reader, compactor = VectorStore.load(tmp_path), VectorStore.load(tmp_path)
+    compactor.add_texts(["phishing"], ["Credential phishing lure"], [{"ttp": "T1566"}])
+    compactor.compact()
+
+    reader.add_texts(["beacon"], ["Cobalt Strike beacon"], [{"ttp": "T1071"}])
+    reader.delete("ransomware")
+    reader.close()
+    compactor.close()
+
+    live = VectorStore.snapshot_dir(tmp_path)
+    assert (live / "delta.log").stat().st_size > 0
+    loaded = VectorStore.load(tmp_path)
+    assert len(loaded) == 3 and "beacon" in loaded and "ransomware" not in loaded
+
+
+def test_save_leaves_newer_in_progress_snapshot_alone(tmp_path):
+    store = _store()
+    store.save(tmp_path)
+    in_progress = tmp_path / "snapshot-000099"
+    in_progress.mkdir()
+    store.compact()
+    store.close()
+    assert in_progress.exists()
+
+
+def test_load_retries_when_snapshot_is_removed_mid_read(tmp_path, monkeypatch):
+    store = _store()
+    store.save(tmp_path)
+    store.close()
+    live = VectorStore.snapshot_dir(tmp_path)
+    vanished = tmp_path / "snapshot-000000"
+    answers = iter([vanished, live])
+    real = VectorStore.snapshot_dir
+    monkeypatch.setattr(VectorStore, "snapshot_dir", staticmethod(lambda path: next(answers, real(path))))
+
+    assert len(VectorStore.load(tmp_path)) == 2
+
+
+def test_unpublished_snapshot_is_ignored(tmp_path):
+    store = _store()
+    store.save(tmp_path)
+    store.close()
+    # a writer that died before switching the manifest leaves an orphan directory
+    orphan = tmp_path / "snapshot-000099"
+    orphan.mkdir()
+    np.save(orphan / "vectors.npy", np.zeros((0, store.dim), dtype=np.float32))
+
+    assert VectorStore.snapshot_dir(tmp_path) != orphan
+    assert len(VectorStore.load(tmp_path)) == 2
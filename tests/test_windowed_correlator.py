@@ -0,0 +1,116 @@
+from core.kafka_pipeline import TopicMessage
+from core.secops_stream_processor import WindowedCorrelator, correlate_events, risk_score
+
+
+def _event(incident, event_time, topic="threat-events", **fields):
+    return TopicMessage(topic, {"id": incident, "event_time": event_time, **fields}, timestamp=event_time)
+
+
+def test_window_joins_topics_and_fires_once_watermark_passes_end():
+    correlator = WindowedCorrelator(size=10.0, max_out_of_orderness=2.0)
+    batch = [_event("inc-1", 1.0, severity="high"), _event("inc-1", 3.0, "intel-feed", risk=0.5)]
+    assert correlator.process(batch) == []
+    assert correlator.process([_event("inc-1", 11.0)]) == []
+
+    [fired] = correlator.process([_event("inc-2", 12.5)])
+
+    assert (fired["id"], fired["window_start"], fired["window_end"]) == ("inc-1", 0.0, 10.0)
+    assert fired["severity"] == "high" and len(fired["signals"]) == 1 and len(fired["intel"]) == 1
+    assert fired["risk_score"] == risk_score(fired)
+
+
+def test_out_of_order_event_within_bound_joins_its_window():
+    correlator = WindowedCorrelator(size=10.0, max_out_of_orderness=5.0)
+    correlator.process([_event("inc-1", 12.0)])
+    correlator.process([_event("inc-1", 8.0)])  # 4s behind the newest event
+
+    fired = correlator.process([_event("inc-9", 30.0)])
+
+    assert sorted((incident["id"], incident["window_start"]) for incident in fired) == [("inc-1", 0.0), ("inc-1", 10.0)]
+
+
+def test_late_event_within_lateness_re_emits_and_later_is_dropped():
+    correlator = WindowedCorrelator(size=10.0, max_out_of_orderness=0.0, allowed_lateness=5.0)
+    correlator.process([_event("inc-1", 1.0)])
+    [fired] = correlator.process([_event("inc-2", 11.0)])
+    assert "late" not in fired
+
+    [updated] = correlator.process([_event("inc-1", 2.0)])
+    assert updated["late"] is True and len(updated["signals"]) == 2
+
+    correlator.process([_event("inc-2", 20.0)])
+    assert correlator.process([_event("inc-1", 3.0)]) == []
+    assert correlator.late_dropped == 1
+
+
+def test_sliding_windows_and_state_cap():
+    correlator = WindowedCorrelator(size=10.0, slide=5.0, max_state=3)
+    correlator.process([_event("inc-1", 7.0)])  # windows starting at 0 and 5
+    assert len(correlator) == 2
+
+    evicted = correlator.process([_event("inc-2", 7.5)])
+    assert len(correlator) == 3 and [incident["evicted"] for incident in evicted] == [True]
+    assert evicted[0]["id"] == "inc-1" and correlator.evicted == 1
+
+
+def test_flush_matches_batch_correlation():
+    messages = [
+        _event("inc-1", 1.0, severity="low"),
+        _event("inc-2", 2.0),
+        _event("inc-1", 3.0, "intel-feed", risk=0.2),
+    ]
+    correlator = WindowedCorrelator(size=60.0)
+    correlator.process(messages)
+
+    flushed = {incident["id"]: incident for incident in correlator.flush()}
+    for incident in correlate_events(messages):
+        assert {key: flushed[incident["id"]][key] for key in incident} == incident
+    assert len(correlator) == 0
+
+
+def test_evicting_a_fired_window_does_not_fire_it_again():
+    correlator = WindowedCorrelator(size=10.0, max_out_of_orderness=0.0, allowed_lateness=100.0, max_state=2)
+    correlator.process([_event("inc-1", 1.0)])
+    [fired] = correlator.process([_event("inc-2", 11.0)])
+    assert fired["id"] == "inc-1"
+
+    # inc-3 pushes the fired inc-1 window out of state: nothing is emitted for it
+    assert correlator.process([_event("inc-3", 12.0)]) == []
+    assert correlator.evicted == 1
+
+    # the closed window neither re-opens as a fresh partial window nor fires again
+    assert correlator.process([_event("inc-1", 2.0)]) == []
+    assert correlator.late_dropped == 1
+    assert all(incident["id"] != "inc-1" for incident in correlator.flush())
+
+
+def test_pending_late_update_is_emitted_once_on_eviction():
+    correlator = WindowedCorrelator(size=10.0, max_out_of_orderness=0.0, allowed_lateness=100.0, max_state=2)
+    correlator.process([_event("inc-1", 1.0)])
+    correlator.process([_event("inc-2", 11.0)])
+
+    # the late update makes inc-1 most recent, so inc-2 is evicted first and inc-1 next
+    emitted = correlator.process([_event("inc-1", 2.0), _event("inc-3", 12.0), _event("inc-4", 13.0)])
+
+    flags = [(incident["id"], incident.get("late"), incident.get("evicted")) for incident in emitted]
+    assert flags == [("inc-2", None, True), ("inc-1", True, None)]
+    assert len(emitted[1]["signals"]) == 2
+
+
+def test_late_dropped_counts_events_not_windows():
+    correlator = WindowedCorrelator(size=30.0, slide=10.0, max_out_of_orderness=0.0)
+    correlator.process([_event("inc-1", 100.0)])
+
+    correlator.process([_event("inc-1", 5.0)])  # too late for all three sliding windows
+
+    assert correlator.late_dropped == 1
+
+
+def test_watermark_advances_per_event_within_one_call():
+    correlator = WindowedCorrelator(size=10.0, max_out_of_orderness=2.0)
+
+    emitted = correlator.process([_event("inc-1", 1.0), _event("inc-2", 20.0), _event("inc-1", 3.0)])
+
+    [fired] = [incident for incident in emitted if incident["id"] == "inc-1"]
+    assert len(fired["signals"]) == 1
+    assert correlator.watermark == 18.0 and correlator.late_dropped == 1